@@ -7,11 +7,27 @@ import os
 from datetime import datetime
 from werkzeug.utils import secure_filename
 import re
-from parsers.resume_parser import ResumeParser
+import zipfile
+import threading
+import time
 from parsers.document_verifier import DocumentVerifier
+from parsers.document_classifier import DocumentClassifier
+from parsers.name_matcher import NameIndex
 from ai_agent import AIDocumentAgent
+from db import ConnectionPool, PoolTimeout
+import batch_ingest
+from parse_workers import get_parse_pool
+import resume_cache
+import identity_numbers
+from pagination import encode_cursor, decode_cursor
+from upload_spool import SpoolingRequest, UploadSpool, upload_stats, SPOOL_MEMORY_BYTES
+from resume_jobs import ResumeIngestionQueue, PARSE_QUEUED, PARSE_RUNNING, PARSE_DONE, PARSE_FAILED
+from verification_jobs import (DocumentVerificationQueue, VERIFY_QUEUED, VERIFY_RUNNING, VERIFY_DONE,
+                               VERIFY_FAILED, VERIFICATION_PENDING)
 
 app = Flask(__name__)
+# Stream multipart file parts into hashed, size-limited spools (upload_spool.py)
+app.request_class = SpoolingRequest
 
 # CORS Configuration - Allow all origins for Render.com deployment
 # This configuration explicitly allows all origins including https://ai-agent-bcg-1-front.onrender.com
@@ -38,6 +54,15 @@ def handle_exception(e):
         response.status_code = e.code
         return response
 
+    # database pool exhausted - ask the client to retry instead of failing hard
+    if isinstance(e, PoolTimeout):
+        response = jsonify({
+            "error": "Service Unavailable",
+            "message": str(e)
+        })
+        response.status_code = 503
+        return response
+
     # now you're handling non-HTTP exceptions only
     print(f"Unhandled Exception: {str(e)}")
     import traceback
@@ -53,6 +78,7 @@ def handle_exception(e):
 # Initialize AI Agent and Document Verifier
 ai_agent = AIDocumentAgent()
 doc_verifier = DocumentVerifier()
+document_classifier = DocumentClassifier(ocr_pool=doc_verifier.ocr_pool)
 
 # Configuration
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -67,12 +93,64 @@ DATABASE_URL = os.environ.get('DATABASE_URL', 'postgresql://abhinav:TFqaygjsCxnJ
 if DATABASE_URL.startswith('postgres://'):
     DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql://', 1)
 
+# Process-wide connection pool (one per gunicorn worker)
+db_pool = ConnectionPool(
+    DATABASE_URL,
+    maxconn=int(os.environ.get('DB_POOL_MAX', 10)),
+    timeout=float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+)
+
+# Candidate listing: page sizes and the searchable text expression.
+# The expression must match the trigram index created in _create_tables.
+CANDIDATES_PAGE_SIZE = 50
+CANDIDATES_MAX_PAGE_SIZE = 200
+CANDIDATE_SEARCH_EXPR = "lower(coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(company, ''))"
+# Seconds a process reuses the dashboard's whole-table candidate counts
+CANDIDATE_COUNTS_TTL = int(os.environ.get('CANDIDATE_COUNTS_TTL', 15))
+# Seconds a process reuses its in-memory index of candidate names
+NAME_INDEX_TTL = int(os.environ.get('NAME_INDEX_TTL', 300))
+CANDIDATE_STATUS_FILTERS = {
+    'completed': ['Completed'],
+    'processing': ['Processing'],
+    'pending': ['Pending'],
+    'failed': ['Verification Failed', 'Failed'],
+}
+
+# MIME types reported for submitted documents, by file extension
+DOCUMENT_MIME_TYPES = {
+    '.pdf': 'application/pdf',
+    '.doc': 'application/msword',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg'
+}
+
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+BATCH_MAX_CONTENT_LENGTH = 256 * 1024 * 1024  # 256MB per batch upload request
 
 # Create upload folder if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Background resume parsing (bounded per process; state is kept on the candidate row)
+resume_queue = ResumeIngestionQueue(
+    db_pool.connection,
+    UPLOAD_FOLDER,
+    max_workers=int(os.environ.get('RESUME_PARSE_WORKERS', 2)),
+    max_pending=int(os.environ.get('RESUME_PARSE_MAX_PENDING', 32)),
+)
+
+# Background PAN/Aadhaar verification (state is kept on the candidate and document rows)
+verification_queue = DocumentVerificationQueue(
+    db_pool.connection,
+    doc_verifier,
+    max_workers=int(os.environ.get('DOCUMENT_VERIFY_WORKERS', 2)),
+    max_pending=int(os.environ.get('DOCUMENT_VERIFY_MAX_PENDING', 32)),
+    threshold=float(os.environ.get('DOCUMENT_VERIFY_THRESHOLD', 0.6)),
+    classifier=document_classifier,
+)
+
 # Initialize database
 def init_db():
     # First, try to create the database if it doesn't exist
@@ -99,9 +177,13 @@ def init_db():
         print(f"Note: Could not create database automatically: {e}")
     
     # Now connect to the actual database
-    conn = psycopg2.connect(DATABASE_URL)
-    cursor = conn.cursor()
-    
+    with get_db_connection() as conn:
+        _create_tables(conn.cursor())
+        conn.commit()
+    print(f"✓ Database tables created/verified")
+
+def _create_tables(cursor):
+    """Create all application tables if they don't exist"""
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS candidates (
             id SERIAL PRIMARY KEY,
@@ -175,53 +257,170 @@ def init_db():
         )
     ''')
     
-    conn.commit()
-    conn.close()
-    print(f"✓ Database tables created/verified")
+    # Columns added after the initial schema
+    cursor.execute('ALTER TABLE submitted_documents ADD COLUMN IF NOT EXISTS file_size INTEGER')
+    cursor.execute('ALTER TABLE submitted_documents ADD COLUMN IF NOT EXISTS extraction_method TEXT')
+    _backfill_submitted_document_sizes(cursor)
+    
+    # Background resume parsing job state
+    cursor.execute('ALTER TABLE candidates ADD COLUMN IF NOT EXISTS parse_status TEXT')
+    cursor.execute('ALTER TABLE candidates ADD COLUMN IF NOT EXISTS parse_error TEXT')
+    cursor.execute('ALTER TABLE candidates ADD COLUMN IF NOT EXISTS parse_attempts INTEGER DEFAULT 0')
+    cursor.execute('ALTER TABLE candidates ADD COLUMN IF NOT EXISTS parse_updated_at TIMESTAMP')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_candidates_parse_pending
+        ON candidates (parse_updated_at)
+        WHERE parse_status IN ('{PARSE_QUEUED}', '{PARSE_RUNNING}')
+    ''')
+    
+    # Keyed hashes of PAN/Aadhaar numbers for cross-candidate reuse checks
+    identity_numbers.create_table(cursor)
+    
+    # Background document verification job state
+    cursor.execute('ALTER TABLE candidates ADD COLUMN IF NOT EXISTS verify_status TEXT')
+    cursor.execute('ALTER TABLE candidates ADD COLUMN IF NOT EXISTS verify_error TEXT')
+    cursor.execute('ALTER TABLE candidates ADD COLUMN IF NOT EXISTS verify_attempts INTEGER DEFAULT 0')
+    cursor.execute('ALTER TABLE candidates ADD COLUMN IF NOT EXISTS verify_updated_at TIMESTAMP')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_candidates_verify_pending
+        ON candidates (verify_updated_at)
+        WHERE verify_status IN ('{VERIFY_QUEUED}', '{VERIFY_RUNNING}')
+    ''')
+    
+    # Content-addressed resume files and cached parse results
+    cursor.execute('ALTER TABLE candidates ADD COLUMN IF NOT EXISTS resume_hash TEXT')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resume_parse_cache (
+            content_hash TEXT NOT NULL,
+            parser_version TEXT NOT NULL,
+            extracted_data JSONB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            hit_count INTEGER DEFAULT 0,
+            last_hit_at TIMESTAMP,
+            PRIMARY KEY (content_hash, parser_version)
+        )
+    ''')
+    
+    # Child-table lookups by candidate (profile query aggregates these)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_candidate_skills_candidate_id ON candidate_skills (candidate_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_confidence_scores_candidate_id ON confidence_scores (candidate_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_candidate_id ON documents (candidate_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_submitted_documents_candidate_id ON submitted_documents (candidate_id)')
+    
+    # Keyset pagination orders by (upload_date, id), so the date must never be NULL
+    # (rows without one predate the default; they sort as the oldest)
+    # Checked first: SET NOT NULL takes an exclusive lock on the table, so it runs only once
+    cursor.execute('''
+        SELECT is_nullable FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'candidates' AND column_name = 'upload_date'
+    ''')
+    if cursor.fetchone()[0] == 'YES':
+        cursor.execute("UPDATE candidates SET upload_date = TIMESTAMP 'epoch' WHERE upload_date IS NULL")
+        cursor.execute('ALTER TABLE candidates ALTER COLUMN upload_date SET NOT NULL')
+    
+    # Indexes backing keyset pagination of the candidate list (optionally by status)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_candidates_upload_date_id ON candidates (upload_date DESC, id DESC)')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_candidates_status_upload_date_id
+        ON candidates (extraction_status, upload_date DESC, id DESC)
+    ''')
+    
+    # Trigram index for substring search over name/email/company (needs pg_trgm)
+    cursor.execute('SAVEPOINT search_index')
+    try:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_candidates_search_trgm
+            ON candidates USING GIN (({CANDIDATE_SEARCH_EXPR}) gin_trgm_ops)
+        ''')
+        cursor.execute('RELEASE SAVEPOINT search_index')
+    except psycopg2.Error as e:
+        cursor.execute('ROLLBACK TO SAVEPOINT search_index')
+        print(f"Note: Could not create candidate search index: {e}")
+
+def _backfill_submitted_document_sizes(cursor):
+    """One-time fill of file_size for documents submitted before it was stored"""
+    cursor.execute('SELECT id, file_path FROM submitted_documents WHERE file_size IS NULL')
+    for doc_id, file_path in cursor.fetchall():
+        file_size = os.path.getsize(file_path) if file_path and os.path.exists(file_path) else 0
+        cursor.execute('UPDATE submitted_documents SET file_size = %s WHERE id = %s', (file_size, doc_id))
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+_candidate_counts = None
+_candidate_counts_at = 0.0
+_candidate_counts_lock = threading.Lock()
+
+def candidate_counts(cursor):
+    """
+    Total candidates and count per status filter, over the whole table
+    
+    The counts do not depend on the listing's filters, so one result is
+    reused for CANDIDATE_COUNTS_TTL seconds rather than scanning the table
+    for every first page.
+    """
+    global _candidate_counts, _candidate_counts_at
+    with _candidate_counts_lock:
+        if _candidate_counts is not None and time.monotonic() - _candidate_counts_at <= CANDIDATE_COUNTS_TTL:
+            return _candidate_counts
+    filters = ', '.join(f'count(*) FILTER (WHERE extraction_status = ANY(%s)) AS {name}'
+                        for name in CANDIDATE_STATUS_FILTERS)
+    cursor.execute(f'SELECT count(*) AS total, {filters} FROM candidates',
+                   list(CANDIDATE_STATUS_FILTERS.values()))
+    counts = dict(cursor.fetchone())
+    with _candidate_counts_lock:
+        _candidate_counts = counts
+        _candidate_counts_at = time.monotonic()
+    return counts
+
+def parse_db_timestamp(value):
+    """Parse a timestamp serialized by PostgreSQL's JSON functions"""
+    return datetime.fromisoformat(value) if value else None
+
 def get_db_connection():
-    conn = psycopg2.connect(DATABASE_URL)
-    return conn
+    """Borrow a pooled connection: `with get_db_connection() as conn: ...`"""
+    return db_pool.connection()
 
 @app.route('/api/candidates/upload', methods=['POST'])
 def upload_resume():
-    """Accept resume (PDF/DOCX) and extract information"""
+    """Accept resume (PDF/DOCX) and queue it for background extraction"""
+    print(f"\n{'='*60}")
+    print(f"Resume Upload Request Received")
+    print(f"{'='*60}")
+    
+    if 'resume' not in request.files:
+        print("Error: No file provided in request")
+        return jsonify({'error': 'No file provided'}), 400
+    
+    file = request.files['resume']
+    print(f"File received: {file.filename}")
+    
+    if file.filename == '':
+        print("Error: Empty filename")
+        return jsonify({'error': 'No file selected'}), 400
+    
+    if not allowed_file(file.filename):
+        print("Invalid file type")
+        return jsonify({'error': 'Invalid file type. Please upload PDF or DOCX'}), 400
+    
     try:
-        print(f"\n{'='*60}")
-        print(f"Resume Upload Request Received")
-        print(f"{'='*60}")
+        # Stored under its content hash, so re-uploads of the same file share one copy
+        stored = resume_cache.save_stream(file.stream, app.config['UPLOAD_FOLDER'],
+                                          secure_filename(file.filename))
+        filename, filepath = stored.filename, stored.filepath
+        print(f"File saved to: {filepath} ({'new' if stored.created else 'duplicate content'})")
         
-        if 'resume' not in request.files:
-            print("Error: No file provided in request")
-            return jsonify({'error': 'No file provided'}), 400
-        
-        file = request.files['resume']
-        print(f"File received: {file.filename}")
-        
-        if file.filename == '':
-            print("Error: Empty filename")
-            return jsonify({'error': 'No file selected'}), 400
-        
-        if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{timestamp}_{filename}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            
-            print(f"Saving file to: {filepath}")
-            file.save(filepath)
-            print(f"File saved successfully")
-            
-            # Parse resume
-            print(f"Starting resume parsing...")
-            parser = ResumeParser(filepath)
-            extracted_data = parser.extract_data()
-            print(f"Resume parsed successfully")
-            print(f"Extracted name: {extracted_data.get('name', 'N/A')}")
-            print(f"Extracted email: {extracted_data.get('email', 'N/A')}")
+        upload_metrics = None
+        content = None
+        if isinstance(file.stream, UploadSpool):
+            upload_metrics = file.stream.metrics()
+            upload_stats.record(upload_metrics)
+            print(f"Received {upload_metrics['bytes']} bytes in {upload_metrics['durationMs']} ms "
+                  f"({upload_metrics['throughputMBps']} MB/s)")
+            # Small uploads are still in memory: parse them from there
+            if file.stream.in_memory:
+                content = file.stream.getvalue()
     except Exception as e:
         print(f"Error during upload: {str(e)}")
         import traceback
@@ -229,87 +428,319 @@ def upload_resume():
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
     
     try:
-        
-        # Store in database
         print(f"Storing data in database...")
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO candidates 
-            (name, email, phone, company, designation, location, experience, degree, university, extraction_status, resume_filename)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING id
-        ''', (
-            extracted_data['name'],
-            extracted_data['email'],
-            extracted_data['phone'],
-            extracted_data['company'],
-            extracted_data['designation'],
-            extracted_data['location'],
-            extracted_data['experience'],
-            extracted_data['degree'],
-            extracted_data['university'],
-            'Processing',
-            filename
-        ))
-        
-        candidate_id = cursor.fetchone()[0]
-        print(f"Candidate created with ID: {candidate_id}")
-        
-        # Store skills
-        for skill in extracted_data.get('skills', []):
-            cursor.execute('INSERT INTO candidate_skills (candidate_id, skill) VALUES (%s, %s)',
-                         (candidate_id, skill))
-        
-        # Store confidence scores
-        for field_name, confidence in extracted_data.get('confidence', {}).items():
-            cursor.execute('INSERT INTO confidence_scores (candidate_id, field_name, confidence) VALUES (%s, %s, %s)',
-                         (candidate_id, field_name, confidence))
-        
-        # Store document record
-        cursor.execute('''
-            INSERT INTO documents (candidate_id, document_name, document_type, file_size, file_path)
-            VALUES (%s, %s, %s, %s, %s)
-        ''', (candidate_id, file.filename, file.content_type, os.path.getsize(filepath), filepath))
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"Resume upload completed successfully!")
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cached_data = resume_cache.get_cached(cursor, [stored.content_hash]).get(stored.content_hash)
+            
+            if cached_data is not None:
+                # Same bytes already parsed by this parser version: no extraction needed
+                candidate_id = batch_ingest.store_candidates(conn, [{
+                    'original_name': file.filename,
+                    'filename': filename,
+                    'filepath': filepath,
+                    'content_type': file.content_type,
+                    'size': stored.size,
+                    'content_hash': stored.content_hash,
+                    'data': cached_data
+                }])[0]
+            else:
+                # Placeholder row; the background parser fills in the extracted fields
+                cursor.execute('''
+                    INSERT INTO candidates
+                    (name, extraction_status, resume_filename, resume_hash, parse_status, parse_attempts,
+                     parse_updated_at)
+                    VALUES (%s, %s, %s, %s, %s, 1, CURRENT_TIMESTAMP)
+                    RETURNING id
+                ''', ('Unknown', 'Processing', filename, stored.content_hash, PARSE_QUEUED))
+                candidate_id = cursor.fetchone()[0]
+                
+                # Store document record
+                cursor.execute('''
+                    INSERT INTO documents (candidate_id, document_name, document_type, file_size, file_path)
+                    VALUES (%s, %s, %s, %s, %s)
+                ''', (candidate_id, file.filename, file.content_type, stored.size, filepath))
+            
+            print(f"Candidate created with ID: {candidate_id}")
+            conn.commit()
+    except Exception as e:
+        print(f"Database error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+    
+    if cached_data is not None:
+        print(f"Parse cache hit for {stored.content_hash}")
         print(f"{'='*60}\n")
-        
         return jsonify({
             'message': 'Resume uploaded and processed successfully',
             'candidate_id': candidate_id,
-            'data': extracted_data
+            'status_url': f'/api/candidates/{candidate_id}/status',
+            'upload': upload_metrics,
+            'data': cached_data
         }), 201
     
+    # A full backlog defers the job: the next recovery sweep with a free worker claims it
+    resume_queue.submit_or_defer(candidate_id, content=content)
+    
+    print(f"Resume queued for extraction")
+    print(f"{'='*60}\n")
+    
+    return jsonify({
+        'message': 'Resume uploaded; extraction in progress',
+        'candidate_id': candidate_id,
+        'status_url': f'/api/candidates/{candidate_id}/status',
+        'upload': upload_metrics
+    }), 202
+
+@app.route('/api/candidates/upload/batch', methods=['POST'])
+def upload_resume_batch():
+    """Accept many resumes (multiple 'resumes' files and/or .zip archives) in one call"""
+    # Batches need a larger body limit than single uploads (Flask >= 3.1)
+    request.max_content_length = BATCH_MAX_CONTENT_LENGTH
+    
+    print(f"\n{'='*60}")
+    print(f"Batch Resume Upload Request Received")
+    print(f"{'='*60}")
+    
+    uploads = request.files.getlist('resumes') + request.files.getlist('archive')
+    if not uploads:
+        return jsonify({'error': 'No files provided'}), 400
+    
+    manifest = []
+    entries = []
+    in_memory_bytes = 0
+    
+    def save_resume(original_name, source):
+        """Save an uploaded file or extracted archive member (bytes) and queue it for parsing"""
+        nonlocal in_memory_bytes
+        if len(entries) >= batch_ingest.BATCH_MAX_FILES:
+            manifest.append({'file': original_name, 'status': 'failed',
+                             'error': f'Batch limit of {batch_ingest.BATCH_MAX_FILES} files reached'})
+            return
+        index = len(manifest)
+        name = secure_filename(original_name)
+        content = None
+        if isinstance(source, bytes):
+            stored = resume_cache.save_bytes(source, app.config['UPLOAD_FOLDER'], name)
+            content = source
+        else:
+            stored = resume_cache.save_stream(source.stream, app.config['UPLOAD_FOLDER'], name)
+            if isinstance(source.stream, UploadSpool):
+                upload_stats.record(source.stream.metrics())
+                if source.stream.in_memory:
+                    content = source.stream.getvalue()
+        # Keep small files in memory for parsing, within a per-batch budget
+        if content is not None and (len(content) > SPOOL_MEMORY_BYTES
+                                    or in_memory_bytes + len(content) > batch_ingest.BATCH_MAX_IN_MEMORY_BYTES):
+            content = None
+        if content is not None:
+            in_memory_bytes += len(content)
+        manifest.append({'file': original_name, 'status': 'pending'})
+        entries.append({
+            'index': index,
+            'original_name': original_name,
+            'filename': stored.filename,
+            'filepath': stored.filepath,
+            'content_type': DOCUMENT_MIME_TYPES.get(os.path.splitext(stored.filename)[1].lower(),
+                                                    'application/octet-stream'),
+            'size': stored.size,
+            'content_hash': stored.content_hash,
+            'created': stored.created,
+            'content': content
+        })
+    
+    for file in uploads:
+        if not file or not file.filename:
+            continue
+        if file.filename.lower().endswith('.zip'):
+            try:
+                for member_name, content in batch_ingest.iter_zip_resumes(file.stream, ALLOWED_EXTENSIONS):
+                    save_resume(member_name, content)
+            except (ValueError, zipfile.BadZipFile) as e:
+                manifest.append({'file': file.filename, 'status': 'failed', 'error': f'Invalid archive: {e}'})
+        elif allowed_file(file.filename):
+            save_resume(file.filename, file)
+        else:
+            manifest.append({'file': file.filename, 'status': 'failed',
+                             'error': 'Invalid file type. Please upload PDF, DOCX or ZIP'})
+    
+    # Parse each distinct file once, and only if this parser version has not seen it
+    try:
+        with get_db_connection() as conn:
+            results = resume_cache.get_cached(conn.cursor(), [entry['content_hash'] for entry in entries])
+            conn.commit()
+    except Exception as e:
+        print(f"Warning: parse cache lookup failed: {str(e)}")
+        results = {}
+    cache_hits = len(results)
+    
+    to_parse = {}
+    for entry in entries:
+        if entry['content_hash'] not in results:
+            to_parse.setdefault(entry['content_hash'], entry)
+    
+    print(f"Parsing {len(to_parse)} resume(s) in parallel ({cache_hits} cached, "
+          f"{len(entries) - len(to_parse) - cache_hits} duplicate)...")
+    errors = {}
+    warnings = {}
+    new_results = {}
+    parse_results = batch_ingest.parse_resumes([entry['filepath'] for entry in to_parse.values()],
+                                               [entry['content'] for entry in to_parse.values()])
+    for entry in entries:
+        entry.pop('content')
+    for content_hash, (data, error) in zip(to_parse, parse_results):
+        if data is None:
+            errors[content_hash] = error
+        elif error:
+            # Partial result (deadline or memory cap hit): keep it, but don't cache it
+            warnings[content_hash] = error
+            results[content_hash] = data
+        else:
+            new_results[content_hash] = data
+    results.update(new_results)
+    
+    parsed = []
+    for entry in entries:
+        if entry['content_hash'] in errors:
+            manifest[entry['index']].update({'status': 'failed',
+                                             'error': f"Parse failed: {errors[entry['content_hash']]}"})
+            if entry['created'] and os.path.exists(entry['filepath']):
+                os.remove(entry['filepath'])
+        else:
+            entry['data'] = results[entry['content_hash']]
+            parsed.append(entry)
+    
+    try:
+        with get_db_connection() as conn:
+            ids = batch_ingest.store_candidates(conn, parsed)
+            cursor = conn.cursor()
+            for content_hash, data in new_results.items():
+                resume_cache.put_cached(cursor, content_hash, data)
+            conn.commit()
     except Exception as e:
         print(f"Database error: {str(e)}")
         import traceback
         traceback.print_exc()
-        if conn:
-            conn.close()
-        return jsonify({'error': f'Database error: {str(e)}'}), 500
+        for entry in parsed:
+            manifest[entry['index']].update({'status': 'failed', 'error': f'Database error: {str(e)}'})
+        ids = []
+    
+    for entry, candidate_id in zip(parsed, ids):
+        manifest[entry['index']].update({
+            'status': 'created',
+            'candidate_id': candidate_id,
+            'name': entry['data']['name'],
+            'email': entry['data']['email']
+        })
+        if entry['content_hash'] in warnings:
+            manifest[entry['index']]['warning'] = f"Partial extraction: {warnings[entry['content_hash']]}"
+    
+    created = sum(1 for item in manifest if item['status'] == 'created')
+    print(f"Batch completed: {created} created, {len(manifest) - created} failed")
+    print(f"{'='*60}\n")
+    
+    return jsonify({
+        'message': f'{created} of {len(manifest)} resume(s) processed',
+        'created': created,
+        'failed': len(manifest) - created,
+        'results': manifest
+    }), 200 if created else 400
+
+@app.route('/api/candidates/<int:candidate_id>/status', methods=['GET'])
+def get_candidate_status(candidate_id):
+    """Poll the resume extraction job for a candidate"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute('''
+            SELECT id, extraction_status, parse_status, parse_error, parse_attempts, parse_updated_at
+            FROM candidates WHERE id = %s
+        ''', (candidate_id,))
+        row = cursor.fetchone()
+    
+    if not row:
+        return jsonify({'error': 'Candidate not found'}), 404
+    
+    # Rows created before background parsing existed have no parse_status
+    parse_status = row['parse_status'] or PARSE_DONE
     
-    print("Invalid file type")
-    return jsonify({'error': 'Invalid file type. Please upload PDF or DOCX'}), 400
+    return jsonify({
+        'candidateId': row['id'],
+        'extractionStatus': row['extraction_status'],
+        'parseStatus': parse_status,
+        'parseError': row['parse_error'],
+        'attempts': row['parse_attempts'],
+        'updatedAt': row['parse_updated_at'],
+        'done': parse_status in (PARSE_DONE, PARSE_FAILED)
+    }), 200
 
 @app.route('/api/candidates', methods=['GET'])
 def get_candidates():
-    """List all candidates"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    """
+    List candidates, newest first, one page at a time
+
+    Query params:
+        limit: page size (default 50, max 200)
+        cursor: nextCursor from the previous page
+        status: completed | processing | pending | failed
+        q: case-insensitive substring of name, email or company
     
-    cursor.execute('''
-        SELECT id, name, email, phone, company, designation, extraction_status, upload_date
-        FROM candidates
-        ORDER BY upload_date DESC
-    ''')
+    The first page (no cursor) also carries `counts`: the total and the
+    number of candidates per status over the whole table, unfiltered.
+    """
+    try:
+        limit = int(request.args.get('limit', CANDIDATES_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    limit = max(1, min(limit, CANDIDATES_MAX_PAGE_SIZE))
+    
+    conditions = []
+    params = []
+    
+    page_cursor = request.args.get('cursor')
+    if page_cursor:
+        try:
+            after_date, after_id = decode_cursor(page_cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        conditions.append('(upload_date, id) < (%s, %s)')
+        params.extend([after_date, after_id])
+    
+    status = request.args.get('status', '').strip().lower()
+    if status and status != 'all':
+        if status not in CANDIDATE_STATUS_FILTERS:
+            return jsonify({'error': f'Unknown status filter: {status}'}), 400
+        conditions.append('extraction_status = ANY(%s)')
+        params.append(CANDIDATE_STATUS_FILTERS[status])
+    
+    search = request.args.get('q', '').strip().lower()
+    if search:
+        # Escape LIKE wildcards so the term is matched literally
+        pattern = re.sub(r'([\\%_])', r'\\\1', search)
+        conditions.append(f"{CANDIDATE_SEARCH_EXPR} LIKE %s")
+        params.append(f'%{pattern}%')
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute(f'''
+            SELECT id, name, email, phone, company, designation, extraction_status, upload_date
+            FROM candidates
+            {where}
+            ORDER BY upload_date DESC, id DESC
+            LIMIT %s
+        ''', params + [limit + 1])
+        rows = cursor.fetchall()
+        # Dashboard totals are fetched with the first page only
+        counts = None if page_cursor else candidate_counts(cursor)
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1]['upload_date'], rows[-1]['id']) if has_more else None
     
     candidates = []
-    for row in cursor.fetchall():
+    for row in rows:
         candidates.append({
             'id': row['id'],
             'name': row['name'],
@@ -321,41 +752,64 @@ def get_candidates():
             'uploadDate': row['upload_date']
         })
     
-    conn.close()
-    return jsonify(candidates), 200
+    return jsonify({
+        'candidates': candidates,
+        'nextCursor': next_cursor,
+        'hasMore': has_more,
+        'counts': counts
+    }), 200
 
 @app.route('/api/candidates/<int:candidate_id>', methods=['GET'])
 def get_candidate(candidate_id):
     """Show parsed profile with extracted data"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-    
-    # Get candidate details
-    cursor.execute('SELECT * FROM candidates WHERE id = %s', (candidate_id,))
-    candidate_row = cursor.fetchone()
+    # One round trip: child rows are aggregated into JSON columns
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute('''
+            SELECT c.*,
+                COALESCE((
+                    SELECT json_agg(s.skill ORDER BY s.id)
+                    FROM candidate_skills s WHERE s.candidate_id = c.id
+                ), '[]') AS skills,
+                COALESCE((
+                    SELECT json_object_agg(cs.field_name, cs.confidence)
+                    FROM confidence_scores cs WHERE cs.candidate_id = c.id
+                ), '{}') AS confidence,
+                COALESCE((
+                    SELECT json_agg(json_build_object(
+                        'id', d.id, 'name', d.document_name, 'type', d.document_type,
+                        'size', d.file_size, 'uploadDate', d.upload_date
+                    ) ORDER BY d.id)
+                    FROM documents d WHERE d.candidate_id = c.id
+                ), '[]') AS documents,
+                COALESCE((
+                    SELECT json_agg(json_build_object(
+                        'id', sd.id, 'documentType', sd.document_type, 'filePath', sd.file_path,
+                        'size', sd.file_size, 'submissionDate', sd.submission_date,
+                        'verificationStatus', sd.verification_status, 'extractedName', sd.extracted_name,
+                        'similarityScore', sd.similarity_score, 'verificationReason', sd.verification_reason,
+                        'extractionMethod', sd.extraction_method
+                    ) ORDER BY sd.id)
+                    FROM submitted_documents sd WHERE sd.candidate_id = c.id
+                ), '[]') AS submitted_documents
+            FROM candidates c
+            WHERE c.id = %s
+        ''', (candidate_id,))
+        candidate_row = cursor.fetchone()
     
     if not candidate_row:
-        conn.close()
         return jsonify({'error': 'Candidate not found'}), 404
     
-    # Get skills
-    cursor.execute('SELECT skill FROM candidate_skills WHERE candidate_id = %s', (candidate_id,))
-    skills = [row['skill'] for row in cursor.fetchall()]
-    
-    # Get confidence scores
-    cursor.execute('SELECT field_name, confidence FROM confidence_scores WHERE candidate_id = %s', (candidate_id,))
-    confidence = {row['field_name']: row['confidence'] for row in cursor.fetchall()}
-    
-    # Get documents
-    cursor.execute('SELECT id, document_name, document_type, file_size, upload_date FROM documents WHERE candidate_id = %s', (candidate_id,))
+    # Timestamps inside json_agg arrive as ISO strings; parse them so they
+    # serialize the same way as the top-level upload_date
     documents = []
-    for row in cursor.fetchall():
+    for row in candidate_row['documents']:
         documents.append({
             'id': row['id'],
-            'name': row['document_name'],
-            'type': row['document_type'],
-            'size': row['file_size'],
-            'uploadDate': row['upload_date'],
+            'name': row['name'],
+            'type': row['type'],
+            'size': row['size'],
+            'uploadDate': parse_db_timestamp(row['uploadDate']),
             'status': 'Uploaded'
         })
     
@@ -374,41 +828,24 @@ def get_candidate(candidate_id):
             'status': 'Uploaded'
         })
     
-    # Get PAN/Aadhaar documents with verification status
-    cursor.execute('''
-        SELECT id, document_type, file_path, submission_date, 
-               verification_status, extracted_name, similarity_score, verification_reason 
-        FROM submitted_documents 
-        WHERE candidate_id = %s
-    ''', (candidate_id,))
-    for row in cursor.fetchall():
-        file_path = row['file_path']
-        file_name = os.path.basename(file_path)
-        file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
-        
-        # Get file extension to determine type
+    # PAN/Aadhaar documents with verification status (size is recorded at submit time)
+    for row in candidate_row['submitted_documents']:
+        file_name = os.path.basename(row['filePath'])
         file_ext = os.path.splitext(file_name)[1].lower()
-        doc_type_map = {
-            '.pdf': 'application/pdf',
-            '.doc': 'application/msword',
-            '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            '.png': 'image/png',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg'
-        }
         
         submitted_documents.append({
             'id': f"submitted_{row['id']}",
             'name': file_name,
-            'type': doc_type_map.get(file_ext, 'application/octet-stream'),
-            'documentType': row['document_type'],
-            'size': file_size,
-            'uploadDate': row['submission_date'],
-            'status': row['verification_status'] or 'Submitted',
-            'verificationStatus': row['verification_status'],
-            'extractedName': row['extracted_name'],
-            'similarityScore': row['similarity_score'],
-            'verificationReason': row['verification_reason']
+            'type': DOCUMENT_MIME_TYPES.get(file_ext, 'application/octet-stream'),
+            'documentType': row['documentType'],
+            'size': row['size'] or 0,
+            'uploadDate': parse_db_timestamp(row['submissionDate']),
+            'status': row['verificationStatus'] or 'Submitted',
+            'verificationStatus': row['verificationStatus'],
+            'extractedName': row['extractedName'],
+            'similarityScore': row['similarityScore'],
+            'verificationReason': row['verificationReason'],
+            'extractionMethod': row.get('extractionMethod')
         })
     
     candidate = {
@@ -424,33 +861,28 @@ def get_candidate(candidate_id):
             'location': candidate_row['location'],
             'position': candidate_row['designation'],
             'experience': candidate_row['experience'],
-            'skills': skills,
+            'skills': candidate_row['skills'],
             'degree': candidate_row['degree'],
             'university': candidate_row['university'],
-            'confidence': confidence
+            'confidence': candidate_row['confidence']
         },
         'documents': documents,
         'submittedDocuments': submitted_documents
     }
     
-    conn.close()
     return jsonify(candidate), 200
 
 @app.route('/api/candidates/<int:candidate_id>/request-documents', methods=['POST'])
 def request_documents(candidate_id):
     """AI agent generates and sends personalized document request"""
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get candidate details
-        cursor.execute('SELECT * FROM candidates WHERE id = %s', (candidate_id,))
-        candidate = cursor.fetchone()
+        # Get candidate details (connection is released before the slow AI/SMTP call)
+        with get_db_connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor.execute('SELECT * FROM candidates WHERE id = %s', (candidate_id,))
+            candidate = cursor.fetchone()
         
         if not candidate:
-            if conn:
-                conn.close()
             return jsonify({'error': 'Candidate not found'}), 404
         
         # Convert to dict
@@ -486,26 +918,25 @@ def request_documents(candidate_id):
         # (email generation might have succeeded even if sending failed)
         if result.get('email_body'):
             try:
-                cursor.execute('''
-                    INSERT INTO document_requests (candidate_id, status, email_body)
-                    VALUES (%s, %s, %s)
-                ''', (candidate_id, 'sent' if result.get('success') else 'failed', result['email_body']))
-                
-                # Update candidate status to Pending (Documents Requested)
-                cursor.execute('''
-                    UPDATE candidates 
-                    SET extraction_status = 'Pending'
-                    WHERE id = %s
-                ''', (candidate_id,))
-                
-                conn.commit()
+                with get_db_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute('''
+                        INSERT INTO document_requests (candidate_id, status, email_body)
+                        VALUES (%s, %s, %s)
+                    ''', (candidate_id, 'sent' if result.get('success') else 'failed', result['email_body']))
+                    
+                    # Update candidate status to Pending (Documents Requested)
+                    cursor.execute('''
+                        UPDATE candidates 
+                        SET extraction_status = 'Pending'
+                        WHERE id = %s
+                    ''', (candidate_id,))
+                    
+                    conn.commit()
             except Exception as db_error:
                 print(f"Database error: {str(db_error)}")
                 # Don't fail the request if DB logging fails
         
-        if conn:
-            conn.close()
-        
         # Flask-CORS automatically adds CORS headers to all responses
         return jsonify(result), 200
         
@@ -513,8 +944,6 @@ def request_documents(candidate_id):
         print(f"Error in request_documents: {str(e)}")
         import traceback
         traceback.print_exc()
-        if conn:
-            conn.close()
         # Flask-CORS automatically adds CORS headers to all responses, including errors
         return jsonify({
             'success': False,
@@ -524,7 +953,7 @@ def request_documents(candidate_id):
 
 @app.route('/api/candidates/<int:candidate_id>/submit-documents', methods=['POST'])
 def submit_documents(candidate_id):
-    """Accept uploaded PAN/Aadhaar documents with OCR verification"""
+    """Accept uploaded PAN/Aadhaar documents; OCR verification runs in the background"""
     
     ALLOWED_DOC_EXTENSIONS = {'png', 'jpg', 'jpeg'}  # Only images allowed
     
@@ -556,226 +985,393 @@ def submit_documents(candidate_id):
     if not uploaded_files:
         return jsonify({'error': 'No valid files provided'}), 400
     
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
     
-    # Check if candidate exists and get candidate name
-    cursor.execute('SELECT * FROM candidates WHERE id = %s', (candidate_id,))
-    candidate = cursor.fetchone()
+        # Check if candidate exists and get candidate name
+        cursor.execute('SELECT * FROM candidates WHERE id = %s', (candidate_id,))
+        candidate = cursor.fetchone()
     
-    if not candidate:
-        conn.close()
-        return jsonify({'error': 'Candidate not found'}), 404
+        if not candidate:
+            return jsonify({'error': 'Candidate not found'}), 404
     
-    # Check if documents already submitted successfully
-    if candidate['documents_submitted']:
-        conn.close()
-        return jsonify({'error': 'Documents already submitted', 'already_submitted': True}), 400
+        # Check if documents already submitted successfully
+        if candidate['documents_submitted']:
+            return jsonify({'error': 'Documents already submitted', 'already_submitted': True}), 400
     
-    # Check upload attempts (max 3)
-    upload_attempts = candidate['upload_attempts'] or 0
-    if upload_attempts >= 3:
-        conn.close()
-        return jsonify({
-            'error': 'Maximum upload attempts exceeded. Please contact the administrator.',
-            'max_attempts_reached': True
-        }), 403
-    
-    candidate_name = candidate['name']
-    documents_uploaded = []
-    errors = []
-    
-    # Create documents directory using candidate name and ID
-    # Sanitize name for use in folder path
-    safe_name = re.sub(r'[^\w\s-]', '', candidate_name).strip().replace(' ', '_')
-    folder_name = f"{candidate_id}_{safe_name}"
-    docs_dir = os.path.join(UPLOAD_FOLDER, 'documents', folder_name)
-    os.makedirs(docs_dir, exist_ok=True)
-    
-    print(f"Saving documents to: {docs_dir}")
-    
-    # Track which document types we've already processed
-    processed_types = set()
-    
-    # Process all uploaded files
-    for idx, (field_name, file) in enumerate(uploaded_files):
-        if not allowed_document_file(file.filename):
-            errors.append(f"{file.filename}: Invalid file type. Allowed: PDF, DOC, DOCX, PNG, JPEG")
-            continue
-        
-        # Detect document type from filename or field name
-        doc_type = detect_document_type(file.filename) or detect_document_type(field_name)
+        # Check upload attempts (max 3)
+        upload_attempts = candidate['upload_attempts'] or 0
+        if upload_attempts >= 3:
+            return jsonify({
+                'error': 'Maximum upload attempts exceeded. Please contact the administrator.',
+                'max_attempts_reached': True
+            }), 403
+    
+        candidate_name = candidate['name']
+        documents_uploaded = []
+        errors = []
+    
+        # Create documents directory using candidate name and ID
+        # Sanitize name for use in folder path
+        safe_name = re.sub(r'[^\w\s-]', '', candidate_name).strip().replace(' ', '_')
+        folder_name = f"{candidate_id}_{safe_name}"
+        docs_dir = os.path.join(UPLOAD_FOLDER, 'documents', folder_name)
+        os.makedirs(docs_dir, exist_ok=True)
+    
+        print(f"Saving documents to: {docs_dir}")
+    
+        # Type hints from the filename or field name; the verification job
+        # corrects them from the images themselves
+        detected_types = {idx: detect_document_type(file.filename) or detect_document_type(field_name)
+                          for idx, (field_name, file) in enumerate(uploaded_files)}
+    
+        # Track which document types we've already processed
+        processed_types = set()
+        # Files saved by this request, removed again if the submission is rejected
+        saved_paths = []
+    
+        def discard_submission():
+            """Drop this request's Pending rows and files; the next submission's job would pick them up"""
+            conn.rollback()
+            for path in saved_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+    
+        # Process all uploaded files
+        try:
+            for idx, (field_name, file) in enumerate(uploaded_files):
+                if not allowed_document_file(file.filename):
+                    errors.append(f"{file.filename}: Invalid file type. Allowed: PDF, DOC, DOCX, PNG, JPEG")
+                    continue
         
-        # If still can't detect, assign based on order
-        if not doc_type:
-            if 'PAN Card' not in processed_types:
-                doc_type = 'PAN Card'
-            elif 'Aadhaar Card' not in processed_types:
-                doc_type = 'Aadhaar Card'
-            else:
-                doc_type = f'Document {idx + 1}'
+                doc_type = detected_types[idx]
         
-        # Create filename
-        doc_prefix = doc_type.lower().replace(' ', '_')
-        filename = secure_filename(f"{doc_prefix}_{candidate_id}_{file.filename}")
-        filepath = os.path.join(docs_dir, filename)
-        file.save(filepath)
+                # If still can't detect, assign based on order (skipping types hinted for other files)
+                if not doc_type:
+                    claimed = processed_types | set(detected_types.values())
+                    if 'PAN Card' not in claimed:
+                        doc_type = 'PAN Card'
+                    elif 'Aadhaar Card' not in claimed:
+                        doc_type = 'Aadhaar Card'
+                    else:
+                        doc_type = f'Document {idx + 1}'
         
-        # No verification - just mark as uploaded
-        verification_result = {
-            'status': 'Pass',
-            'extracted_name': 'Not verified',
-            'similarity_score': None,
-            'reason': 'Document uploaded successfully (no validation)'
-        }
+                # Create filename
+                doc_prefix = doc_type.lower().replace(' ', '_')
+                filename = secure_filename(f"{doc_prefix}_{candidate_id}_{file.filename}")
+                filepath = os.path.join(docs_dir, filename)
+                file.save(filepath)
+                saved_paths.append(filepath)
+                file_size = os.path.getsize(filepath)
         
-        # # Commented out: Original verification logic
-        # # Verify document using OCR (only for PAN and Aadhaar)
-        # if doc_type in ['PAN Card', 'Aadhaar Card']:
-        #     try:
-        #         verification_result = doc_verifier.verify_document(
-        #             filepath, 
-        #             doc_type, 
-        #             candidate_name,
-        #             threshold=0.6  # 60% similarity threshold
-        #         )
-        #     except Exception as e:
-        #         print(f"Verification error for {doc_type}: {e}")
-        #         verification_result = {
-        #             'status': 'Verification Failed',
-        #             'extracted_name': None,
-        #             'similarity_score': 0.0,
-        #             'reason': f'Verification error: {str(e)}'
-        #         }
-        # else:
-        #     # For other documents, mark as uploaded without verification
-        #     verification_result = {
-        #         'status': 'Uploaded',
-        #         'extracted_name': None,
-        #         'similarity_score': None,
-        #         'reason': 'No verification required'
-        #     }
+                # Verified in the background once the submission is stored
+                verification_result = {
+                    'status': VERIFICATION_PENDING,
+                    'extracted_name': None,
+                    'similarity_score': None,
+                    'reason': 'Queued for verification'
+                }
         
-        # Store in database with verification status
-        cursor.execute('''
-            INSERT INTO submitted_documents 
-            (candidate_id, document_type, file_path, verification_status, extracted_name, similarity_score, verification_reason)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        ''', (
-            candidate_id, 
-            doc_type, 
-            filepath,
-            verification_result['status'],
-            verification_result['extracted_name'],
-            verification_result['similarity_score'],
-            verification_result['reason']
-        ))
+                # Store in database with verification status
+                cursor.execute('''
+                    INSERT INTO submitted_documents 
+                    (candidate_id, document_type, file_path, file_size, verification_status, extracted_name, similarity_score, verification_reason, extraction_method)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ''', (
+                    candidate_id, 
+                    doc_type, 
+                    filepath,
+                    file_size,
+                    verification_result['status'],
+                    verification_result['extracted_name'],
+                    verification_result['similarity_score'],
+                    verification_result['reason'],
+                    verification_result.get('extraction_method')
+                ))
         
-        documents_uploaded.append({
-            'type': doc_type,
-            'filename': filename,
-            'size': os.path.getsize(filepath),
-            'verification_status': verification_result['status'],
-            'extracted_name': verification_result['extracted_name'],
-            'similarity_score': verification_result['similarity_score']
-        })
+                documents_uploaded.append({
+                    'type': doc_type,
+                    'filename': filename,
+                    'size': file_size,
+                    'verification_status': verification_result['status'],
+                    'extracted_name': verification_result['extracted_name'],
+                    'similarity_score': verification_result['similarity_score']
+                })
         
-        processed_types.add(doc_type)
+                processed_types.add(doc_type)
+        except Exception:
+            discard_submission()
+            raise
     
-    if errors:
-        # Increment upload attempts on failure
-        cursor.execute('''
-            UPDATE candidates 
-            SET upload_attempts = upload_attempts + 1
-            WHERE id = %s
-        ''', (candidate_id,))
-        conn.commit()
+        if errors:
+            discard_submission()
+            # Increment upload attempts on failure
+            cursor.execute('''
+                UPDATE candidates 
+                SET upload_attempts = upload_attempts + 1
+                WHERE id = %s
+            ''', (candidate_id,))
+            conn.commit()
         
-        # Get updated attempts count
-        cursor.execute('SELECT upload_attempts FROM candidates WHERE id = %s', (candidate_id,))
-        current_attempts = cursor.fetchone()['upload_attempts']
+            # Get updated attempts count
+            cursor.execute('SELECT upload_attempts FROM candidates WHERE id = %s', (candidate_id,))
+            current_attempts = cursor.fetchone()['upload_attempts']
         
-        conn.close()
         
-        error_response = {
-            'error': ', '.join(errors),
-            'upload_attempts': current_attempts,
-            'remaining_attempts': 3 - current_attempts
-        }
+            error_response = {
+                'error': ', '.join(errors),
+                'upload_attempts': current_attempts,
+                'remaining_attempts': 3 - current_attempts
+            }
         
-        if current_attempts >= 3:
-            error_response['max_attempts_reached'] = True
-            error_response['error'] = error_response['error'] + '. Please contact the administrator.'
+            if current_attempts >= 3:
+                error_response['max_attempts_reached'] = True
+                error_response['error'] = error_response['error'] + '. Please contact the administrator.'
         
-        return jsonify(error_response), 400
+            return jsonify(error_response), 400
     
-    if not documents_uploaded:
-        # Increment upload attempts on failure
-        cursor.execute('''
-            UPDATE candidates 
-            SET upload_attempts = upload_attempts + 1
-            WHERE id = %s
-        ''', (candidate_id,))
-        conn.commit()
+        if not documents_uploaded:
+            # Increment upload attempts on failure
+            cursor.execute('''
+                UPDATE candidates 
+                SET upload_attempts = upload_attempts + 1
+                WHERE id = %s
+            ''', (candidate_id,))
+            conn.commit()
         
-        # Get updated attempts count
-        cursor.execute('SELECT upload_attempts FROM candidates WHERE id = %s', (candidate_id,))
-        current_attempts = cursor.fetchone()['upload_attempts']
+            # Get updated attempts count
+            cursor.execute('SELECT upload_attempts FROM candidates WHERE id = %s', (candidate_id,))
+            current_attempts = cursor.fetchone()['upload_attempts']
         
-        conn.close()
         
-        error_response = {
-            'error': 'No valid documents uploaded',
-            'upload_attempts': current_attempts,
-            'remaining_attempts': 3 - current_attempts
-        }
+            error_response = {
+                'error': 'No valid documents uploaded',
+                'upload_attempts': current_attempts,
+                'remaining_attempts': 3 - current_attempts
+            }
         
-        if current_attempts >= 3:
-            error_response['max_attempts_reached'] = True
-            error_response['error'] = 'No valid documents uploaded. Please contact the administrator.'
+            if current_attempts >= 3:
+                error_response['max_attempts_reached'] = True
+                error_response['error'] = 'No valid documents uploaded. Please contact the administrator.'
         
-        return jsonify(error_response), 400
-    
-    # No validation - always mark as completed
-    extraction_status = 'Completed'
+            return jsonify(error_response), 400
     
-    # # Commented out: Original validation logic
-    # # Update candidate status based on verification results
-    # all_passed = all(doc['verification_status'] == 'Pass' for doc in documents_uploaded)
-    # extraction_status = 'Completed' if all_passed else 'Verification Failed'
+        # Mark documents as submitted and queue their verification; the
+        # job sets extraction_status once every document has a result
+        extraction_status = 'Processing'
+        cursor.execute('''
+            UPDATE candidates 
+            SET extraction_status = %s, documents_submitted = TRUE,
+                verify_status = %s, verify_attempts = 1, verify_error = NULL,
+                verify_updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        ''', (extraction_status, VERIFY_QUEUED, candidate_id))
     
-    # Mark documents as successfully submitted
-    cursor.execute('''
-        UPDATE candidates 
-        SET extraction_status = %s, documents_submitted = TRUE
-        WHERE id = %s
-    ''', (extraction_status, candidate_id))
+        conn.commit()
     
-    conn.commit()
-    conn.close()
+    # A full backlog defers the job: the next recovery sweep with a free worker claims it
+    verification_queue.submit_or_defer(candidate_id)
     
     return jsonify({
-        'message': 'Documents uploaded and verified successfully',
+        'message': 'Documents uploaded; verification in progress',
         'documents': documents_uploaded,
         'overall_status': extraction_status,
+        'status_url': f'/api/candidates/{candidate_id}/verification',
         'submission_completed': True
+    }), 202
+
+@app.route('/api/candidates/<int:candidate_id>/verification', methods=['GET'])
+def get_verification_status(candidate_id):
+    """Poll the document verification job for a candidate"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute('''
+            SELECT id, extraction_status, verify_status, verify_error, verify_attempts, verify_updated_at
+            FROM candidates WHERE id = %s
+        ''', (candidate_id,))
+        row = cursor.fetchone()
+        if not row:
+            return jsonify({'error': 'Candidate not found'}), 404
+        cursor.execute('''
+            SELECT id, document_type, verification_status, extracted_name, similarity_score,
+                   verification_reason, extraction_method
+            FROM submitted_documents WHERE candidate_id = %s ORDER BY id
+        ''', (candidate_id,))
+        documents = cursor.fetchall()
+    
+    return jsonify({
+        'candidateId': row['id'],
+        'extractionStatus': row['extraction_status'],
+        'verifyStatus': row['verify_status'],
+        'verifyError': row['verify_error'],
+        'attempts': row['verify_attempts'],
+        'updatedAt': row['verify_updated_at'],
+        'done': row['verify_status'] in (VERIFY_DONE, VERIFY_FAILED),
+        'documents': [{
+            'id': doc['id'],
+            'documentType': doc['document_type'],
+            'verificationStatus': doc['verification_status'],
+            'extractedName': doc['extracted_name'],
+            'similarityScore': doc['similarity_score'],
+            'verificationReason': doc['verification_reason'],
+            'extractionMethod': doc['extraction_method']
+        } for doc in documents]
     }), 200
 
-@app.route('/api/candidates/<int:candidate_id>/documents/debug', methods=['GET'])
-def debug_documents(candidate_id):
-    """Debug endpoint to check what documents exist"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+_name_index = None
+_name_index_built_at = 0.0
+_name_index_refreshing = False
+_name_index_lock = threading.Lock()
+# Held only while building the first index, so concurrent first requests build it once
+_name_index_build_lock = threading.Lock()
+
+def _build_candidate_name_index():
+    global _name_index, _name_index_built_at
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, name FROM candidates WHERE name IS NOT NULL')
+        index = NameIndex(cursor.fetchall())
+    with _name_index_lock:
+        _name_index = index
+        _name_index_built_at = time.monotonic()
+    return index
+
+def _refresh_candidate_name_index():
+    global _name_index_refreshing
+    try:
+        _build_candidate_name_index()
+    except Exception as e:
+        print(f"Could not rebuild the candidate name index: {e}")
+    finally:
+        with _name_index_lock:
+            _name_index_refreshing = False
+
+def get_candidate_name_index():
+    """
+    NameIndex over every candidate's name
     
-    # Get all documents from documents table
-    cursor.execute('SELECT * FROM documents WHERE candidate_id = %s', (candidate_id,))
-    resume_docs = [dict(row) for row in cursor.fetchall()]
+    The first call builds it. Once it is older than NAME_INDEX_TTL seconds a
+    background thread rebuilds it, and requests keep using the old index
+    until the new one is ready.
+    """
+    global _name_index_refreshing
+    with _name_index_lock:
+        index = _name_index
+        if index is not None and not _name_index_refreshing \
+                and time.monotonic() - _name_index_built_at > NAME_INDEX_TTL:
+            _name_index_refreshing = True
+            threading.Thread(target=_refresh_candidate_name_index, name='name-index-refresh',
+                             daemon=True).start()
+    if index is not None:
+        return index
+    with _name_index_build_lock:
+        if _name_index is None:
+            return _build_candidate_name_index()
+        return _name_index
+
+@app.route('/api/candidates/<int:candidate_id>/name-matches', methods=['GET'])
+def get_name_matches(candidate_id):
+    """
+    Other candidates whose name matches a name read from this candidate's documents
     
-    # Get all submitted documents
-    cursor.execute('SELECT * FROM submitted_documents WHERE candidate_id = %s', (candidate_id,))
-    submitted_docs = [dict(row) for row in cursor.fetchall()]
+    Query: min_score (default 0.85), limit per document (1-100, default 10)
+    """
+    min_score = request.args.get('min_score', 0.85, type=float)
+    limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute('SELECT id FROM candidates WHERE id = %s', (candidate_id,))
+        if not cursor.fetchone():
+            return jsonify({'error': 'Candidate not found'}), 404
+        cursor.execute('''
+            SELECT id, document_type, extracted_name FROM submitted_documents
+            WHERE candidate_id = %s AND extracted_name IS NOT NULL
+              AND extracted_name <> 'Not verified'  -- placeholder from before background verification
+            ORDER BY id
+        ''', (candidate_id,))
+        documents = cursor.fetchall()
     
-    conn.close()
+    index = get_candidate_name_index()
+    results = []
+    for doc in documents:
+        matches = index.search(doc['extracted_name'], limit=limit, min_score=min_score, exclude=candidate_id)
+        results.append({
+            'documentId': doc['id'],
+            'documentType': doc['document_type'],
+            'extractedName': doc['extracted_name'],
+            'matches': [{'candidateId': key, 'name': name, 'score': round(score, 3)}
+                        for key, name, score in matches]
+        })
+    
+    return jsonify({
+        'candidateId': candidate_id,
+        'indexedCandidates': len(index),
+        'documents': results
+    }), 200
+
+@app.route('/api/candidates/<int:candidate_id>/identity-reuse', methods=['GET'])
+def get_identity_reuse(candidate_id):
+    """Other candidates who submitted the same PAN/Aadhaar number as this candidate"""
+    if not identity_numbers.enabled():
+        return jsonify({'error': 'Identity number checks are not configured (IDENTITY_HASH_KEY)'}), 503
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT 1 FROM candidates WHERE id = %s', (candidate_id,))
+        if not cursor.fetchone():
+            return jsonify({'error': 'Candidate not found'}), 404
+        cursor.execute('SELECT number_type, number_last4 FROM identity_numbers WHERE candidate_id = %s ORDER BY id',
+                       (candidate_id,))
+        numbers = cursor.fetchall()
+        reuse = identity_numbers.find_reuse(cursor, candidate_id)
+    
+    return jsonify({
+        'candidateId': candidate_id,
+        'numbers': [{'type': number_type, 'last4': last4} for number_type, last4 in numbers],
+        'reused': bool(reuse),
+        'matches': [{'type': number_type, 'last4': last4, 'candidateId': other_id, 'name': other_name}
+                    for number_type, last4, other_id, other_name in reuse]
+    }), 200
+
+@app.route('/api/identity-numbers/lookup', methods=['POST'])
+def lookup_identity_number():
+    """
+    Candidates who submitted a given PAN/Aadhaar number
+    
+    Body: {"type": "PAN" | "AADHAAR", "number": "..."} (POST so the number
+    stays out of URLs and access logs)
+    """
+    if not identity_numbers.enabled():
+        return jsonify({'error': 'Identity number checks are not configured (IDENTITY_HASH_KEY)'}), 503
+    data = request.get_json(silent=True) or {}
+    number_type = str(data.get('type', '')).upper()
+    number = str(data.get('number', ''))
+    if number_type not in identity_numbers.NUMBER_TYPES.values():
+        return jsonify({'error': 'type must be PAN or AADHAAR'}), 400
+    if not identity_numbers.normalize_number(number_type, number):
+        return jsonify({'error': 'number is required'}), 400
+    
+    with get_db_connection() as conn:
+        candidate_ids = identity_numbers.find_candidates(conn.cursor(), number_type, number)
+    
+    return jsonify({
+        'type': number_type,
+        'candidateIds': candidate_ids,
+        'reused': len(candidate_ids) > 1
+    }), 200
+
+@app.route('/api/candidates/<int:candidate_id>/documents/debug', methods=['GET'])
+def debug_documents(candidate_id):
+    """Debug endpoint to check what documents exist"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        
+        # Get all documents from documents table
+        cursor.execute('SELECT * FROM documents WHERE candidate_id = %s', (candidate_id,))
+        resume_docs = [dict(row) for row in cursor.fetchall()]
+        
+        # Get all submitted documents
+        cursor.execute('SELECT * FROM submitted_documents WHERE candidate_id = %s', (candidate_id,))
+        submitted_docs = [dict(row) for row in cursor.fetchall()]
     
     return jsonify({
         'candidate_id': candidate_id,
@@ -787,13 +1383,10 @@ def debug_documents(candidate_id):
 @app.route('/upload-documents/<int:candidate_id>', methods=['GET'])
 def upload_documents_page(candidate_id):
     """Serve document upload page for candidates"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-    
-    cursor.execute('SELECT * FROM candidates WHERE id = %s', (candidate_id,))
-    candidate = cursor.fetchone()
-    
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute('SELECT * FROM candidates WHERE id = %s', (candidate_id,))
+        candidate = cursor.fetchone()
     
     if not candidate:
         return "Candidate not found", 404
@@ -815,7 +1408,16 @@ def health_check():
     return jsonify({
         'status': 'healthy', 
         'message': 'Backend is running',
-        'cors_enabled': True
+        'cors_enabled': True,
+        'db_pool': db_pool.stats(),
+        'resume_queue': resume_queue.stats(),
+        'verification_queue': verification_queue.stats(),
+        'parse_workers': get_parse_pool().stats(),
+        'uploads': upload_stats.stats(),
+        'ocr_pool': doc_verifier.ocr_pool.stats(),
+        'document_extraction': doc_verifier.stats(),
+        'document_classification': document_classifier.stats(),
+        'ocr_cache': doc_verifier.ocr_cache.stats()
     }), 200
 
 @app.route('/api/cors-test', methods=['GET', 'POST', 'OPTIONS'])
@@ -827,6 +1429,10 @@ def cors_test():
         'method': request.method
     }), 200
 
+# Start parser/verifier workers and the sweeps that re-queue jobs abandoned by crashed processes
+resume_queue.start()
+verification_queue.start()
+
 if __name__ == '__main__':
     init_db()
     print("Database initialized successfully!")
@@ -0,0 +1,120 @@
+"""
+Backfill identity_numbers from documents already in uploads/documents/
+
+Walks uploads/documents/<candidate id>_<name>/ for PAN/Aadhaar files (typed
+by their submitted_documents row, which the verification job may have
+corrected; files without one by the pan_card_* / aadhaar_card_* name
+submit_documents gave them), extracts their numbers in
+batches (card images share tesseract runs, and OCR results come from the OCR
+cache when the documents were verified before) and stores them as keyed
+hashes. Safe to re-run: numbers already stored are skipped by the table's
+unique constraint.
+
+Usage (from task_backend/, with DATABASE_URL and IDENTITY_HASH_KEY set):
+    python backfill_identity_numbers.py [--batch-size 64] [--documents-dir DIR]
+"""
+import argparse
+import os
+import re
+import sys
+
+import psycopg2
+
+import identity_numbers
+from parsers.document_verifier import DocumentVerifier
+
+DOCUMENTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'documents')
+# Filename prefixes submit_documents gives each document type
+DOCUMENT_PREFIXES = {document_type.lower().replace(' ', '_') + '_': document_type
+                     for document_type in identity_numbers.NUMBER_TYPES}
+
+
+def iter_document_files(documents_dir, stored_types=None):
+    """
+    (candidate_id, document_type, file_path) for each PAN/Aadhaar file
+
+    stored_types: {absolute file path: submitted_documents.document_type};
+        a stored type wins over the filename prefix, which is left as uploaded
+        when the classifier corrects the type
+    """
+    stored_types = stored_types or {}
+    for folder in sorted(os.listdir(documents_dir)):
+        match = re.match(r'(\d+)_', folder)
+        folder_path = os.path.join(documents_dir, folder)
+        if not match or not os.path.isdir(folder_path):
+            continue
+        for name in sorted(os.listdir(folder_path)):
+            file_path = os.path.abspath(os.path.join(folder_path, name))
+            if file_path in stored_types:
+                document_type = stored_types[file_path]
+            else:
+                prefix = next((prefix for prefix in DOCUMENT_PREFIXES if name.lower().startswith(prefix)), None)
+                document_type = DOCUMENT_PREFIXES.get(prefix)
+            if document_type in identity_numbers.NUMBER_TYPES:
+                yield int(match.group(1)), document_type, file_path
+
+
+def backfill(conn, verifier, documents_dir=DOCUMENTS_DIR, batch_size=64):
+    """
+    Returns:
+        (files read, numbers found, numbers stored)
+    """
+    cursor = conn.cursor()
+    identity_numbers.create_table(cursor)
+    cursor.execute('SELECT id FROM candidates')
+    candidate_ids = {row[0] for row in cursor.fetchall()}
+    cursor.execute('SELECT id, file_path, document_type FROM submitted_documents WHERE file_path IS NOT NULL')
+    documents = cursor.fetchall()
+    document_ids = {os.path.abspath(file_path): doc_id for doc_id, file_path, _ in documents}
+    stored_types = {os.path.abspath(file_path): document_type for _, file_path, document_type in documents}
+    conn.commit()
+
+    files = [entry for entry in iter_document_files(documents_dir, stored_types) if entry[0] in candidate_ids]
+    found = stored = 0
+    for start in range(0, len(files), batch_size):
+        batch = files[start:start + batch_size]
+        numbers = verifier.extract_identity_numbers([(file_path, document_type)
+                                                     for _, document_type, file_path in batch])
+        rows = [(candidate_id, document_ids.get(file_path), document_type, number)
+                for (candidate_id, document_type, file_path), number in zip(batch, numbers) if number]
+        found += len(rows)
+        stored += identity_numbers.record_numbers(cursor, rows)
+        conn.commit()
+        print(f"{min(start + batch_size, len(files))}/{len(files)} files: "
+              f"{found} numbers found, {stored} new")
+    return len(files), found, stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--documents-dir', default=DOCUMENTS_DIR)
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    if not identity_numbers.enabled():
+        sys.exit('IDENTITY_HASH_KEY is not set')
+    if not os.environ.get('DATABASE_URL'):
+        sys.exit('DATABASE_URL is not set')
+    if not os.path.isdir(args.documents_dir):
+        sys.exit(f'No documents directory at {args.documents_dir}')
+
+    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+    try:
+        files, found, stored = backfill(conn, DocumentVerifier(), args.documents_dir, args.batch_size)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT count(*) FROM (
+                SELECT 1 FROM identity_numbers
+                GROUP BY number_type, number_hash
+                HAVING count(DISTINCT candidate_id) > 1
+            ) shared
+        ''')
+        shared = cursor.fetchone()[0]
+    finally:
+        conn.close()
+    print(f"Backfill complete: {files} files, {found} numbers found, {stored} stored; "
+          f"{shared} numbers are shared by more than one candidate")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Bulk resume ingestion: parallel parsing across CPU cores and batched inserts
+"""
+import os
+import zipfile
+
+from psycopg2.extras import execute_values
+
+from parse_workers import get_parse_pool
+from resume_jobs import PARSE_DONE
+
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 500))
+# Guard against zip bombs: total bytes we are willing to extract from one archive
+BATCH_MAX_EXTRACTED_BYTES = 512 * 1024 * 1024
+# Small files in a batch are parsed from memory, up to this many bytes in total
+BATCH_MAX_IN_MEMORY_BYTES = 64 * 1024 * 1024
+
+
+def parse_resumes(filepaths, contents=None):
+    """
+    Parse many resumes in parallel
+
+    Each file gets the parse pool's per-document deadline and memory cap.
+    contents optionally gives bytes already in memory (None per file to
+    read it from disk).
+
+    Returns:
+        List of (extracted_data, error) tuples in the same order as filepaths;
+        both are set for a partial result (see ParseWorkerPool.parse)
+    """
+    return get_parse_pool().map(filepaths, contents)
+
+
+def iter_zip_resumes(archive, allowed_extensions):
+    """
+    Yield (member_name, bytes) for resume files inside a zip archive
+
+    Directories, hidden files and unsupported extensions are skipped.
+    Raises ValueError if the archive exceeds the file-count or size limits.
+    """
+    with zipfile.ZipFile(archive) as zf:
+        members = [
+            info for info in zf.infolist()
+            if not info.is_dir()
+            and not os.path.basename(info.filename).startswith('.')
+            and '.' in info.filename
+            and info.filename.rsplit('.', 1)[1].lower() in allowed_extensions
+        ]
+        if len(members) > BATCH_MAX_FILES:
+            raise ValueError(f'Archive contains {len(members)} resumes (max {BATCH_MAX_FILES})')
+        if sum(info.file_size for info in members) > BATCH_MAX_EXTRACTED_BYTES:
+            raise ValueError('Archive is too large to extract')
+        for info in members:
+            yield os.path.basename(info.filename), zf.read(info)
+
+
+def store_candidates(conn, entries):
+    """
+    Insert parsed candidates, their skills, confidence scores and resume
+    documents with one multi-row INSERT per table (single transaction)
+
+    Args:
+        entries: list of dicts with 'filename', 'original_name', 'filepath',
+            'content_type', 'size', 'content_hash' and 'data'
+            (ResumeParser.extract_data output)
+
+    Returns:
+        List of candidate ids, in the same order as entries
+    """
+    if not entries:
+        return []
+
+    cursor = conn.cursor()
+    # Allocate ids up front: deduplicated uploads share a stored filename,
+    # so RETURNING rows could not be matched back to entries by filename
+    cursor.execute("SELECT nextval(pg_get_serial_sequence('candidates', 'id')) FROM generate_series(1, %s)",
+                   (len(entries),))
+    ids = [row[0] for row in cursor.fetchall()]
+
+    execute_values(cursor, '''
+        INSERT INTO candidates
+        (id, name, email, phone, company, designation, location, experience, degree, university,
+         extraction_status, resume_filename, resume_hash, parse_status, parse_attempts, parse_updated_at)
+        VALUES %s
+    ''', [(
+        candidate_id,
+        entry['data']['name'],
+        entry['data']['email'],
+        entry['data']['phone'],
+        entry['data']['company'],
+        entry['data']['designation'],
+        entry['data']['location'],
+        entry['data']['experience'],
+        entry['data']['degree'],
+        entry['data']['university'],
+        'Processing',
+        entry['filename'],
+        entry.get('content_hash'),
+        PARSE_DONE,
+        1,
+    ) for candidate_id, entry in zip(ids, entries)],
+        template='(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)')
+
+    skills = []
+    confidence = []
+    documents = []
+    for candidate_id, entry in zip(ids, entries):
+        skills.extend((candidate_id, skill) for skill in entry['data'].get('skills', []))
+        confidence.extend((candidate_id, field_name, score)
+                          for field_name, score in entry['data'].get('confidence', {}).items())
+        documents.append((candidate_id, entry['original_name'], entry['content_type'],
+                          entry['size'], entry['filepath']))
+
+    if skills:
+        execute_values(cursor, 'INSERT INTO candidate_skills (candidate_id, skill) VALUES %s', skills)
+    if confidence:
+        execute_values(cursor, 'INSERT INTO confidence_scores (candidate_id, field_name, confidence) VALUES %s',
+                       confidence)
+    execute_values(cursor, '''
+        INSERT INTO documents (candidate_id, document_name, document_type, file_size, file_path)
+        VALUES %s
+    ''', documents)
+
+    return ids
@@ -0,0 +1,377 @@
+"""
+DocumentVerifier benchmark
+
+Builds a synthetic PAN/Aadhaar corpus (benchmarks/id_card_corpus.py), then
+measures:
+  - per-stage latency, run in-process one document at a time: decode or
+    rasterize, preprocess, OCR of each region / page, field extraction
+  - pipeline throughput: verify_documents(), reading names and numbers
+    through a fresh OCR pool, as pages/s and wall, parent and child CPU time
+  - accuracy against the ground truth: whether OCR read the name at all,
+    whether the name and number were extracted exactly, and the share of
+    cards that verify against the candidate's name
+
+The OCR cache is disabled throughout, so every pass really runs tesseract.
+Results are written as JSON so an OCR speedup can be checked against its
+accuracy cost.
+
+Usage (from task_backend/, with tesseract and poppler installed):
+    python -m benchmarks.bench_document_verifier --count 48 --output cards.json
+    python -m benchmarks.bench_document_verifier --compare cards.json --output new.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pytesseract
+from pdf2image import convert_from_path
+from PIL import Image
+from PyPDF2 import PdfReader
+
+from parsers.document_verifier import DocumentVerifier
+from parsers.name_matcher import normalize_name
+from parsers.ocr_cache import OcrCache
+from parsers.ocr_pool import OcrPool, OCR_WORKERS
+from parsers.ocr_preprocess import OCR_PROFILES, PREPROCESS_VERSION, preprocess, crop_region
+from benchmarks.bench_resume_parser import summarize, _git_revision
+from benchmarks.id_card_corpus import build_corpus, FORMATS, DOCUMENT_TYPES
+
+IMAGE_STAGES = ('decode', 'preprocess', 'ocr_name', 'ocr_number', 'extract')
+PDF_STAGES = ('text_layer', 'rasterize', 'preprocess', 'ocr_page', 'extract')
+# Variant fields accuracy is broken down by
+BREAKDOWNS = ('document_type', 'format', 'dpi', 'capture', 'noise')
+METRICS = ('name_in_text', 'name_extracted', 'number_extracted', 'verified')
+
+
+def _cpu_seconds():
+    """(this process, waited-for children incl. tesseract) user+system CPU seconds"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime
+
+
+def _timed(fn):
+    """(result, elapsed ms)"""
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def _stage_image(entry, verifier, timings):
+    """Time one card image stage by stage, as a worker reads it; returns the name region's text"""
+    regions = OCR_PROFILES[entry['document_type']]
+
+    def decode():
+        image = Image.open(entry['path'])
+        image.load()
+        return image
+
+    image, elapsed = _timed(decode)
+    timings['decode'].append(elapsed)
+    image, elapsed = _timed(lambda: preprocess(image))
+    timings['preprocess'].append(elapsed)
+    texts = {}
+    for field in ('name', 'number'):
+        region = regions[field]
+        texts[field], elapsed = _timed(
+            lambda: pytesseract.image_to_string(crop_region(image, region.box), config=region.config))
+        timings[f'ocr_{field}'].append(elapsed)
+    _, elapsed = _timed(lambda: (verifier.extract_name(texts['name'], entry['document_type']),
+                                 verifier.extract_identity_number(texts['number'], entry['document_type'])))
+    timings['extract'].append(elapsed)
+    return texts['name']
+
+
+def _stage_pdf(entry, verifier, timings):
+    """Time one PDF stage by stage, as _extract_pdf() reads it; returns the page text"""
+
+    def text_layer():
+        reader = PdfReader(entry['path'])
+        page_sizes = [(float(page.mediabox.width), float(page.mediabox.height)) for page in reader.pages]
+        return page_sizes, "".join((page.extract_text() or "") + "\n" for page in reader.pages)
+
+    (page_sizes, text), elapsed = _timed(text_layer)
+    timings['text_layer'].append(elapsed)
+    if verifier.is_usable_text(text):
+        return text
+
+    pages, elapsed = _timed(lambda: convert_from_path(entry['path'], dpi=verifier.render_dpi(page_sizes),
+                                                      grayscale=True))
+    timings['rasterize'].append(elapsed)
+    pages, elapsed = _timed(lambda: [preprocess(page) for page in pages])
+    timings['preprocess'].append(elapsed)
+    text, elapsed = _timed(lambda: "".join(pytesseract.image_to_string(page) + "\n" for page in pages))
+    timings['ocr_page'].append(elapsed)
+    _, elapsed = _timed(lambda: (verifier.extract_name(text, entry['document_type']),
+                                 verifier.extract_identity_number(text, entry['document_type'])))
+    timings['extract'].append(elapsed)
+    return text
+
+
+def bench_stages(corpus, repeat, verifier):
+    """
+    Per-stage latency, by format, plus CPU time for the whole pass
+
+    Runs in this process (tesseract subprocesses are waited for, so their
+    CPU time is counted) one document at a time, so each timing is that
+    stage's own cost.
+
+    Returns:
+        (report, {path: name-region or page text from the last pass})
+    """
+    timings = {}
+    texts = {}
+    cpu_before = _cpu_seconds()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for entry in corpus:
+            if entry['format'] == 'pdf':
+                stages = timings.setdefault('pdf', {stage: [] for stage in PDF_STAGES})
+                texts[entry['path']] = _stage_pdf(entry, verifier, stages)
+            else:
+                stages = timings.setdefault('image', {stage: [] for stage in IMAGE_STAGES})
+                texts[entry['path']] = _stage_image(entry, verifier, stages)
+    wall_s = time.perf_counter() - start
+    cpu_after = _cpu_seconds()
+
+    pages = len(corpus) * repeat
+    report = {kind: {stage: summarize(samples) for stage, samples in stages.items()}
+              for kind, stages in timings.items()}
+    report['pages'] = pages
+    report['wall_s'] = round(wall_s, 3)
+    report['pages_per_s'] = round(pages / wall_s, 2) if wall_s else None
+    report['cpu_s'] = round(sum(cpu_after) - sum(cpu_before), 3)
+    return report, texts
+
+
+def bench_pipeline(corpus, repeat, workers, batch_size, threshold):
+    """
+    verify_documents() with read_numbers over the corpus in batches, as the verification job runs it
+
+    Each pass uses a fresh OCR pool (worker start-up included) and joins it
+    afterwards, so the workers' and their tesseract processes' CPU time is
+    counted.
+
+    Returns:
+        (report, per-document results of the last pass)
+    """
+    passes = []
+    for _ in range(repeat):
+        pool = OcrPool(max_workers=workers)
+        verifier = DocumentVerifier(ocr_pool=pool, ocr_cache=OcrCache(max_bytes=0))
+        verify_ms = 0.0
+        results = []
+        cpu_before = _cpu_seconds()
+        # verify_document() logs every step
+        with contextlib.redirect_stdout(io.StringIO()):
+            for start in range(0, len(corpus), batch_size):
+                batch = corpus[start:start + batch_size]
+                batch_results, elapsed = _timed(lambda: verifier.verify_documents(
+                    [(entry['path'], entry['document_type'], entry['candidate_name']) for entry in batch],
+                    threshold=threshold, read_numbers=True))
+                results.extend(batch_results)
+                verify_ms += elapsed
+        pool.shutdown(wait=True)
+        cpu_after = _cpu_seconds()
+        passes.append({
+            'verify_ms': verify_ms,
+            'cpu_parent_s': cpu_after[0] - cpu_before[0],
+            'cpu_children_s': cpu_after[1] - cpu_before[1],
+            'methods': verifier.stats(),
+        })
+
+    pages = len(corpus) * repeat
+    wall_s = sum(run['verify_ms'] for run in passes) / 1000
+    cpu_parent = sum(run['cpu_parent_s'] for run in passes)
+    cpu_children = sum(run['cpu_children_s'] for run in passes)
+    report = {
+        'workers': workers,
+        'batch_size': batch_size,
+        'pages': pages,
+        'wall_s': round(wall_s, 3),
+        'pages_per_s': round(pages / wall_s, 2) if wall_s else None,
+        'verify_ms_per_page': round(sum(run['verify_ms'] for run in passes) / pages, 3),
+        'cpu_s': {
+            'parent': round(cpu_parent, 3),
+            'children': round(cpu_children, 3),
+            'total': round(cpu_parent + cpu_children, 3),
+            'per_page_ms': round((cpu_parent + cpu_children) / pages * 1000, 3),
+        },
+        'extraction_methods': passes[-1]['methods'],
+    }
+    return report, [(result, result['identity_number']) for result in results]
+
+
+def score(corpus, texts, outcomes):
+    """One dict of METRICS booleans (plus the variant fields) per document"""
+    records = []
+    for entry, (result, number) in zip(corpus, outcomes):
+        expected = normalize_name(entry['name'])
+        records.append({
+            **{field: entry[field] for field in BREAKDOWNS},
+            'name_in_text': expected in normalize_name(texts.get(entry['path'], '')),
+            'name_extracted': normalize_name(result.get('extracted_name')) == expected,
+            'number_extracted': number == entry['number'],
+            'verified': result['status'] == 'Pass',
+        })
+    return records
+
+
+def accuracy(records):
+    """Share of documents passing each metric, overall and per variant"""
+
+    def rates(group):
+        return {metric: round(sum(record[metric] for record in group) / len(group), 3) for metric in METRICS}
+
+    report = {'overall': rates(records)}
+    for field in BREAKDOWNS:
+        groups = {}
+        for record in records:
+            groups.setdefault(str(record[field]), []).append(record)
+        report[f'by_{field}'] = {value: rates(group) for value, group in sorted(groups.items())}
+    return report
+
+
+def compare(previous, current):
+    """Print stage latency, throughput and accuracy changes against an earlier result file"""
+    print(f"\nComparison with {previous['meta'].get('revision') or 'previous run'}:")
+    for kind in ('image', 'pdf'):
+        for stage, stats in current['stages'].get(kind, {}).items():
+            old = previous.get('stages', {}).get(kind, {}).get(stage)
+            if stats and old:
+                change = (stats['mean_ms'] - old['mean_ms']) / old['mean_ms'] * 100 if old['mean_ms'] else 0.0
+                print(f"  {kind + ' ' + stage:<22} {old['mean_ms']:>9.3f} -> {stats['mean_ms']:>9.3f} ms  "
+                      f"({change:+.1f}%)")
+    old_tput = previous.get('pipeline', {}).get('pages_per_s')
+    new_tput = current['pipeline']['pages_per_s']
+    if old_tput and new_tput:
+        print(f"  {'throughput':<22} {old_tput:>9.2f} -> {new_tput:>9.2f} pages/s "
+              f"({(new_tput - old_tput) / old_tput * 100:+.1f}%)")
+    old_accuracy = previous.get('accuracy', {}).get('overall', {})
+    for metric, rate in current['accuracy']['overall'].items():
+        if metric in old_accuracy:
+            print(f"  {metric:<22} {old_accuracy[metric]:>9.1%} -> {rate:>9.1%}  "
+                  f"({(rate - old_accuracy[metric]) * 100:+.1f} points)")
+
+
+def _check_tools(formats):
+    try:
+        version = str(pytesseract.get_tesseract_version())
+    except (pytesseract.TesseractNotFoundError, OSError):
+        sys.exit('tesseract is not installed or not on PATH (see OCR_SETUP.md)')
+    if 'pdf' in formats and not shutil.which('pdftoppm'):
+        sys.exit('poppler (pdftoppm) is not installed; install it or run with --formats png jpg')
+    return version
+
+
+def run(args):
+    tesseract_version = _check_tools(args.formats)
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix='card-corpus-')
+    print(f"Building corpus of {args.count} cards in {corpus_dir} (seed {args.seed})...")
+    try:
+        corpus = build_corpus(corpus_dir, count=args.count, seed=args.seed, formats=args.formats,
+                              document_types=args.document_types)
+        verifier = DocumentVerifier(ocr_cache=OcrCache(max_bytes=0))
+
+        # One untimed document warms imports and tesseract's model files in the page cache
+        bench_stages(corpus[:1], 1, verifier)
+
+        print(f"Timing stages ({args.repeat} pass(es))...")
+        stages, texts = bench_stages(corpus, args.repeat, verifier)
+        print(f"Timing the pipeline ({args.workers} OCR workers)...")
+        pipeline, outcomes = bench_pipeline(corpus, args.repeat, args.workers, args.batch_size, args.threshold)
+        records = score(corpus, texts, outcomes)
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'revision': _git_revision(),
+            'preprocess_version': PREPROCESS_VERSION,
+            'tesseract': tesseract_version,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'corpus': {
+            'count': len(corpus),
+            'seed': args.seed,
+            'formats': sorted({entry['format'] for entry in corpus}),
+            'document_types': sorted({entry['document_type'] for entry in corpus}),
+            'fonts': sorted({entry['font'] for entry in corpus}),
+            'total_bytes': sum(entry['bytes'] for entry in corpus),
+            'repeat': args.repeat,
+            'threshold': args.threshold,
+        },
+        'stages': stages,
+        'pipeline': pipeline,
+        'accuracy': accuracy(records),
+    }
+
+
+def print_report(results):
+    stages = results['stages']
+    for kind in ('image', 'pdf'):
+        if kind not in stages:
+            continue
+        print(f"\n{kind + ' stage':<22} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}  (ms)")
+        for stage, stats in stages[kind].items():
+            if stats:
+                print(f"{stage:<22} {stats['mean_ms']:>9.3f} {stats['p50_ms']:>9.3f} "
+                      f"{stats['p95_ms']:>9.3f} {stats['max_ms']:>9.3f}")
+    print(f"\nserial: {stages['pages_per_s']} pages/s, {stages['cpu_s']} s CPU")
+    pipeline = results['pipeline']
+    cpu = pipeline['cpu_s']
+    print(f"pipeline: {pipeline['pages_per_s']} pages/s with {pipeline['workers']} workers; "
+          f"CPU {cpu['total']} s ({cpu['parent']} parent, {cpu['children']} workers/tesseract), "
+          f"{cpu['per_page_ms']} ms per page")
+    print(f"  verify {pipeline['verify_ms_per_page']} ms/page; methods {pipeline['extraction_methods']}")
+
+    report = results['accuracy']
+    print(f"\n{'accuracy':<28} " + ' '.join(f"{metric:>16}" for metric in METRICS))
+    print(f"{'overall':<28} " + ' '.join(f"{report['overall'][metric]:>16.1%}" for metric in METRICS))
+    for field in BREAKDOWNS:
+        for value, rates in report[f'by_{field}'].items():
+            print(f"{field + '=' + value:<28} " + ' '.join(f"{rates[metric]:>16.1%}" for metric in METRICS))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark DocumentVerifier on synthetic PAN/Aadhaar cards')
+    parser.add_argument('--count', type=int, default=48, help='number of cards to generate')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help='timed passes over the corpus')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--document-types', nargs='+', choices=DOCUMENT_TYPES, default=list(DOCUMENT_TYPES))
+    parser.add_argument('--workers', type=int, default=OCR_WORKERS, help='OCR pool size for the pipeline')
+    parser.add_argument('--batch-size', type=int, default=16, help='documents per verify_documents() call')
+    parser.add_argument('--threshold', type=float, default=0.6, help='name similarity needed to verify')
+    parser.add_argument('--corpus-dir', help='write the corpus here instead of a temp directory')
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--compare', help='earlier JSON result to compare against')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    print_report(results)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+"""
+ResumeParser benchmark
+
+Builds a synthetic corpus (benchmarks/resume_corpus.py), then measures:
+  - per-extractor latency (text extraction, sectionizing and each extract_*)
+  - end-to-end extract_data() latency and throughput, per format
+  - peak traced memory per document and process max RSS
+
+Results are written as JSON so runs can be compared across versions.
+
+Usage (from task_backend/):
+    python -m benchmarks.bench_resume_parser --count 60 --output bench.json
+    python -m benchmarks.bench_resume_parser --compare old.json --output new.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from parsers.resume_parser import ResumeParser, PARSER_VERSION
+from benchmarks.resume_corpus import build_corpus, FORMATS, LAYOUTS, SIZES
+
+EXTRACTORS = (
+    'extract_name', 'extract_email', 'extract_phone', 'extract_skills', 'extract_experience',
+    'extract_education', 'extract_company', 'extract_designation', 'extract_location',
+)
+
+
+def summarize(samples_ms):
+    """mean/p50/p95/max of a list of millisecond timings"""
+    if not samples_ms:
+        return None
+    ordered = sorted(samples_ms)
+    return {
+        'n': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': round(ordered[len(ordered) // 2], 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_extractors(corpus, repeat):
+    """
+    Time each stage separately on a fresh parser per document
+
+    Text extraction and sectionizing are timed first; the extractors then
+    run on the already-extracted text, so each timing is the extractor's
+    own cost.
+    """
+    timings = {stage: [] for stage in ('text', 'sections', *EXTRACTORS)}
+    for _ in range(repeat):
+        for entry in corpus:
+            parser = ResumeParser(entry['path'])
+            timings['text'].append(_timed(lambda: parser.text))
+            timings['sections'].append(_timed(lambda: parser.sections))
+            for name in EXTRACTORS:
+                timings[name].append(_timed(getattr(parser, name)))
+    return {stage: summarize(samples) for stage, samples in timings.items()}
+
+
+def bench_end_to_end(corpus, repeat):
+    """extract_data() latency and throughput, overall and per format"""
+    per_format = {}
+    total_ms = 0.0
+    total_bytes = 0
+    for _ in range(repeat):
+        for entry in corpus:
+            elapsed = _timed(lambda: ResumeParser(entry['path']).extract_data())
+            per_format.setdefault(entry['format'], []).append(elapsed)
+            total_ms += elapsed
+            total_bytes += entry['bytes']
+
+    documents = len(corpus) * repeat
+    return {
+        'documents': documents,
+        'total_s': round(total_ms / 1000, 3),
+        'docs_per_s': round(documents / (total_ms / 1000), 2) if total_ms else None,
+        'mb_per_s': round(total_bytes / 1e6 / (total_ms / 1000), 3) if total_ms else None,
+        'latency': summarize([ms for samples in per_format.values() for ms in samples]),
+        'by_format': {fmt: summarize(samples) for fmt, samples in per_format.items()},
+    }
+
+
+def bench_memory(corpus):
+    """Peak Python heap per document (tracemalloc) and process max RSS"""
+    peaks = {}
+    for entry in corpus:
+        gc.collect()
+        tracemalloc.start()
+        ResumeParser(entry['path']).extract_data()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.setdefault(entry['format'], []).append(peak / 1024)
+
+    all_peaks = [kb for samples in peaks.values() for kb in samples]
+    # ru_maxrss is KB on Linux, bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        max_rss //= 1024
+    return {
+        'peak_kb_mean': round(statistics.fmean(all_peaks), 1),
+        'peak_kb_max': round(max(all_peaks), 1),
+        'peak_kb_by_format': {fmt: round(max(samples), 1) for fmt, samples in peaks.items()},
+        'max_rss_kb': max_rss,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current):
+    """Print mean latency / throughput changes against an earlier result file"""
+    print(f"\nComparison with {previous['meta'].get('revision') or 'previous run'}:")
+    for stage, stats in current['extractors'].items():
+        old = previous.get('extractors', {}).get(stage)
+        if stats and old:
+            change = (stats['mean_ms'] - old['mean_ms']) / old['mean_ms'] * 100 if old['mean_ms'] else 0.0
+            print(f"  {stage:<22} {old['mean_ms']:>9.3f} -> {stats['mean_ms']:>9.3f} ms  ({change:+.1f}%)")
+    old_tput = previous.get('end_to_end', {}).get('docs_per_s')
+    new_tput = current['end_to_end']['docs_per_s']
+    if old_tput and new_tput:
+        print(f"  {'throughput':<22} {old_tput:>9.2f} -> {new_tput:>9.2f} docs/s "
+              f"({(new_tput - old_tput) / old_tput * 100:+.1f}%)")
+
+
+def run(args):
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix='resume-corpus-')
+    print(f"Building corpus of {args.count} resumes in {corpus_dir} (seed {args.seed})...")
+    try:
+        corpus = build_corpus(corpus_dir, count=args.count, seed=args.seed, formats=args.formats)
+
+        # One untimed pass warms imports, regex caches and the filesystem cache
+        for entry in corpus:
+            ResumeParser(entry['path']).extract_data()
+
+        print(f"Timing extractors ({args.repeat} pass(es))...")
+        extractors = bench_extractors(corpus, args.repeat)
+        print("Timing end-to-end extraction...")
+        end_to_end = bench_end_to_end(corpus, args.repeat)
+        print("Measuring memory...")
+        memory = bench_memory(corpus)
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'revision': _git_revision(),
+            'parser_version': PARSER_VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'corpus': {
+            'count': len(corpus),
+            'seed': args.seed,
+            'formats': sorted({entry['format'] for entry in corpus}),
+            'layouts': sorted({entry['layout'] for entry in corpus}),
+            'sizes': sorted({entry['size'] for entry in corpus}),
+            'total_bytes': sum(entry['bytes'] for entry in corpus),
+            'max_pages': max((entry['pages'] or 0) for entry in corpus),
+            'repeat': args.repeat,
+        },
+        'extractors': extractors,
+        'end_to_end': end_to_end,
+        'memory': memory,
+    }
+
+
+def print_report(results):
+    print(f"\n{'stage':<22} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}  (ms)")
+    for stage, stats in results['extractors'].items():
+        print(f"{stage:<22} {stats['mean_ms']:>9.3f} {stats['p50_ms']:>9.3f} "
+              f"{stats['p95_ms']:>9.3f} {stats['max_ms']:>9.3f}")
+    e2e = results['end_to_end']
+    print(f"\nextract_data: {e2e['docs_per_s']} docs/s, {e2e['mb_per_s']} MB/s, "
+          f"p95 {e2e['latency']['p95_ms']} ms")
+    for fmt, stats in e2e['by_format'].items():
+        print(f"  {fmt:<5} mean {stats['mean_ms']} ms, p95 {stats['p95_ms']} ms")
+    memory = results['memory']
+    print(f"memory: peak {memory['peak_kb_max']} KB per document (mean {memory['peak_kb_mean']} KB), "
+          f"max RSS {memory['max_rss_kb']} KB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark ResumeParser on a synthetic corpus')
+    parser.add_argument('--count', type=int, default=len(FORMATS) * len(LAYOUTS) * len(SIZES) * 2,
+                        help='number of resumes to generate')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='timed passes over the corpus')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--corpus-dir', help='write the corpus here instead of a temp directory')
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--compare', help='earlier JSON result to compare against')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    print_report(results)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+Synthetic PAN / Aadhaar card corpus for benchmarks
+
+Renders card images (PNG, JPEG) and scanned-style PDFs with PIL from a seed,
+with known ground-truth names and numbers. Cards vary in resolution,
+capture (flat scan with DPI metadata, or a phone-style photo of the card on
+a background), noise, rotation (within the deskew range) and font. Field
+positions follow the regions in parsers/ocr_preprocess.OCR_PROFILES, so
+region OCR reads the same parts of these cards as of real ones.
+"""
+import json
+import os
+import random
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+from benchmarks.resume_corpus import FIRST_NAMES, LAST_NAMES
+
+DOCUMENT_TYPES = ('PAN Card', 'Aadhaar Card')
+FORMATS = ('png', 'jpg', 'pdf')
+# Scan resolutions
+DPIS = (150, 200, 300, 450)
+CAPTURES = ('scan', 'photo')
+# Gaussian noise sigma and blur radius per level
+NOISE_LEVELS = {
+    'clean': (0, 0),
+    'light': (6, 0),
+    'heavy': (16, 0.8),
+}
+# Kept inside ocr_preprocess.DESKEW_MAX_ANGLE
+MAX_ROTATION = 4.0
+# Tried in order; PIL's built-in font is always available
+FONT_FILES = ('DejaVuSans.ttf', 'DejaVuSerif.ttf', 'LiberationSans-Regular.ttf', 'FreeSans.ttf', 'Arial.ttf')
+
+# ID-1 card size in inches (85.6 x 53.98 mm)
+CARD_INCHES = (3.370, 2.125)
+# Share of a 'photo' frame's width the card fills
+PHOTO_CARD_RATIO = 0.65
+JPEG_QUALITY = 85
+
+INK = (25, 25, 30)
+
+
+def available_fonts():
+    """Font names usable here: installed TrueType fonts from FONT_FILES, then 'default'"""
+    fonts = []
+    for name in FONT_FILES:
+        try:
+            ImageFont.truetype(name, 12)
+        except OSError:
+            continue
+        fonts.append(name)
+    return fonts + ['default']
+
+
+def _font(name, size):
+    if name == 'default':
+        return ImageFont.load_default(size=size)
+    return ImageFont.truetype(name, size)
+
+
+def pan_number(rng, last_name):
+    """AAAPL1234C style: the 4th letter is P (individual), the 5th the surname's initial"""
+    letters = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(3))
+    return f"{letters}P{last_name[0].upper()}{rng.randint(0, 9999):04d}{rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ')}"
+
+
+def aadhaar_number(rng):
+    """12 digits, not starting with 0 or 1"""
+    return str(rng.randint(2, 9)) + ''.join(str(rng.randint(0, 9)) for _ in range(11))
+
+
+def generate_card(rng, document_type):
+    """
+    Ground truth for one card
+
+    Returns:
+        dict with 'name' (as printed), 'candidate_name' (as a candidate would
+        enter it), 'number' and the other printed fields
+    """
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    dob = f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1965, 2004)}"
+    card = {'candidate_name': f"{first} {last}", 'dob': dob}
+    if document_type == 'PAN Card':
+        card['name'] = f"{first} {last}".upper()
+        card['father_name'] = f"{rng.choice(FIRST_NAMES)} {last}".upper()
+        card['number'] = pan_number(rng, last)
+    else:
+        card['name'] = f"{first} {last}"
+        card['gender'] = rng.choice(['MALE', 'FEMALE'])
+        card['number'] = aadhaar_number(rng)
+    return card
+
+
+def render_card(card, document_type, dpi, font_name='default'):
+    """Draw a card at dpi as an RGB image"""
+    width, height = round(CARD_INCHES[0] * dpi), round(CARD_INCHES[1] * dpi)
+    text_font = _font(font_name, max(8, round(height * 0.06)))
+    small_font = _font(font_name, max(7, round(height * 0.045)))
+
+    if document_type == 'PAN Card':
+        image = Image.new('RGB', (width, height), (215, 232, 244))
+        draw = ImageDraw.Draw(image)
+        number_font = _font(font_name, max(9, round(height * 0.075)))
+        # Header band (excluded from the name region)
+        draw.text((width * 0.05, height * 0.03), 'INCOME TAX DEPARTMENT', font=small_font, fill=INK)
+        draw.text((width * 0.62, height * 0.03), 'GOVT. OF INDIA', font=small_font, fill=INK)
+        draw.line((0, height * 0.11, width, height * 0.11), fill=(90, 120, 160), width=max(1, height // 150))
+        draw.text((width * 0.05, height * 0.20), card['name'], font=text_font, fill=INK)
+        draw.text((width * 0.05, height * 0.31), card['father_name'], font=text_font, fill=INK)
+        draw.text((width * 0.05, height * 0.42), card['dob'], font=text_font, fill=INK)
+        draw.text((width * 0.05, height * 0.53), 'Permanent Account Number', font=small_font, fill=INK)
+        draw.text((width * 0.05, height * 0.62), card['number'], font=number_font, fill=INK)
+        # Photo, bottom right
+        draw.rectangle((width * 0.74, height * 0.40, width * 0.95, height * 0.90), fill=(160, 160, 165))
+    else:
+        image = Image.new('RGB', (width, height), (250, 250, 247))
+        draw = ImageDraw.Draw(image)
+        number_font = _font(font_name, max(10, round(height * 0.09)))
+        draw.rectangle((0, 0, width, height * 0.12), fill=(255, 214, 160))
+        header = 'GOVERNMENT OF INDIA'
+        header_width = draw.textlength(header, font=small_font)
+        draw.text(((width - header_width) / 2, height * 0.03), header, font=small_font, fill=INK)
+        # Photo, left of the fields
+        draw.rectangle((width * 0.04, height * 0.20, width * 0.23, height * 0.62), fill=(160, 160, 165))
+        draw.text((width * 0.28, height * 0.22), card['name'], font=text_font, fill=INK)
+        draw.text((width * 0.28, height * 0.33), f"DOB: {card['dob']}", font=text_font, fill=INK)
+        draw.text((width * 0.28, height * 0.44), card['gender'], font=text_font, fill=INK)
+        printed = ' '.join(card['number'][i:i + 4] for i in range(0, 12, 4))
+        number_width = draw.textlength(printed, font=number_font)
+        draw.text(((width - number_width) / 2, height * 0.74), printed, font=number_font, fill=INK)
+        draw.line((0, height * 0.96, width, height * 0.96), fill=(200, 40, 40), width=max(1, height // 100))
+    return image
+
+
+def capture(image, rng, capture_kind='scan', noise='clean', rotation=0.0):
+    """Place, rotate and degrade a rendered card like a scanner or phone camera would"""
+    background = (236, 236, 236) if capture_kind == 'scan' else (rng.randint(60, 140),) * 3
+    if capture_kind == 'photo':
+        frame = Image.new('RGB', (round(image.width / PHOTO_CARD_RATIO), round(image.height / PHOTO_CARD_RATIO)),
+                          background)
+        frame.paste(image, ((frame.width - image.width) // 2, (frame.height - image.height) // 2))
+        image = frame
+    if rotation:
+        image = image.rotate(rotation, resample=Image.BICUBIC, expand=True, fillcolor=background)
+
+    sigma, blur = NOISE_LEVELS[noise]
+    if blur:
+        image = image.filter(ImageFilter.GaussianBlur(blur))
+    if sigma:
+        noise_rng = np.random.default_rng(rng.getrandbits(32))
+        pixels = np.asarray(image, dtype=np.float32)
+        pixels += noise_rng.normal(0, sigma, pixels.shape).astype(np.float32)
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    return image
+
+
+def write_card(image, path, fmt, dpi, capture_kind='scan'):
+    """Save as PNG/JPEG (DPI metadata for scans only) or a single-page image-only PDF"""
+    if fmt == 'pdf':
+        image.save(path, 'PDF', resolution=float(dpi))
+    elif fmt == 'jpg':
+        extra = {'dpi': (dpi, dpi)} if capture_kind == 'scan' else {}
+        image.save(path, 'JPEG', quality=JPEG_QUALITY, **extra)
+    else:
+        extra = {'dpi': (dpi, dpi)} if capture_kind == 'scan' else {}
+        image.save(path, 'PNG', **extra)
+
+
+def build_corpus(directory, count=48, seed=0, formats=FORMATS, document_types=DOCUMENT_TYPES, dpis=DPIS,
+                 noise_levels=tuple(NOISE_LEVELS), captures=CAPTURES):
+    """
+    Write `count` cards into directory, cycling through type/format/DPI/noise/capture
+
+    Rotation and font are drawn from the seed. The ground truth is also
+    written to manifest.json in directory.
+
+    Returns:
+        List of dicts with 'path', 'format', 'document_type', 'dpi',
+        'capture', 'noise', 'rotation', 'font', 'name', 'candidate_name',
+        'number', 'width', 'height', 'bytes' and 'pages'
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    fonts = available_fonts()
+    combos = [(document_type, fmt, dpi, noise, capture_kind)
+              for document_type in document_types for fmt in formats for dpi in dpis
+              for noise in noise_levels for capture_kind in captures]
+    # Spread a small corpus over all variants rather than the first few
+    random.Random(seed).shuffle(combos)
+
+    corpus = []
+    for index in range(count):
+        document_type, fmt, dpi, noise, capture_kind = combos[index % len(combos)]
+        card = generate_card(rng, document_type)
+        font_name = fonts[index % len(fonts)]
+        rotation = round(rng.uniform(-MAX_ROTATION, MAX_ROTATION), 1)
+        image = capture(render_card(card, document_type, dpi, font_name), rng, capture_kind, noise, rotation)
+
+        prefix = document_type.lower().replace(' ', '_')
+        path = os.path.join(directory, f"{prefix}_{index:04d}_{dpi}dpi_{capture_kind}_{noise}.{fmt}")
+        write_card(image, path, fmt, dpi, capture_kind)
+        corpus.append({
+            'path': path,
+            'format': fmt,
+            'document_type': document_type,
+            'dpi': dpi,
+            'capture': capture_kind,
+            'noise': noise,
+            'rotation': rotation,
+            'font': font_name,
+            'name': card['name'],
+            'candidate_name': card['candidate_name'],
+            'number': card['number'],
+            'width': image.width,
+            'height': image.height,
+            'bytes': os.path.getsize(path),
+            'pages': 1,
+        })
+
+    with open(os.path.join(directory, 'manifest.json'), 'w') as f:
+        json.dump({'seed': seed, 'cards': corpus}, f, indent=2)
+    return corpus
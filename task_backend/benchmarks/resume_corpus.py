@@ -0,0 +1,259 @@
+"""
+Synthetic resume corpus for benchmarks
+
+Generates PDF and DOCX resumes with varied layouts and lengths from a seed,
+so the same corpus can be rebuilt on any machine. PDFs are written directly
+(single Helvetica text layer, no extra dependencies); DOCX files use
+python-docx.
+"""
+import os
+import random
+
+from docx import Document
+
+from parsers.skill_matcher import SKILL_TAXONOMY
+
+FIRST_NAMES = [
+    'Aarav', 'Priya', 'Rahul', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Kavya', 'Rohan', 'Meera',
+    'James', 'Emily', 'Daniel', 'Sophia', 'Michael', 'Olivia', 'David', 'Grace', 'Samuel', 'Chloe',
+]
+LAST_NAMES = [
+    'Sharma', 'Patel', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Menon', 'Kapoor', 'Joshi', 'Rao',
+    'Smith', 'Johnson', 'Brown', 'Taylor', 'Wilson', 'Clarke', 'Walker', 'Turner', 'Hughes', 'Evans',
+]
+COMPANIES = [
+    'Tech Mahindra', 'Infosys Limited', 'Wipro Technologies', 'Tata Consultancy Services',
+    'Accenture', 'Globex Systems', 'Initech Software', 'Acme Analytics', 'Northwind Labs',
+    'Blue Harbor Digital', 'Zenith Cloud', 'Orbit Data Solutions',
+]
+TITLES = [
+    'Software Engineer', 'Senior Software Engineer', 'Data Scientist', 'AI Engineer',
+    'Backend Developer', 'Frontend Developer', 'DevOps Engineer', 'Product Manager',
+    'Technical Lead', 'Data Analyst', 'Solutions Architect', 'QA Engineer',
+]
+DEGREES = [
+    'Bachelor of Technology in Computer Science', 'Master of Science in Data Science',
+    'B.Tech in Electronics and Communication', 'MBA in Operations', 'M.Tech in Software Systems',
+    'Bachelor of Engineering in Information Technology',
+]
+UNIVERSITIES = [
+    'Indian Institute of Technology, Mumbai', 'Delhi University', 'Anna University',
+    'University of Pune', 'Stanford University', 'University of Manchester',
+]
+CITIES = [
+    ('Mumbai', 'MH'), ('Bengaluru', 'KA'), ('Chennai', 'TN'), ('Hyderabad', 'TS'),
+    ('Austin', 'TX'), ('Seattle', 'WA'), ('Boston', 'MA'), ('Denver', 'CO'),
+]
+MONTHS = ['January', 'March', 'April', 'June', 'August', 'October', 'December']
+VERBS = [
+    'Designed', 'Built', 'Led', 'Optimized', 'Migrated', 'Automated', 'Implemented',
+    'Maintained', 'Scaled', 'Refactored',
+]
+OBJECTS = [
+    'data processing pipelines', 'REST services', 'a customer analytics dashboard',
+    'the CI/CD workflow', 'recommendation models', 'internal developer tooling',
+    'the payments platform', 'real-time monitoring', 'search infrastructure',
+]
+OUTCOMES = [
+    'reducing latency by {n}%', 'handling {n}K requests per day', 'cutting costs by {n}%',
+    'improving accuracy by {n}%', 'for {n}+ enterprise clients', 'saving {n} hours per week',
+]
+
+# Layout variants exercise different extractor paths
+LAYOUTS = ('classic', 'inline', 'compact')
+# Corpus size profiles: (jobs, bullets per job, projects)
+SIZES = {
+    'small': (2, 3, 1),
+    'medium': (5, 5, 4),
+    'large': (14, 7, 12),
+}
+FORMATS = ('pdf', 'docx')
+
+
+def generate_resume(rng, layout='classic', size='medium'):
+    """
+    Build one synthetic resume as a list of (kind, text) blocks
+
+    kind is 'title', 'contact', 'heading', 'line' or 'bullet'.
+    """
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    city, state = rng.choice(CITIES)
+    jobs, bullets, projects = SIZES[size]
+    skills = rng.sample(sorted(SKILL_TAXONOMY), rng.randint(8, 24))
+
+    blocks = [
+        ('title', f"{first} {last}" if layout != 'compact' else f"{first} {last}".upper()),
+        ('contact', f"{first.lower()}.{last.lower()}{rng.randint(1, 99)}@"
+                    f"{rng.choice(['gmail.com', 'outlook.com', 'example.org'])} | "
+                    f"+91 9{rng.randint(100000000, 999999999)} | {city}, {state}"),
+        ('heading', 'PROFESSIONAL SUMMARY'),
+        ('line', f"{rng.choice(TITLES)} with {rng.randint(1, 15)}+ years of experience in "
+                 f"{', '.join(skills[:3])}."),
+    ]
+
+    blocks.append(('heading', 'WORK EXPERIENCE' if layout != 'compact' else 'Experience'))
+    year = 2024
+    for index in range(jobs):
+        start = year - rng.randint(1, 3)
+        end = 'Present' if index == 0 else f"{rng.choice(MONTHS)} {year}"
+        company, title = rng.choice(COMPANIES), rng.choice(TITLES)
+        if layout == 'inline':
+            blocks.append(('line', f"{title} at {company} ({start} - {end})"))
+        else:
+            blocks.append(('line', company))
+            blocks.append(('line', title))
+            blocks.append(('line', f"{rng.choice(MONTHS)} {start} - {end}"))
+        for _ in range(bullets):
+            outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+            blocks.append(('bullet', f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} using "
+                                     f"{rng.choice(skills)}, {outcome}"))
+        year = start
+
+    blocks.append(('heading', 'EDUCATION'))
+    blocks.append(('line', rng.choice(DEGREES)))
+    blocks.append(('line', rng.choice(UNIVERSITIES)))
+    blocks.append(('line', f"{year - 4} - {year}"))
+
+    if layout == 'inline':
+        blocks.append(('line', f"Skills: {', '.join(skills)}"))
+    else:
+        blocks.append(('heading', 'TECHNICAL SKILLS'))
+        for offset in range(0, len(skills), 6):
+            blocks.append(('bullet', ', '.join(skills[offset:offset + 6])))
+
+    if projects:
+        blocks.append(('heading', 'PROJECTS'))
+        for _ in range(projects):
+            blocks.append(('line', f"{rng.choice(['Smart', 'Realtime', 'Unified', 'Open'])} "
+                                   f"{rng.choice(['Inventory', 'Churn', 'Search', 'Billing'])} "
+                                   f"{rng.choice(['Platform', 'Engine', 'Service'])}"))
+            for _ in range(max(1, bullets // 2)):
+                blocks.append(('bullet', f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} with "
+                                         f"{rng.choice(skills)}"))
+    return blocks
+
+
+def _block_lines(blocks, width=95):
+    """Flatten blocks to wrapped text lines (blank line before each heading)"""
+    lines = []
+    for kind, text in blocks:
+        if kind == 'heading':
+            lines.append('')
+        prefix = '• ' if kind == 'bullet' else ''
+        text = prefix + text
+        while len(text) > width:
+            cut = text.rfind(' ', 0, width)
+            cut = cut if cut > 0 else width
+            lines.append(text[:cut])
+            text = '  ' + text[cut:].lstrip()
+        lines.append(text)
+    return lines
+
+
+def _pdf_string(line):
+    """Encode a line as a PDF literal string (WinAnsi bytes, escaped)"""
+    data = line.encode('cp1252', errors='replace')
+    out = []
+    for byte in data:
+        char = chr(byte)
+        if char in '\\()':
+            out.append('\\' + char)
+        elif 32 <= byte < 127:
+            out.append(char)
+        else:
+            out.append(f'\\{byte:03o}')
+    return '(' + ''.join(out) + ')'
+
+
+def write_pdf(blocks, path, lines_per_page=60):
+    """Write blocks as a text-layer PDF (Letter, Helvetica 10pt)"""
+    lines = _block_lines(blocks)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then (page, content) pairs
+    objects = {
+        1: b'<< /Type /Catalog /Pages 2 0 R >>',
+        3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+    }
+    kids = []
+    for index, page_lines in enumerate(pages):
+        page_id, content_id = 4 + index * 2, 5 + index * 2
+        kids.append(f'{page_id} 0 R')
+        stream = ['BT', '/F1 10 Tf', '12 TL', '50 750 Td']
+        stream.extend(f'{_pdf_string(line)} Tj T*' for line in page_lines)
+        stream.append('ET')
+        content = '\n'.join(stream).encode('latin-1')
+        objects[page_id] = (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>').encode()
+        objects[content_id] = b'<< /Length %d >>\nstream\n%s\nendstream' % (len(content), content)
+    objects[2] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(pages)} >>'.encode()
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(out)
+        out += b'%d 0 obj\n%s\nendobj\n' % (object_id, objects[object_id])
+    xref = len(out)
+    count = max(objects) + 1
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % count
+    for object_id in range(1, count):
+        out += b'%010d 00000 n \n' % offsets[object_id]
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (count, xref)
+
+    with open(path, 'wb') as f:
+        f.write(out)
+    return len(pages)
+
+
+def write_docx(blocks, path, layout='classic'):
+    """Write blocks as a DOCX (skills go in a table for the 'compact' layout)"""
+    doc = Document()
+    skill_rows = []
+    in_skills = False
+    for kind, text in blocks:
+        if kind == 'heading':
+            in_skills = 'SKILLS' in text.upper()
+            doc.add_paragraph(text)
+        elif layout == 'compact' and in_skills:
+            skill_rows.append(text)
+        elif kind == 'bullet':
+            doc.add_paragraph('• ' + text)
+        else:
+            doc.add_paragraph(text)
+    if skill_rows:
+        table = doc.add_table(rows=len(skill_rows), cols=1)
+        for row, text in zip(table.rows, skill_rows):
+            row.cells[0].text = text
+    doc.save(path)
+
+
+def build_corpus(directory, count=30, seed=0, formats=FORMATS, layouts=LAYOUTS, sizes=tuple(SIZES)):
+    """
+    Write `count` resumes into directory, cycling through format/layout/size
+
+    Returns:
+        List of dicts with 'path', 'format', 'layout', 'size', 'bytes' and
+        'pages' (PDF only)
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    combos = [(fmt, layout, size) for fmt in formats for layout in layouts for size in sizes]
+    corpus = []
+    for index in range(count):
+        fmt, layout, size = combos[index % len(combos)]
+        blocks = generate_resume(rng, layout, size)
+        path = os.path.join(directory, f"resume_{index:04d}_{layout}_{size}.{fmt}")
+        pages = None
+        if fmt == 'pdf':
+            pages = write_pdf(blocks, path)
+        else:
+            write_docx(blocks, path, layout)
+        corpus.append({
+            'path': path,
+            'format': fmt,
+            'layout': layout,
+            'size': size,
+            'bytes': os.path.getsize(path),
+            'pages': pages,
+        })
+    return corpus
@@ -0,0 +1,209 @@
+"""
+Pooled PostgreSQL connections shared by every request handler
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes free within the checkout timeout"""
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, dsn, maxconn=10, timeout=10.0, health_check_interval=30.0):
+        """
+        Bounded, thread-safe pool of psycopg2 connections
+
+        Args:
+            dsn: PostgreSQL connection URL
+            maxconn: Maximum number of open connections per process
+            timeout: Seconds to wait for a free connection before PoolTimeout
+            health_check_interval: Idle seconds after which a connection is
+                pinged with SELECT 1 before being handed out
+        """
+        self.dsn = dsn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._reset()
+
+        # gunicorn workers fork after import; never share sockets with the parent
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        """Start with an empty pool (used at init and in forked children)"""
+        # Connections inherited across a fork are kept referenced but never
+        # used or closed, so their sockets are not torn down under the parent
+        self._orphaned = getattr(self, '_orphaned', []) + [conn for conn, _ in getattr(self, '_idle', [])]
+        self._cond = threading.Condition()
+        self._idle = []  # (connection, last_used) pairs
+        self._in_use = 0
+        self._pid = os.getpid()
+
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._reconnects = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._peak_in_use = 0
+
+    def _connect(self):
+        return psycopg2.connect(self.dsn)
+
+    def _is_healthy(self, conn, last_used):
+        """Check that an idle connection is still usable"""
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """Check a connection out of the pool, waiting up to self.timeout"""
+        if os.getpid() != self._pid:
+            self._reset()
+
+        start = time.monotonic()
+        deadline = start + self.timeout
+        conn = None
+        last_used = None
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._in_use < self.maxconn:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(f'No database connection available after {self.timeout}s '
+                                      f'({self.maxconn} in use)')
+                if not waited:
+                    self._waits += 1
+                    waited = True
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            wait_time = time.monotonic() - start
+            self._checkouts += 1
+            self._total_wait += wait_time
+            self._max_wait = max(self._max_wait, wait_time)
+
+        try:
+            if conn is not None and not self._is_healthy(conn, last_used):
+                self._close_quietly(conn)
+                conn = None
+                self._reconnects += 1
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            self._release_slot()
+            raise
+
+        return conn
+
+    def putconn(self, conn, discard=False):
+        """Return a connection to the pool, closing it if broken or discarded"""
+        if os.getpid() != self._pid:
+            # Checked out before a fork; the slot belongs to the parent
+            return
+
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        if discard or conn.closed:
+            self._close_quietly(conn)
+            self._release_slot()
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._in_use -= 1
+            self._cond.notify()
+
+    def _release_slot(self):
+        with self._cond:
+            self._in_use -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager yielding a pooled connection
+
+        Commits on a clean exit and rolls back on error. Connections that
+        raised a connection-level error are discarded instead of reused.
+        """
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+            if not conn.closed and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            raise
+        except Exception:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    def closeall(self):
+        """Close every idle connection owned by this process"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self):
+        """Snapshot of pool usage for sizing under load"""
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                'max_connections': self.maxconn,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'peak_in_use': self._peak_in_use,
+                'saturation': round(self._in_use / self.maxconn, 3) if self.maxconn else 0.0,
+                'checkouts': checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'reconnects': self._reconnects,
+                'avg_wait_ms': round(self._total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+                'max_wait_ms': round(self._max_wait * 1000, 3),
+            }
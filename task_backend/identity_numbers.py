@@ -0,0 +1,134 @@
+"""
+Keyed hashes of PAN/Aadhaar numbers for cross-candidate reuse checks
+
+Identity numbers read from submitted documents are never stored in clear.
+Each is normalized and stored as HMAC-SHA256(IDENTITY_HASH_KEY, type:number)
+in identity_numbers, indexed on (number_type, number_hash), so finding every
+candidate who submitted the same number is a single index lookup. Only the
+last four characters are kept for display.
+
+Without IDENTITY_HASH_KEY nothing is stored or looked up: an unkeyed hash of
+a 10-character PAN or 12-digit Aadhaar number is trivially brute-forced.
+"""
+import hashlib
+import hmac
+import os
+import re
+
+from psycopg2.extras import execute_values
+
+IDENTITY_HASH_KEY = os.environ.get('IDENTITY_HASH_KEY', '')
+
+# Values of identity_numbers.number_type, by document type
+NUMBER_TYPES = {'PAN Card': 'PAN', 'Aadhaar Card': 'AADHAAR'}
+# Normalized numbers of each type. An Aadhaar VID (16 digits) can be
+# regenerated by its holder, so it is not accepted as an Aadhaar number.
+NUMBER_FORMATS = {'PAN': re.compile(r'[A-Z]{5}\d{4}[A-Z]'), 'AADHAAR': re.compile(r'\d{12}')}
+
+
+class IdentityHashingDisabled(Exception):
+    """Raised when IDENTITY_HASH_KEY is not configured"""
+    pass
+
+
+def enabled():
+    return bool(IDENTITY_HASH_KEY)
+
+
+def normalize_number(number_type, number):
+    """PAN: uppercase alphanumerics; Aadhaar: digits only"""
+    if number_type == 'AADHAAR':
+        return re.sub(r'\D', '', number)
+    return re.sub(r'[^A-Z0-9]', '', number.upper())
+
+
+def valid_number(number_type, number):
+    """Whether number, once normalized, has the format of number_type"""
+    return bool(NUMBER_FORMATS[number_type].fullmatch(normalize_number(number_type, number)))
+
+
+def number_hash(number_type, number):
+    """Keyed hash of a normalized identity number"""
+    if not enabled():
+        raise IdentityHashingDisabled('Set IDENTITY_HASH_KEY to store or look up identity numbers')
+    message = f'{number_type}:{normalize_number(number_type, number)}'.encode('utf-8')
+    return hmac.new(IDENTITY_HASH_KEY.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+
+def create_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS identity_numbers (
+            id SERIAL PRIMARY KEY,
+            candidate_id INTEGER REFERENCES candidates(id) ON DELETE CASCADE,
+            document_id INTEGER REFERENCES submitted_documents(id) ON DELETE SET NULL,
+            number_type TEXT NOT NULL,
+            number_hash TEXT NOT NULL,
+            number_last4 TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (number_type, number_hash, candidate_id)
+        )
+    ''')
+    # The unique constraint's index serves lookups by (number_type, number_hash)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_identity_numbers_candidate_id ON identity_numbers (candidate_id)')
+
+
+def record_numbers(cursor, rows):
+    """
+    Store extracted numbers (no-op without IDENTITY_HASH_KEY)
+
+    Args:
+        rows: Iterable of (candidate_id, document_id or None, document_type, number)
+
+    Returns:
+        Number of new rows stored
+    """
+    if not enabled():
+        return 0
+    values = []
+    for candidate_id, document_id, document_type, number in rows:
+        number_type = NUMBER_TYPES.get(document_type)
+        if not number_type or not number or not valid_number(number_type, number):
+            continue
+        normalized = normalize_number(number_type, number)
+        values.append((candidate_id, document_id, number_type, number_hash(number_type, normalized),
+                       normalized[-4:]))
+    if not values:
+        return 0
+    inserted = execute_values(cursor, '''
+        INSERT INTO identity_numbers (candidate_id, document_id, number_type, number_hash, number_last4)
+        VALUES %s
+        ON CONFLICT (number_type, number_hash, candidate_id) DO NOTHING
+        RETURNING id
+    ''', values, fetch=True)
+    return len(inserted)
+
+
+def find_candidates(cursor, number_type, number):
+    """Candidate ids that submitted this number"""
+    cursor.execute('''
+        SELECT DISTINCT candidate_id FROM identity_numbers
+        WHERE number_type = %s AND number_hash = %s
+        ORDER BY candidate_id
+    ''', (number_type, number_hash(number_type, number)))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def find_reuse(cursor, candidate_id):
+    """
+    Other candidates sharing any of this candidate's numbers
+
+    Returns:
+        [(number_type, number_last4, other_candidate_id, other_name), ...]
+    """
+    cursor.execute('''
+        SELECT mine.number_type, mine.number_last4, other.candidate_id, c.name
+        FROM identity_numbers mine
+        JOIN identity_numbers other
+          ON other.number_type = mine.number_type
+         AND other.number_hash = mine.number_hash
+         AND other.candidate_id <> mine.candidate_id
+        JOIN candidates c ON c.id = other.candidate_id
+        WHERE mine.candidate_id = %s
+        ORDER BY mine.number_type, other.candidate_id
+    ''', (candidate_id,))
+    return cursor.fetchall()
@@ -0,0 +1,26 @@
+"""
+Opaque keyset cursors for the candidate list
+
+The list is ordered by (upload_date DESC, id DESC); a cursor carries the
+last row's pair so the next page is WHERE (upload_date, id) < cursor.
+"""
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(upload_date, candidate_id):
+    """Opaque pagination cursor for the (upload_date, id) keyset"""
+    if upload_date is None:
+        raise ValueError('upload_date is required for a keyset cursor')
+    raw = json.dumps([upload_date.isoformat(), candidate_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on malformed input"""
+    try:
+        upload_date, candidate_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(upload_date), int(candidate_id)
+    except Exception as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
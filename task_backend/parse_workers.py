@@ -0,0 +1,251 @@
+"""
+Bounded-time resume parsing in recyclable worker processes
+
+Each resume is parsed in a dedicated child process with a wall-clock
+deadline and an address-space cap. The child reports fields one at a time,
+so when a document blows its deadline (or memory cap) the worker is killed
+and replaced, and the fields finished so far are returned as a partial
+result with zero confidence for the rest. Workers are also recycled after a
+fixed number of documents to bound slow leaks in the PDF/DOCX libraries.
+"""
+import multiprocessing
+import os
+import resource
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from parsers.resume_parser import ResumeParser, FIELDS, CONFIDENCE_KEYS
+
+PARSE_DEADLINE = float(os.environ.get('RESUME_PARSE_DEADLINE', 20))
+PARSE_MEMORY_MB = int(os.environ.get('RESUME_PARSE_MEMORY_MB', 512))
+PARSE_MAX_TASKS_PER_WORKER = int(os.environ.get('RESUME_PARSE_MAX_TASKS_PER_WORKER', 50))
+
+# Header fields first: they only need page one, so they survive most timeouts
+FIELD_ORDER = ('name', 'email', 'phone', 'experience', 'location', 'skills',
+               'degree', 'university', 'company', 'designation')
+# Values reported for fields that did not finish in time
+MISSING_VALUES = {'name': 'Unknown', 'skills': []}
+
+
+def _limit_memory(memory_mb):
+    """Cap the child's address space at its current size plus memory_mb"""
+    try:
+        with open('/proc/self/statm') as f:
+            current = int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return
+    limit = current + memory_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _worker_main(conn, memory_mb):
+    """Child process loop: parse (filepath, max_pages, content) requests until told to stop"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if memory_mb:
+        _limit_memory(memory_mb)
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        filepath, max_pages, content = request
+        try:
+            parser = ResumeParser(filepath, max_pages=max_pages, content=content)
+            for field in FIELD_ORDER:
+                value = getattr(parser, field)
+                conn.send(('field', field, value, parser.calculate_confidence(field, value)))
+            conn.send(('done',))
+        except MemoryError:
+            conn.send(('fatal', f'Memory limit of {memory_mb}MB exceeded'))
+            return
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+
+class _Worker:
+    def __init__(self, memory_mb):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_main, args=(child_conn, memory_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ParseWorkerPool:
+    def __init__(self, max_workers, deadline=PARSE_DEADLINE, memory_mb=PARSE_MEMORY_MB,
+                 max_tasks_per_worker=PARSE_MAX_TASKS_PER_WORKER):
+        """
+        Args:
+            max_workers: Maximum number of parser processes
+            deadline: Seconds allowed per document
+            memory_mb: Address-space allowance per worker on top of its
+                inherited size (0 = no cap)
+            max_tasks_per_worker: Documents parsed before a worker is replaced
+        """
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.memory_mb = memory_mb
+        self.max_tasks_per_worker = max_tasks_per_worker
+
+        self._idle = []
+        self._count = 0
+        self._cond = threading.Condition()
+
+        # Counters for stats()
+        self._parsed = 0
+        self._partial = 0
+        self._timeouts = 0
+        self._crashes = 0
+        self._recycled = 0
+
+    def _acquire(self):
+        with self._cond:
+            while not self._idle and self._count >= self.max_workers:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._count += 1
+        try:
+            return _Worker(self.memory_mb)
+        except Exception:
+            with self._cond:
+                self._count -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, worker, healthy):
+        recycle = not healthy or worker.tasks >= self.max_tasks_per_worker
+        if recycle:
+            worker.stop()
+        with self._cond:
+            if recycle:
+                self._count -= 1
+                self._recycled += 1
+            else:
+                self._idle.append(worker)
+            self._cond.notify()
+
+    def parse(self, filepath, max_pages=None, content=None):
+        """
+        Parse one resume within the deadline
+
+        content, if given, is the file's bytes: the worker parses them
+        directly instead of reading filepath from disk.
+
+        Returns:
+            (data, error). data is None if nothing could be extracted; if
+            both are set, data is a partial result and error says why.
+        """
+        worker = self._acquire()
+        deadline_at = time.monotonic() + self.deadline
+        results = {}
+        error = None
+        healthy = True
+        timed_out = crashed = False
+        try:
+            worker.conn.send((filepath, max_pages, content))
+            worker.tasks += 1
+            while True:
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0 or not worker.conn.poll(remaining):
+                    error = f'Parse deadline of {self.deadline:g}s exceeded'
+                    healthy = False
+                    timed_out = True
+                    break
+                message = worker.conn.recv()
+                if message[0] == 'field':
+                    results[message[1]] = (message[2], message[3])
+                elif message[0] == 'done':
+                    break
+                else:
+                    error = message[1]
+                    healthy = message[0] != 'fatal'
+                    break
+        except (EOFError, OSError):
+            error = 'Parser worker exited unexpectedly'
+            healthy = False
+            crashed = True
+        finally:
+            self._release(worker, healthy)
+
+        with self._cond:
+            self._parsed += 1
+            self._timeouts += timed_out
+            self._crashes += crashed
+            if error and results:
+                self._partial += 1
+        if error and not results:
+            return None, error
+        if error:
+            print(f"Partial parse of {filepath}: {error} "
+                  f"(missing {', '.join(f for f in FIELDS if f not in results)})")
+        return self._assemble(results), error
+
+    @staticmethod
+    def _assemble(results):
+        """extract_data()-shaped dict; unfinished fields get placeholders and 0.0 confidence"""
+        data = {field: results[field][0] if field in results else MISSING_VALUES.get(field)
+                for field in FIELDS}
+        data['confidence'] = {CONFIDENCE_KEYS[field]: results[field][1] if field in results else 0.0
+                              for field in FIELDS}
+        return data
+
+    def map(self, filepaths, contents=None):
+        """parse() many files concurrently; results in input order"""
+        if not filepaths:
+            return []
+        contents = contents or [None] * len(filepaths)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(filepaths))) as executor:
+            return list(executor.map(lambda args: self.parse(args[0], content=args[1]),
+                                     zip(filepaths, contents)))
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+        for worker in idle:
+            worker.stop()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'max_workers': self.max_workers,
+                'workers': self._count,
+                'idle': len(self._idle),
+                'deadline_s': self.deadline,
+                'memory_mb': self.memory_mb,
+                'parsed': self._parsed,
+                'partial': self._partial,
+                'timeouts': self._timeouts,
+                'crashes': self._crashes,
+                'recycled': self._recycled,
+            }
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool():
+    """Shared parser pool, created once per (forked) server process"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            workers = int(os.environ.get('BATCH_PARSE_WORKERS', os.cpu_count() or 1))
+            _pool = ParseWorkerPool(max_workers=workers)
+            _pool_pid = os.getpid()
+        return _pool
@@ -0,0 +1,206 @@
+"""
+Cheap PAN / Aadhaar card classifier
+
+Picks a card's document type before verification, so the right name
+extractor and OCR region are used and the full-resolution OCR pass is not
+wasted on the wrong profile. Each image is reduced to a thumbnail (JPEGs are
+decoded at reduced scale) and scored on
+  - colour features: PAN cards have a light blue background, Aadhaar cards
+    a white one with a saffron header band and a red line along the bottom
+  - keywords and number patterns read by a fast, low-resolution sparse-text
+    OCR of the thumbnail ("INCOME TAX DEPARTMENT", a PAN number; "Aadhaar",
+    "DOB", a 12-digit UID)
+A type is only chosen when it wins by a clear margin; otherwise the caller
+falls back to other hints (filename, upload order).
+"""
+from collections import namedtuple
+import re
+import threading
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from parsers.ocr_pool import get_ocr_pool
+from parsers.ocr_preprocess import binarize
+
+# Longer side of the thumbnail that is OCR'd for keywords
+KEYWORD_OCR_SIDE = 1000
+# Width of the thumbnail colour features are computed on
+FEATURE_WIDTH = 128
+# Sparse text: find words anywhere, no layout analysis
+KEYWORD_OCR_CONFIG = '--psm 11'
+
+# (pattern, weight) per document type, matched against the lowercased OCR text
+KEYWORDS = {
+    'PAN Card': [
+        (re.compile(r'income\s*tax'), 3.0),
+        (re.compile(r'permanent\s*account'), 3.0),
+        (re.compile(r'account\s*number'), 1.5),
+        (re.compile(r'tax\s*department'), 1.5),
+        (re.compile(r'father'), 1.0),
+    ],
+    'Aadhaar Card': [
+        (re.compile(r'aadha+r'), 3.0),
+        (re.compile(r'unique\s*identification|uidai'), 3.0),
+        (re.compile(r'government\s*of\s*india'), 1.0),
+        (re.compile(r'\bdob\b|year\s*of\s*birth'), 1.0),
+        (re.compile(r'\b(?:fe)?male\b'), 1.0),
+        (re.compile(r'\bvid\b'), 1.0),
+    ],
+}
+# Matched against the OCR text as read (case matters for PAN numbers)
+NUMBER_PATTERNS = {
+    'PAN Card': (re.compile(r'\b[A-Z]{5}\d{4}[A-Z]\b'), 3.0),
+    'Aadhaar Card': (re.compile(r'(?<!\d)\d{4}\s\d{4}\s\d{4}(?!\d)'), 3.0),
+}
+# Card stock is lighter than this (0-255); darker surroundings are cropped off
+CARD_MIN_LUMA = 160
+# Weight of a colour feature at full strength
+FEATURE_WEIGHT = 2.0
+
+# The winner needs at least this score and this lead over the runner-up
+MIN_SCORE = 3.0
+MIN_MARGIN = 2.0
+
+# document_type is None when the classifier is unsure
+Classification = namedtuple('Classification', 'document_type scores')
+
+
+def thumbnail(source, side=KEYWORD_OCR_SIDE):
+    """RGB copy of an image (path or file object) with its longer side at most `side`"""
+    image = Image.open(source)
+    if image.format == 'JPEG':
+        # Decode at 1/2, 1/4 or 1/8 scale where that still leaves `side` pixels
+        image.draft('RGB', (side, side))
+    image = ImageOps.exif_transpose(image).convert('RGB')
+    image.thumbnail((side, side), Image.BILINEAR)
+    return image
+
+
+def colour_features(image):
+    """
+    Share (0-1) of the card's pixels showing each card's colour cues
+
+    Returns:
+        {'blue_background', 'saffron_header', 'red_footer'}
+    """
+    height = max(1, round(image.height * FEATURE_WIDTH / image.width))
+    pixels = _card_pixels(np.asarray(image.resize((FEATURE_WIDTH, height), Image.BILINEAR), dtype=np.int16))
+    red, green, blue = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+    height = pixels.shape[0]
+
+    light_blue = (blue > 170) & (blue - red > 15) & (green > 150)
+    saffron = (red > 200) & (red - blue > 50) & (green > 130) & (green < red - 10)
+    strong_red = (red > 150) & (red - green > 80) & (red - blue > 80)
+
+    band = max(1, height // 5)
+    return {
+        'blue_background': float(light_blue.mean()),
+        'saffron_header': float(saffron[:band].mean()),
+        'red_footer': float(strong_red[-band:].max(axis=1).mean()),
+    }
+
+
+def _card_pixels(pixels):
+    """Crop a photo to the card: the rows and columns that are mostly light"""
+    light = pixels.mean(axis=2) > CARD_MIN_LUMA
+    rows = np.flatnonzero(light.mean(axis=1) > 0.5)
+    columns = np.flatnonzero(light.mean(axis=0) > 0.5)
+    if len(rows) < 2 or len(columns) < 2:
+        return pixels
+    return pixels[rows[0]:rows[-1] + 1, columns[0]:columns[-1] + 1]
+
+
+def score_features(features):
+    """Per-type scores from colour_features()"""
+    return {
+        # Most of a PAN card is background
+        'PAN Card': FEATURE_WEIGHT * min(1.0, features['blue_background'] / 0.5),
+        'Aadhaar Card': FEATURE_WEIGHT * min(1.0, features['saffron_header'] / 0.3 + features['red_footer']),
+    }
+
+
+def score_text(text):
+    """Per-type keyword and number-pattern scores of OCR text"""
+    lowered = text.lower()
+    scores = {}
+    for document_type, keywords in KEYWORDS.items():
+        score = sum(weight for pattern, weight in keywords if pattern.search(lowered))
+        pattern, weight = NUMBER_PATTERNS[document_type]
+        if pattern.search(text):
+            score += weight
+        scores[document_type] = score
+    return scores
+
+
+def decide(scores):
+    """The best-scoring type if it clears MIN_SCORE by MIN_MARGIN, else None"""
+    ranked = sorted(scores.items(), key=lambda item: -item[1])
+    best_type, best = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+    if best >= MIN_SCORE and best - runner_up >= MIN_MARGIN:
+        return best_type
+    return None
+
+
+class DocumentClassifier:
+    def __init__(self, ocr_pool=None):
+        self.ocr_pool = ocr_pool or get_ocr_pool()
+        self._lock = threading.Lock()
+        self._outcomes = {'classified': 0, 'unsure': 0, 'unreadable': 0}
+
+    def classify(self, sources):
+        """
+        Document type of each card image
+
+        Thumbnails are made here; their keyword OCR is one batched tesseract
+        run on the shared OCR pool.
+
+        Args:
+            sources: Image paths and/or file objects (rewound by the caller
+                before reuse)
+
+        Returns:
+            List of Classification in the same order; document_type is None
+            for unreadable images and where no type wins clearly
+        """
+        results = [None] * len(sources)
+        readable = []
+        thumbnails = []
+        for index, source in enumerate(sources):
+            try:
+                image = thumbnail(source)
+            except Exception as e:
+                print(f"Could not classify document {index}: {e}")
+                results[index] = Classification(None, {})
+                self._count('unreadable')
+                continue
+            readable.append((index, colour_features(image)))
+            thumbnails.append(binarize(image.convert('L')))
+
+        texts = [None] * len(thumbnails)
+        if thumbnails:
+            try:
+                texts = self.ocr_pool.ocr_batch(thumbnails, config=KEYWORD_OCR_CONFIG)
+            except Exception as e:
+                # Colour features alone stay below MIN_SCORE: the caller's hints decide
+                print(f"Keyword OCR failed, classifying on image features only: {e}")
+
+        for (index, features), text in zip(readable, texts):
+            feature_scores = score_features(features)
+            text_scores = score_text(text or '')
+            scores = {document_type: round(feature_scores[document_type] + text_scores[document_type], 2)
+                      for document_type in KEYWORDS}
+            document_type = decide(scores)
+            results[index] = Classification(document_type, scores)
+            self._count('classified' if document_type else 'unsure')
+        return results
+
+    def _count(self, outcome):
+        with self._lock:
+            self._outcomes[outcome] += 1
+
+    def stats(self):
+        """Images classified so far, by outcome"""
+        with self._lock:
+            return dict(self._outcomes)
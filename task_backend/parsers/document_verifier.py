@@ -1,49 +1,222 @@
 import os
 import re
-from PIL import Image
-import pytesseract
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pdf2image import convert_from_path
-from difflib import SequenceMatcher
+from PyPDF2 import PdfReader
+from parsers.name_matcher import name_similarity, normalize_name
+from parsers.ocr_cache import get_ocr_cache, hash_file
+from parsers.ocr_pool import get_ocr_pool
+from parsers.ocr_preprocess import OCR_PROFILES, MAX_SIDE, PREPROCESS_VERSION
+
+# Scanned PDF pages are rendered at this DPI, lowered for large pages so the
+# longer side stays within the OCR preprocessing cap (no pixels thrown away)
+PDF_RENDER_DPI = int(os.environ.get('PDF_RENDER_DPI', 300))
+PDF_MIN_RENDER_DPI = 150
+# A text layer is used only if it has this many letters/digits...
+MIN_TEXT_LAYER_CHARS = 20
+# ...and they make up this share of its non-space characters (rejects
+# glyph-id garbage from fonts without a Unicode mapping)
+MIN_TEXT_LAYER_ALNUM_RATIO = 0.5
+# Placeholders some extractors emit for unmapped glyphs
+UNMAPPED_GLYPH = re.compile(r'\(cid:\d+\)')
+
+# 12-digit Aadhaar number, optionally grouped 4-4-4 on one line. Digits on
+# neighbouring lines (a DOB) never join it, and the first 12 digits of a
+# 16-digit VID ("1234 5678 9012 3456") are not mistaken for it.
+AADHAAR_UID = re.compile(r'(?<!\d)(?<!\d[ \t])(\d{4})[ \t]?(\d{4})[ \t]?(\d{4})(?![ \t]?\d)')
+
+# How a document's text was obtained
+TEXT_LAYER = 'text_layer'
+OCR = 'ocr'
+REGION_OCR = 'region_ocr'
 
 class DocumentVerifier:
-    def __init__(self):
+    def __init__(self, ocr_pool=None, ocr_cache=None):
         # Set tesseract path (update this based on your installation)
         # For Windows, typically: C:\Program Files\Tesseract-OCR\tesseract.exe
         # pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-        pass
+        
+        # OCR runs on a shared, bounded process pool (OCR_WORKERS)
+        self.ocr_pool = ocr_pool or get_ocr_pool()
+        # OCR results of unchanged documents are reused across uploads
+        self.ocr_cache = ocr_cache or get_ocr_cache()
+        self._methods = Counter()
+        self._lock = threading.Lock()
     
-    def extract_text_from_image(self, image_path):
-        """Extract text from image using OCR"""
+    def extract_text_from_image(self, image_path, document_type=None, field='name'):
+        """
+        Extract text from image using OCR
+        
+        The image is downscaled, grayscaled, deskewed and binarized first. If
+        document_type has an OCR profile, only the region of the card that
+        holds `field` is read, with that region's tesseract settings.
+        """
         try:
-            img = Image.open(image_path)
-            text = pytesseract.image_to_string(img, lang='eng')
-            return text
+            region, profile = self._image_ocr_profile(document_type, field)
+            if region:
+                compute = lambda: self.ocr_pool.ocr([image_path], preprocess=True, regions=[region])[0][0]
+            else:
+                compute = lambda: self.ocr_pool.ocr([image_path], preprocess=True)[0]
+            return self.ocr_cache.get_or_compute(hash_file(image_path), profile, compute)
         except Exception as e:
             print(f"Error extracting text from image: {e}")
             return ""
     
+    def extract_texts_from_images(self, image_paths, document_type=None, field='name'):
+        """
+        extract_text_from_image() for many images, OCR'd in batches
+        
+        Cached images are skipped; the rest are read by a few tesseract
+        processes in total rather than one per image.
+        
+        Returns:
+            List of texts in the same order ("" where OCR failed)
+        """
+        return [texts[field] for texts in self.extract_fields_from_images(image_paths, document_type, (field,))]
+    
+    def extract_fields_from_images(self, image_paths, document_type=None, fields=('name',)):
+        """
+        Text of several fields of many card images, OCR'd in batches
+        
+        Each uncached image is preprocessed once and all of its field regions
+        are read in the same batch. Every field is cached on its own, so
+        later single-field reads are cache hits. Without an OCR profile for
+        document_type every field gets the whole image's text.
+        
+        Returns:
+            List of {field: text} in the same order ("" where OCR failed)
+        """
+        profiles = [self._image_ocr_profile(document_type, field) for field in fields]
+        if any(region is None for region, _ in profiles):
+            profiles = [self._image_ocr_profile(None, field) for field in fields]
+        regions = [region for region, _ in profiles if region]
+        texts = [dict.fromkeys(fields, "") for _ in image_paths]
+        hashes = {}
+        misses = []
+        for index, image_path in enumerate(image_paths):
+            try:
+                hashes[index] = hash_file(image_path)
+            except OSError as e:
+                print(f"Error extracting text from image: {e}")
+                continue
+            # A cached "" (blank card) is a hit too
+            cached = [self.ocr_cache.get(hashes[index], profile) for _, profile in profiles]
+            if any(text is None for text in cached):
+                misses.append(index)
+            else:
+                texts[index] = dict(zip(fields, cached))
+        if not misses:
+            return texts
+        
+        try:
+            results = self.ocr_pool.ocr_batch([image_paths[index] for index in misses], preprocess=True,
+                                              regions=regions or None)
+        except Exception as e:
+            print(f"Error extracting text from images: {e}")
+            return texts
+        for index, result in zip(misses, results):
+            if result is None:
+                continue
+            if not regions:
+                result = [result] * len(fields)
+            for field, (_, profile), text in zip(fields, profiles, result):
+                self.ocr_cache.put(hashes[index], profile, text)
+                texts[index][field] = text
+        return texts
+    
+    def _image_ocr_profile(self, document_type, field):
+        """(region or None, cache profile) for OCR of an image"""
+        region = OCR_PROFILES.get(document_type, {}).get(field)
+        if region:
+            return region, self._ocr_profile(config=region.config, region=region.box)
+        return None, self._ocr_profile()
+    
+    @staticmethod
+    def _ocr_profile(lang='eng', config='', region=None, dpi=None):
+        """Everything besides the file content that determines OCR output (the cache key)"""
+        return {'lang': lang, 'config': config, 'region': region, 'dpi': dpi, 'preprocess': PREPROCESS_VERSION}
+    
     def extract_text_from_pdf(self, pdf_path):
-        """Extract text from PDF by converting to images first"""
+        """Extract text from PDF: the embedded text layer if usable, otherwise OCR"""
+        return self._extract_pdf(pdf_path)[0]
+    
+    def _extract_pdf(self, pdf_path):
+        """(text, method) for a PDF"""
+        page_sizes = []
+        try:
+            reader = PdfReader(pdf_path)
+            if reader.is_encrypted:
+                reader.decrypt('')
+            page_sizes = [(float(page.mediabox.width), float(page.mediabox.height)) for page in reader.pages]
+            text = "".join((page.extract_text() or "") + "\n" for page in reader.pages)
+            if self.is_usable_text(text):
+                return text, TEXT_LAYER
+        except Exception as e:
+            # Encrypted, damaged or unusual PDFs: let poppler try
+            print(f"No usable text layer in {pdf_path}: {e}")
+        return self._ocr_pdf(pdf_path, page_sizes), OCR
+    
+    def _ocr_pdf(self, pdf_path, page_sizes):
+        """Rasterize (in memory, grayscale) and OCR the pages in parallel, handed over via shared memory"""
         try:
-            images = convert_from_path(pdf_path)
-            text = ""
-            for img in images:
-                text += pytesseract.image_to_string(img, lang='eng') + "\n"
-            return text
+            dpi = self.render_dpi(page_sizes)
+            
+            def ocr_pages():
+                images = convert_from_path(pdf_path, dpi=dpi, grayscale=True)
+                return "".join(text + "\n" for text in self.ocr_pool.ocr_pages(images, preprocess=True))
+            
+            return self.ocr_cache.get_or_compute(hash_file(pdf_path), self._ocr_profile(dpi=dpi), ocr_pages)
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
             return ""
     
-    def extract_text_from_document(self, file_path):
-        """Extract text based on file type"""
+    @staticmethod
+    def render_dpi(page_sizes):
+        """PDF_RENDER_DPI, capped so the largest page renders within MAX_SIDE pixels"""
+        if not page_sizes:
+            return PDF_RENDER_DPI
+        longest_inches = max(max(size) for size in page_sizes) / 72.0
+        if longest_inches <= 0:
+            return PDF_RENDER_DPI
+        return max(PDF_MIN_RENDER_DPI, min(PDF_RENDER_DPI, int(MAX_SIDE / longest_inches)))
+    
+    @staticmethod
+    def is_usable_text(text):
+        """Whether extracted text looks like real text rather than nothing or glyph garbage"""
+        chars = [c for c in UNMAPPED_GLYPH.sub('\ufffd', text) if not c.isspace()]
+        alnum = sum(c.isalnum() for c in chars)
+        return alnum >= MIN_TEXT_LAYER_CHARS and alnum >= MIN_TEXT_LAYER_ALNUM_RATIO * len(chars)
+    
+    def extract_text_from_document(self, file_path, document_type=None, field='name'):
+        """Extract text based on file type (region OCR applies to images only)"""
+        return self._extract_document(file_path, document_type, field)[0]
+    
+    def _extract_document(self, file_path, document_type=None, field='name'):
+        """(text, method) based on file type; method is None for unsupported files"""
         file_ext = os.path.splitext(file_path)[1].lower()
         
         if file_ext in ['.jpg', '.jpeg', '.png']:
-            return self.extract_text_from_image(file_path)
+            text = self.extract_text_from_image(file_path, document_type, field)
+            return text, REGION_OCR if self.uses_region_ocr(file_path, document_type, field) else OCR
         elif file_ext == '.pdf':
-            return self.extract_text_from_pdf(file_path)
+            return self._extract_pdf(file_path)
         else:
-            return ""
+            return "", None
+    
+    def uses_region_ocr(self, file_path, document_type, field='name'):
+        """Whether extract_text_from_document reads only a region of this document"""
+        return (os.path.splitext(file_path)[1].lower() in ['.jpg', '.jpeg', '.png']
+                and field in OCR_PROFILES.get(document_type, {}))
+    
+    def extract_name(self, text, document_type):
+        """Extract the holder's name using the document type's rules"""
+        if 'aadhaar' in document_type.lower():
+            return self.extract_name_from_aadhaar(text)
+        elif 'pan' in document_type.lower():
+            return self.extract_name_from_pan(text)
+        return None
     
     def extract_name_from_aadhaar(self, text):
         """Extract name from Aadhaar card text"""
@@ -126,35 +299,16 @@ class DocumentVerifier:
     
     def normalize_name(self, name):
         """Normalize name for comparison"""
-        if not name:
-            return ""
-        # Convert to lowercase, remove extra spaces, remove special characters
-        name = re.sub(r'[^a-zA-Z\s]', '', name)
-        name = ' '.join(name.lower().split())
-        return name
+        return normalize_name(name)
     
     def calculate_name_similarity(self, name1, name2):
-        """Calculate similarity between two names (0-1)"""
-        norm1 = self.normalize_name(name1)
-        norm2 = self.normalize_name(name2)
-        
-        if not norm1 or not norm2:
-            return 0.0
-        
-        # Use sequence matcher for fuzzy matching
-        similarity = SequenceMatcher(None, norm1, norm2).ratio()
-        
-        # Also check if one name is contained in the other (partial match)
-        words1 = set(norm1.split())
-        words2 = set(norm2.split())
-        
-        # Calculate word overlap
-        if words1 and words2:
-            word_overlap = len(words1.intersection(words2)) / max(len(words1), len(words2))
-            # Use higher of sequence similarity or word overlap
-            similarity = max(similarity, word_overlap)
+        """
+        Calculate similarity between two names (0-1)
         
-        return similarity
+        Best of character similarity (as written and token-sorted) and token
+        overlap, where initials match full tokens; see parsers/name_matcher.py.
+        """
+        return name_similarity(name1, name2)
     
     def extract_aadhaar_number(self, text):
         """Extract 16-digit Aadhaar number from text"""
@@ -194,6 +348,59 @@ class DocumentVerifier:
         
         return None
     
+    def extract_identity_number(self, text, document_type):
+        """
+        PAN or Aadhaar number in text, per document type
+        
+        For Aadhaar cards this is the 12-digit number printed on every card.
+        A 16-digit VID is never returned: the holder can regenerate it at
+        will, so it cannot identify reuse.
+        """
+        if not text:
+            return None
+        if 'pan' in document_type.lower():
+            return self.extract_pan_number(text)
+        if 'aadhaar' in document_type.lower():
+            match = AADHAAR_UID.search(text)
+            return ''.join(match.groups()) if match else None
+        return None
+    
+    def extract_identity_numbers(self, documents):
+        """
+        Identity numbers of many documents, outside verification
+        
+        For documents that are not being verified (backfill_identity_numbers.py);
+        verify_documents() returns the numbers of the documents it verifies.
+        Card images are OCR'd in batches through their 'number' region (then
+        whole cards where no number was found); both are cache hits for
+        documents verified with read_numbers, as is the text of PDFs.
+        
+        Args:
+            documents: list of (file_path, document_type)
+        
+        Returns:
+            list of numbers (None where none was found), in the same order
+        """
+        numbers = [None] * len(documents)
+        by_type = {}
+        for index, (file_path, document_type) in enumerate(documents):
+            if os.path.splitext(file_path)[1].lower() in ['.jpg', '.jpeg', '.png']:
+                by_type.setdefault(document_type, []).append(index)
+            else:
+                text = self._extract_document(file_path, document_type, field='number')[0]
+                numbers[index] = self.extract_identity_number(text, document_type)
+        for document_type, indexes in by_type.items():
+            texts = self.extract_texts_from_images([documents[index][0] for index in indexes], document_type, 'number')
+            for index, text in zip(indexes, texts):
+                numbers[index] = self.extract_identity_number(text, document_type)
+        
+        retry = [index for indexes in by_type.values() for index in indexes if numbers[index] is None]
+        if retry:
+            texts = self.extract_texts_from_images([documents[index][0] for index in retry])
+            for index, text in zip(retry, texts):
+                numbers[index] = self.extract_identity_number(text, documents[index][1])
+        return numbers
+    
     def validate_aadhaar_number(self, aadhaar_number):
         """Validate Aadhaar number format: 16 digits"""
         if not aadhaar_number:
@@ -232,15 +439,23 @@ class DocumentVerifier:
         
         return True
     
-    def verify_document(self, file_path, document_type, candidate_name, threshold=0.7):
+    def verify_document(self, file_path, document_type, candidate_name, threshold=0.7, extracted=None,
+                        number_text=None):
         """
         Verify document by extracting and matching name only
         
+        The PAN/Aadhaar number is read from the same text (or number_text)
+        and returned as 'identity_number' for reuse checks; it takes no OCR
+        pass of its own.
+        
         Args:
             file_path: Path to the document file
             document_type: 'PAN Card' or 'Aadhaar Card'
             candidate_name: Expected name from candidate profile
             threshold: Minimum similarity score (0-1) for verification to pass
+            extracted: (text, extraction_method) if the text has already been
+                extracted (e.g. by verify_documents' batched OCR)
+            number_text: Text of the card's number region, if it was read
         
         Returns:
             dict with verification result
@@ -251,9 +466,20 @@ class DocumentVerifier:
         print(f"File: {file_path}")
         print(f"Expected Name: {candidate_name}")
         
-        # Extract text from document
-        text = self.extract_text_from_document(file_path)
-        print(f"Extracted Text Length: {len(text)} characters")
+        if extracted is None:
+            # Extract text from document (just the name region for card images)
+            extracted = self._extract_document(file_path, document_type)
+            if extracted[1] == REGION_OCR and not self._has_name(extracted[0], document_type):
+                # Unusual layout or framing: fall back to reading the whole card
+                print("Name not found in card region, reading the full document")
+                extracted = self._extract_document(file_path)
+        text, method = extracted
+        extracted_name = self.extract_name(text, document_type) if text else None
+        identity_number = (self.extract_identity_number(number_text, document_type)
+                           or self.extract_identity_number(text, document_type))
+        
+        self._record_method(method)
+        print(f"Extracted Text Length: {len(text)} characters (via {method})")
         
         if not text or len(text) < 10:
             return {
@@ -261,17 +487,11 @@ class DocumentVerifier:
                 'status': 'Verification Failed',
                 'reason': 'Unable to extract text from document',
                 'extracted_name': None,
-                'similarity_score': 0.0
+                'similarity_score': 0.0,
+                'extraction_method': method,
+                'identity_number': identity_number
             }
         
-        # Extract name based on document type
-        extracted_name = None
-        
-        if 'aadhaar' in document_type.lower():
-            extracted_name = self.extract_name_from_aadhaar(text)
-        elif 'pan' in document_type.lower():
-            extracted_name = self.extract_name_from_pan(text)
-        
         print(f"Extracted Name: {extracted_name}")
         
         if not extracted_name:
@@ -280,7 +500,9 @@ class DocumentVerifier:
                 'status': 'Verification Failed',
                 'reason': 'Unable to extract name from document',
                 'extracted_name': None,
-                'similarity_score': 0.0
+                'similarity_score': 0.0,
+                'extraction_method': method,
+                'identity_number': identity_number
             }
         
         # Calculate similarity
@@ -295,10 +517,75 @@ class DocumentVerifier:
             'status': 'Pass' if verified else 'Verification Failed',
             'reason': f'Name match: {similarity:.2%}' if verified else f'Name mismatch (similarity: {similarity:.2%})',
             'extracted_name': extracted_name,
-            'similarity_score': similarity
+            'similarity_score': similarity,
+            'extraction_method': method,
+            'identity_number': identity_number
         }
         
         print(f"Result: {result['status']}")
         print(f"{'='*60}\n")
         
         return result
+    
+    def verify_documents(self, documents, threshold=0.7, read_numbers=False):
+        """
+        Verify several documents concurrently
+        
+        Card images are OCR'd in batches (name regions first, then whole cards
+        where no name was found); PDFs are extracted one per thread, their
+        pages fanning out over the OCR pool.
+        
+        Args:
+            documents: list of (file_path, document_type, candidate_name)
+            threshold: Minimum similarity score (0-1) for verification to pass
+            read_numbers: Also read card images' number regions, in the same
+                batch as their name regions, for a more reliable
+                'identity_number'
+        
+        Returns:
+            list of verify_document() results, in the same order
+        """
+        if not documents:
+            return []
+        extracted = [None] * len(documents)
+        number_texts = [None] * len(documents)
+        
+        by_type = {}
+        for index, (file_path, document_type, _) in enumerate(documents):
+            if os.path.splitext(file_path)[1].lower() in ['.jpg', '.jpeg', '.png']:
+                by_type.setdefault(document_type, []).append(index)
+        for document_type, indexes in by_type.items():
+            paths = [documents[index][0] for index in indexes]
+            fields = ('name', 'number') if read_numbers and 'number' in OCR_PROFILES.get(document_type, {}) \
+                else ('name',)
+            for index, texts in zip(indexes, self.extract_fields_from_images(paths, document_type, fields)):
+                method = REGION_OCR if self.uses_region_ocr(documents[index][0], document_type) else OCR
+                extracted[index] = (texts['name'], method)
+                number_texts[index] = texts.get('number')
+        
+        retry = [index for index, result in enumerate(extracted)
+                 if result and result[1] == REGION_OCR and not self._has_name(result[0], documents[index][1])]
+        if retry:
+            print(f"Name not found in {len(retry)} card region(s), reading the full documents")
+            texts = self.extract_texts_from_images([documents[index][0] for index in retry])
+            for index, text in zip(retry, texts):
+                extracted[index] = (text, OCR)
+        
+        # Threads only wait on the shared OCR pool, which bounds tesseract load
+        with ThreadPoolExecutor(max_workers=len(documents)) as executor:
+            return list(executor.map(
+                lambda item: self.verify_document(*item[0], threshold=threshold, extracted=item[1],
+                                                  number_text=item[2]),
+                zip(documents, extracted, number_texts)))
+    
+    def _has_name(self, text, document_type):
+        return bool(text) and bool(self.extract_name(text, document_type))
+    
+    def _record_method(self, method):
+        with self._lock:
+            self._methods[method or 'unsupported'] += 1
+    
+    def stats(self):
+        """Documents verified so far, by how their text was obtained"""
+        with self._lock:
+            return dict(self._methods)
@@ -0,0 +1,76 @@
+"""
+Streaming DOCX text extraction
+
+Reads word/document.xml straight out of the zip with lxml iterparse instead
+of building python-docx's object model. Paragraphs are yielded in document
+order, including the paragraphs inside table cells (where many resume
+templates keep skills and experience), and each element is cleared once
+consumed so memory stays flat on large files.
+"""
+import zipfile
+
+from lxml import etree
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_BODY = W_NS + 'body'
+W_P = W_NS + 'p'
+W_T = W_NS + 't'
+W_BR = W_NS + 'br'
+W_TYPE = W_NS + 'type'
+
+# Run-level elements that stand for characters (same mapping as python-docx;
+# page and column breaks, unlike line breaks, are dropped)
+SPECIAL_CHARS = {
+    W_NS + 'tab': '\t',
+    W_NS + 'ptab': '\t',
+    W_NS + 'br': '\n',
+    W_NS + 'cr': '\n',
+    W_NS + 'noBreakHyphen': '-',
+}
+
+
+def _paragraph_text(paragraph):
+    parts = []
+    for element in paragraph.iter(W_T, *SPECIAL_CHARS):
+        if element.tag == W_T:
+            if element.text:
+                parts.append(element.text)
+        elif element.tag == W_BR and element.get(W_TYPE, 'textWrapping') != 'textWrapping':
+            continue
+        else:
+            parts.append(SPECIAL_CHARS[element.tag])
+    return ''.join(parts)
+
+
+def iter_docx_paragraphs(source):
+    """
+    Yield the text of every paragraph in a .docx, in document order
+
+    Args:
+        source: Path or binary file object
+
+    Raises:
+        zipfile.BadZipFile, KeyError (no word/document.xml) or
+        etree.XMLSyntaxError for files that are not valid DOCX
+    """
+    with zipfile.ZipFile(source) as zf:
+        with zf.open('word/document.xml') as xml:
+            context = etree.iterparse(xml, events=('end',), resolve_entities=False, no_network=True)
+            for _, element in context:
+                if element.tag == W_P:
+                    yield _paragraph_text(element)
+                    # Clearing also keeps a text box's paragraphs from being
+                    # repeated in the paragraph that contains it
+                    element.clear(keep_tail=True)
+                parent = element.getparent()
+                if parent is not None and parent.tag == W_BODY:
+                    # Top-level block done: drop it and everything before it
+                    element.clear(keep_tail=True)
+                    while element.getprevious() is not None:
+                        del parent[0]
+            del context
+
+
+def extract_docx_text(source):
+    """Paragraph texts joined with newlines"""
+    return '\n'.join(iter_docx_paragraphs(source))
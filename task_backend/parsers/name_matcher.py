@@ -0,0 +1,205 @@
+"""
+Fuzzy person-name matching
+
+Names are normalized once into a ParsedName (lowercase letters only,
+tokens, token-sorted form). Two names are compared as
+  - plain and token-sorted character similarity (difflib), so word order
+    ("SHARMA RAHUL" vs "Rahul Sharma") does not matter, and
+  - token overlap where an initial matches a full token with the same first
+    letter ("R K Sharma" vs "Rahul Kumar Sharma"),
+and score the best of these.
+
+NameIndex matches one name against a large table of names: a trigram
+inverted index held in numpy arrays gives every row's Dice coefficient in a
+few vectorized operations, and only the short list that passes is scored in
+full.
+"""
+from collections import namedtuple
+from difflib import SequenceMatcher
+from functools import lru_cache
+import re
+
+import numpy as np
+
+# An initial matching a full token counts this much of an exact token match
+INITIAL_WEIGHT = 0.75
+# Rows whose trigram Dice coefficient with the query is below this are not scored
+PREFILTER_MIN_DICE = 0.3
+# At least this many prefiltered rows are scored per query (20 per requested match beyond)
+MAX_SHORTLIST = 200
+
+ParsedName = namedtuple('ParsedName', 'normalized tokens sorted')
+
+_NON_LETTERS = re.compile(r'[^a-z\s]')
+
+
+def normalize_name(name):
+    """Lowercase letters and single spaces only"""
+    if not name:
+        return ""
+    return ' '.join(_NON_LETTERS.sub('', name.lower()).split())
+
+
+@lru_cache(maxsize=4096)
+def parse_name(name):
+    normalized = normalize_name(name)
+    tokens = tuple(normalized.split())
+    return ParsedName(normalized, tokens, ' '.join(sorted(tokens)))
+
+
+# Columns of the letter-count matrix: a-z and space
+_ALPHABET = 'abcdefghijklmnopqrstuvwxyz '
+
+
+def char_counts(parsed):
+    return np.array([parsed.normalized.count(c) for c in _ALPHABET], dtype=np.uint8)
+
+
+def trigrams(parsed):
+    """Distinct trigrams of each token, padded like pg_trgm ('  ab', ' ab', 'ab ')"""
+    grams = set()
+    for token in parsed.tokens:
+        padded = f'  {token} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def token_score(tokens_a, tokens_b):
+    """Share of tokens matched, exact matches first, then initials to full tokens"""
+    if not tokens_a or not tokens_b:
+        return 0.0
+    remaining = list(tokens_b)
+    unmatched = []
+    score = 0.0
+    for token in tokens_a:
+        if token in remaining:
+            remaining.remove(token)
+            score += 1.0
+        else:
+            unmatched.append(token)
+    for token in unmatched:
+        for other in remaining:
+            if (len(token) == 1 and other.startswith(token)) or (len(other) == 1 and token.startswith(other)):
+                remaining.remove(other)
+                score += INITIAL_WEIGHT
+                break
+    return score / max(len(tokens_a), len(tokens_b))
+
+
+def _score(query, parsed, matcher, min_score=0.0, char_bound=None):
+    """
+    Similarity of parsed to query; matcher has query.sorted as its second sequence
+
+    difflib ratios are only computed when their upper bound (char_bound, the
+    shared-character ratio both forms have in common, or difflib's own
+    quick ratios) could raise the score to min_score or beyond, so scores
+    below min_score may be underestimates.
+    """
+    if not query.normalized or not parsed.normalized:
+        return 0.0
+    score = token_score(query.tokens, parsed.tokens)
+    floor = max(score, min_score)
+    if score >= 1.0 or (char_bound is not None and char_bound < floor):
+        return score
+    matcher.set_seq1(parsed.sorted)
+    if char_bound is not None or (matcher.real_quick_ratio() >= floor and matcher.quick_ratio() >= floor):
+        score = max(score, matcher.ratio())
+    if score < 1.0 and (parsed.normalized != parsed.sorted or query.normalized != query.sorted):
+        as_written = SequenceMatcher(None, parsed.normalized, query.normalized)
+        if char_bound is not None or as_written.quick_ratio() >= max(score, min_score):
+            score = max(score, as_written.ratio())
+    return score
+
+
+def name_similarity(name1, name2):
+    """Similarity of two names (0-1)"""
+    query = parse_name(name1)
+    return _score(query, parse_name(name2), SequenceMatcher(None, b=query.sorted))
+
+
+class NameIndex:
+    def __init__(self, entries):
+        """
+        Args:
+            entries: Iterable of (key, name), e.g. (candidate_id, name) rows
+        """
+        self.keys = []
+        self.names = []
+        self.parsed = []
+        self._gram_ids = {}
+        gram_rows = []
+        gram_ids = []
+        lengths = []
+        counts = []
+        for key, name in entries:
+            parsed = parse_name(name)
+            grams = {self._gram_ids.setdefault(gram, len(self._gram_ids)) for gram in trigrams(parsed)}
+            row = len(self.keys)
+            self.keys.append(key)
+            self.names.append(name)
+            self.parsed.append(parsed)
+            lengths.append(len(grams))
+            counts.append(char_counts(parsed))
+            gram_ids.extend(grams)
+            gram_rows.extend([row] * len(grams))
+
+        # Postings as one array sorted by trigram id, sliced via offsets
+        gram_ids = np.asarray(gram_ids, dtype=np.int32)
+        order = np.argsort(gram_ids, kind='stable')
+        self._postings = np.asarray(gram_rows, dtype=np.int32)[order]
+        self._offsets = np.searchsorted(gram_ids[order], np.arange(len(self._gram_ids) + 1))
+        self._lengths = np.asarray(lengths, dtype=np.float32)
+        # Letter counts per name, for a vectorized bound on the difflib ratios
+        self._chars = np.array(counts, dtype=np.uint8).reshape(len(counts), len(_ALPHABET))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _shortlist(self, parsed, min_dice, limit):
+        """Rows whose trigram Dice coefficient with parsed is at least min_dice, best first"""
+        grams = trigrams(parsed)
+        ids = [self._gram_ids[gram] for gram in grams if gram in self._gram_ids]
+        if not ids:
+            return np.empty(0, dtype=np.int64)
+        postings = np.concatenate([self._postings[self._offsets[i]:self._offsets[i + 1]] for i in ids])
+        shared = np.bincount(postings, minlength=len(self.keys))
+        dice = 2.0 * shared / (len(grams) + self._lengths)
+        rows = np.flatnonzero(dice >= min_dice)
+        if len(rows) > limit:
+            rows = rows[np.argpartition(dice[rows], -limit)[-limit:]]
+        return rows[np.argsort(-dice[rows], kind='stable')]
+
+    def search(self, name, limit=10, min_score=0.8, exclude=None):
+        """
+        Best matches for name
+
+        Args:
+            limit: Maximum matches returned
+            min_score: Minimum name_similarity() of a match
+            exclude: Key to leave out (e.g. the candidate's own id)
+
+        Returns:
+            [(key, name, score), ...], highest score first
+        """
+        query = parse_name(name)
+        if not query.normalized or not self.keys or limit < 1:
+            return []
+        matcher = SequenceMatcher(None, b=query.sorted)
+        rows = self._shortlist(query, PREFILTER_MIN_DICE, max(MAX_SHORTLIST, limit * 20))
+        # difflib's quick_ratio() for every shortlisted row at once
+        chars = self._chars[rows]
+        query_chars = char_counts(query)
+        bounds = 2.0 * np.minimum(chars, query_chars).sum(axis=1) / (chars.sum(axis=1) + query_chars.sum())
+        matches = []
+        for row, bound in zip(rows.tolist(), bounds.tolist()):
+            if exclude is not None and self.keys[row] == exclude:
+                continue
+            score = _score(query, self.parsed[row], matcher, min_score, char_bound=bound)
+            if score >= min_score:
+                matches.append((self.keys[row], self.names[row], score))
+        matches.sort(key=lambda match: -match[2])
+        return matches[:limit]
+
+    def search_many(self, names, limit=10, min_score=0.8):
+        """search() for each name; results in the same order"""
+        return [self.search(name, limit=limit, min_score=min_score) for name in names]
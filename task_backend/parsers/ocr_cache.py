@@ -0,0 +1,176 @@
+"""
+Persistent OCR result cache
+
+OCR text is stored on local disk keyed by the document's content hash
+(xxh3-128) plus a digest of the OCR profile that produced it (language,
+tesseract config, regions, render DPI, preprocessing version), so re-uploads
+and bulk re-verification of unchanged documents skip tesseract entirely and
+any profile change misses cleanly.
+
+The cache is bounded: once it grows past OCR_CACHE_MAX_MB the least recently
+used entries (by file mtime, refreshed on every hit) are evicted. Entries are
+plain files, so all server processes share the cache.
+"""
+import json
+import os
+import tempfile
+import threading
+
+import xxhash
+
+OCR_CACHE_DIR = os.environ.get(
+    'OCR_CACHE_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ocr_cache'))
+# 0 disables the cache
+OCR_CACHE_MAX_BYTES = int(os.environ.get('OCR_CACHE_MAX_MB', 256)) * 1024 * 1024
+# Eviction trims down to this share of the limit, so it runs rarely
+EVICT_TO_RATIO = 0.9
+
+CHUNK_SIZE = 64 * 1024
+
+
+def hash_file(path):
+    """xxh3-128 hex digest of a file's content"""
+    hasher = xxhash.xxh3_128()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def profile_digest(profile):
+    """Stable short digest of an OCR profile dict"""
+    return xxhash.xxh3_64_hexdigest(json.dumps(profile, sort_keys=True).encode('utf-8'))
+
+
+class OcrCache:
+    def __init__(self, directory=OCR_CACHE_DIR, max_bytes=OCR_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Bytes on disk, counted on first use and refreshed by each eviction
+        self._size = None
+
+        # Counters for stats()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._errors = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _path(self, content_hash, profile):
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.directory, content_hash[:2], f"{content_hash}-{profile_digest(profile)}.json")
+
+    def get(self, content_hash, profile):
+        """Cached OCR result, or None"""
+        if not self.enabled:
+            return None
+        path = self._path(content_hash, profile)
+        try:
+            with open(path, encoding='utf-8') as f:
+                result = json.load(f)['result']
+            # Mark as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            result = None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Discarding unreadable OCR cache entry {path}: {e}")
+            result = None
+            with self._lock:
+                self._errors += 1
+        with self._lock:
+            if result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return result
+
+    def put(self, content_hash, profile, result):
+        """Store an OCR result (any JSON-serializable value)"""
+        if not self.enabled:
+            return
+        path = self._path(content_hash, profile)
+        data = json.dumps({'profile': profile, 'result': result}).encode('utf-8')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix='.entry-', dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write OCR cache entry {path}: {e}")
+            with self._lock:
+                self._errors += 1
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan()[1]
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def get_or_compute(self, content_hash, profile, compute):
+        """Cached result, or compute() stored and returned (exceptions are not cached)"""
+        result = self.get(content_hash, profile)
+        if result is None:
+            result = compute()
+            self.put(content_hash, profile, result)
+        return result
+
+    def _scan(self):
+        """([(mtime, size, path), ...], total bytes) for every entry on disk"""
+        entries = []
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries, sum(size for _, size, _ in entries)
+
+    def _evict(self):
+        """Remove least recently used entries down to EVICT_TO_RATIO of max_bytes (lock held)"""
+        # Rescan: other processes write to the same directory
+        entries, size = self._scan()
+        target = self.max_bytes * EVICT_TO_RATIO
+        for _mtime, entry_size, path in sorted(entries):
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+            self._evictions += 1
+        self._size = size
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'enabled': self.enabled,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else None,
+                'evictions': self._evictions,
+                'errors': self._errors,
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+            }
+
+
+_cache = OcrCache()
+
+
+def get_ocr_cache():
+    """The process-wide OCR cache"""
+    return _cache
@@ -0,0 +1,412 @@
+"""
+Shared OCR process pool
+
+All tesseract work in a server process goes through one bounded pool, so
+OCR_WORKERS caps the total tesseract load no matter how many documents are
+being verified at once. Multi-page PDFs fan out one task per page and the
+page texts are reassembled in order. Many separate images (multi-file
+submissions, bulk re-verification) go through ocr_batch(), which has each
+worker read a whole chunk with a single tesseract process, so start-up and
+model loading are paid once per chunk instead of once per image.
+
+Rasterized PDF pages go through ocr_pages(): they are written into a
+shared memory segment (grayscale pages directly, RGB pages through one
+packed copy), workers map their page in place instead of receiving
+a pickled copy, and tesseract reads the (preprocessed) page as PNM on stdin
+and writes its text to stdout, so no page passes through a temp file.
+"""
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+from parsers.ocr_preprocess import preprocess as preprocess_image, crop_region
+
+OCR_WORKERS = int(os.environ.get('OCR_WORKERS', os.cpu_count() or 1))
+# Most images one tesseract process reads in a batch
+OCR_BATCH_SIZE = int(os.environ.get('OCR_BATCH_SIZE', 16))
+# tesseract's default page_separator, written after each image's text
+PAGE_SEPARATOR = '\f'
+# Pages in a shared memory segment start on this boundary
+SHARED_PAGE_ALIGNMENT = 64
+# Where POSIX shared memory lives on Linux (a size-limited tmpfs in containers)
+SHM_DIR = '/dev/shm'
+
+
+def _init_worker():
+    # One tesseract thread per worker: parallelism comes from the pool
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+
+def _ocr_task(source, lang, config, preprocess, regions):
+    """
+    Worker entry point: source is an image path or a PIL image
+
+    Returns the text, or a list of texts (one per region) if regions is given.
+    """
+    image = Image.open(source) if isinstance(source, str) else source
+    if preprocess:
+        image = preprocess_image(image)
+    if regions is None:
+        return pytesseract.image_to_string(image, lang=lang, config=config)
+    return [pytesseract.image_to_string(crop_region(image, region.box), lang=lang, config=region.config)
+            for region in regions]
+
+
+def _pnm_bytes(image):
+    """An 'L' or 'RGB' image as binary PGM/PPM, which tesseract reads from stdin"""
+    if image.mode not in ('L', 'RGB'):
+        image = image.convert('L')
+    magic = b'P5' if image.mode == 'L' else b'P6'
+    return b'%s\n%d %d\n255\n' % (magic, image.width, image.height) + image.tobytes()
+
+
+def _tesseract_stdin(data, lang, config):
+    """OCR an encoded image piped to tesseract, text read from its stdout (no temp files)"""
+    command = [pytesseract.pytesseract.tesseract_cmd, 'stdin', 'stdout', '-l', lang] + shlex.split(config)
+    result = subprocess.run(command, input=data, capture_output=True)
+    if result.returncode:
+        raise pytesseract.TesseractError(result.returncode, result.stderr.decode('utf-8', errors='replace').strip())
+    return result.stdout.decode('utf-8', errors='replace')
+
+
+def _attach_shared_memory(name):
+    """
+    Map an existing segment without registering it with the resource tracker
+
+    The process that created the segment unlinks it. Before Python 3.13 an
+    attaching process registers it too, and a worker with its own tracker
+    would then unlink (and warn about) the segment when the worker exits.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    # Workers run one task at a time, so nothing else registers meanwhile
+    resource_tracker.register = lambda *args: None
+    try:
+        return SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _page_bytes(image):
+    """Raw size of an 'L' or 'RGB' page"""
+    return image.width * image.height * len(image.mode)
+
+
+def _write_shared_page(buffer, offset, image):
+    """
+    Copy a page's pixels into buffer at offset
+
+    'L' pages are pasted straight into the buffer. RGB pages go through one
+    packed copy (numpy reads them via tobytes()) before landing in the buffer.
+    """
+    view = buffer[offset:offset + _page_bytes(image)]
+    try:
+        if image.mode == 'L':
+            # PIL maps an 'L' image onto the buffer itself; pasting writes straight into the segment
+            target = Image.frombuffer('L', image.size, view, 'raw', 'L', 0, 1)
+            target.im.paste(image.im, (0, 0) + image.size)
+            del target
+        else:
+            # RGB is stored padded inside PIL, so it cannot be pasted into a packed buffer
+            np.ndarray((image.height, image.width, 3), dtype=np.uint8, buffer=view)[...] = np.asarray(image)
+    finally:
+        view.release()
+
+
+def _read_shared_page(buffer, offset, mode, size, preprocess):
+    """PNM bytes of a page held in buffer; no view of the buffer outlives this call"""
+    length = size[0] * size[1] * len(mode)
+    page = Image.frombuffer(mode, size, buffer[offset:offset + length], 'raw', mode, 0, 1)
+    if preprocess:
+        page = preprocess_image(page)
+    return _pnm_bytes(page)
+
+
+def _ocr_shared_page_task(shm_name, offset, mode, size, lang, config, preprocess):
+    """Worker entry point for ocr_pages(): OCR one page of a shared memory segment"""
+    shm = _attach_shared_memory(shm_name)
+    try:
+        data = _read_shared_page(shm.buf, offset, mode, size, preprocess)
+    except Exception as e:
+        # Drop the traceback: its frames still view the segment, which could then not be closed
+        raise e.with_traceback(None)
+    finally:
+        shm.close()
+    return _tesseract_stdin(data, lang, config)
+
+
+def _tesseract_list(paths, lang, config, workdir, name):
+    """
+    OCR many images with one tesseract process (one model load)
+
+    tesseract reads a text file of image paths and writes every page's text
+    followed by the page separator, which is how the output is split back
+    per image. Returns None if it cannot be split cleanly.
+    """
+    list_path = os.path.join(workdir, f'{name}.lst')
+    with open(list_path, 'w') as f:
+        f.write('\n'.join(paths) + '\n')
+    output_base = os.path.join(workdir, name)
+    pytesseract.pytesseract.run_tesseract(list_path, output_base, 'txt', lang, config)
+    with open(output_base + '.txt', encoding='utf-8', errors='replace') as f:
+        texts = f.read().split(PAGE_SEPARATOR)
+    # n separators, so n + 1 pieces with nothing after the last
+    if len(texts) != len(paths) + 1 or texts[-1].strip():
+        return None
+    return texts[:-1]
+
+
+def _ocr_batch_task(sources, lang, config, preprocess, regions):
+    """
+    Worker entry point for ocr_batch(): one tesseract run per distinct config
+
+    Each image is preprocessed once; with regions, every region crop of
+    every image goes into that region's tesseract run. If the batch run
+    fails, images fall back to one call each, and an image that fails on its
+    own yields None instead of failing the batch.
+    """
+    with tempfile.TemporaryDirectory(prefix='ocr-batch-') as workdir:
+        # Per job (config, one entry per image): the image file tesseract reads
+        jobs = [(config, [])] if regions is None else [(region.config, []) for region in regions]
+        for index, source in enumerate(sources):
+            try:
+                if isinstance(source, str) and not preprocess and regions is None:
+                    jobs[0][1].append(source)
+                    continue
+                image = Image.open(source) if isinstance(source, str) else source
+                if preprocess:
+                    image = preprocess_image(image)
+                crops = [image] if regions is None else [crop_region(image, region.box) for region in regions]
+                for job_index, crop in enumerate(crops):
+                    path = os.path.join(workdir, f'{index}-{job_index}.png')
+                    crop.save(path)
+                    jobs[job_index][1].append(path)
+            except Exception as e:
+                print(f"OCR batch: could not prepare image {index}: {e}")
+                for _, paths in jobs:
+                    paths.append(None)
+
+        job_texts = []
+        for job_index, (job_config, paths) in enumerate(jobs):
+            readable = [path for path in paths if path is not None]
+            texts = None
+            if readable:
+                try:
+                    texts = _tesseract_list(readable, lang, job_config, workdir, f'batch-{job_index}')
+                except Exception as e:
+                    print(f"OCR batch run failed, reading images one at a time: {e}")
+            if texts is None:
+                texts = []
+                for path in readable:
+                    try:
+                        texts.append(pytesseract.image_to_string(path, lang=lang, config=job_config))
+                    except Exception as e:
+                        print(f"OCR failed for {path}: {e}")
+                        texts.append(None)
+            # Re-insert the images that could not be prepared
+            texts = iter(texts)
+            job_texts.append([None if path is None else next(texts) for path in paths])
+
+    if regions is None:
+        return job_texts[0]
+    results = []
+    for index in range(len(sources)):
+        region_texts = [texts[index] for texts in job_texts]
+        results.append(None if any(text is None for text in region_texts) else region_texts)
+    return results
+
+
+def _shared_memory_fits(nbytes):
+    """Whether nbytes more of shared memory can be written (writing past a full /dev/shm is SIGBUS)"""
+    try:
+        stats = os.statvfs(SHM_DIR)
+    except OSError:
+        # No /dev/shm tmpfs (e.g. macOS): segments are not size-limited this way
+        return True
+    return stats.f_bavail * stats.f_frsize >= nbytes
+
+
+class OcrPool:
+    def __init__(self, max_workers=OCR_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._pages = 0
+        self._batches = 0
+        self._shared_pages = 0
+        self._in_flight = 0
+
+    def _get_executor(self):
+        with self._lock:
+            # Created lazily and again after a fork
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+                self._pid = os.getpid()
+            return self._executor
+
+    def _discard(self, executor):
+        """Drop an executor whose worker died (it stays broken) so the next call starts a new one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _done(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _submit(self, executor, fn, *args):
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def ocr(self, sources, lang='eng', config='', preprocess=False, regions=None):
+        """
+        OCR images concurrently
+
+        Args:
+            sources: Image paths and/or PIL images (e.g. the pages of a PDF)
+            preprocess: Downscale, grayscale, deskew and binarize first (in the worker)
+            regions: Read only these ocr_preprocess.Region crops, each with
+                its own tesseract config
+
+        Returns:
+            List of texts in the same order as sources (lists of region texts
+            if regions is given)
+
+        Raises:
+            BrokenProcessPool if a worker died; the next call gets a new pool
+        """
+        executor = self._get_executor()
+        futures = []
+        try:
+            for source in sources:
+                with self._lock:
+                    self._pages += 1
+                futures.append(self._submit(executor, _ocr_task, source, lang, config, preprocess, regions))
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+
+    def ocr_batch(self, sources, lang='eng', config='', preprocess=False, regions=None,
+                  batch_size=OCR_BATCH_SIZE):
+        """
+        ocr() for many images at once, with far fewer tesseract processes
+
+        Sources are split into at most one chunk per worker (and at most
+        batch_size images per chunk); each chunk is read by a single
+        tesseract invocation per config instead of one per image.
+
+        Returns:
+            Same as ocr(), except an image that could not be read gives None
+            rather than raising (a dead worker still raises BrokenProcessPool)
+        """
+        if not sources:
+            return []
+        executor = self._get_executor()
+        size = min(batch_size, -(-len(sources) // self.max_workers))
+        futures = []
+        try:
+            for start in range(0, len(sources), size):
+                chunk = list(sources[start:start + size])
+                with self._lock:
+                    self._pages += len(chunk)
+                    self._batches += 1
+                futures.append(self._submit(executor, _ocr_batch_task, chunk, lang, config, preprocess, regions))
+            return [text for future in futures for text in future.result()]
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+
+    def ocr_pages(self, images, lang='eng', config='', preprocess=False):
+        """
+        ocr() for rasterized pages, handed to the workers through shared memory
+
+        The pages are written into a single segment (unlinked once no
+        task can still read it); each worker maps its page in place and
+        pipes it to tesseract. Falls back to ocr() if shared memory has no room for the
+        pages.
+
+        Returns:
+            List of texts in the same order as images
+        """
+        if not images:
+            return []
+        images = [image if image.mode in ('L', 'RGB') else image.convert('L') for image in images]
+        layout = []
+        total = 0
+        for image in images:
+            layout.append(total)
+            total += -(-_page_bytes(image) // SHARED_PAGE_ALIGNMENT) * SHARED_PAGE_ALIGNMENT
+        if not _shared_memory_fits(total):
+            print(f"Not enough shared memory for {len(images)} page(s) ({total} bytes), passing pages by copy")
+            return self.ocr(images, lang=lang, config=config, preprocess=preprocess)
+
+        shm = SharedMemory(create=True, size=total)
+        futures = []
+        try:
+            for image, offset in zip(images, layout):
+                _write_shared_page(shm.buf, offset, image)
+            executor = self._get_executor()
+            for image, offset in zip(images, layout):
+                with self._lock:
+                    self._pages += 1
+                    self._shared_pages += 1
+                futures.append(self._submit(executor, _ocr_shared_page_task, shm.name, offset, image.mode,
+                                            image.size, lang, config, preprocess))
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+        finally:
+            # After a failure, pages not yet started are dropped and running ones finish first
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            shm.close()
+            shm.unlink()
+
+    def shutdown(self, wait=False):
+        """Stop the workers; wait=True also joins them (so their CPU time shows in RUSAGE_CHILDREN)"""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'in_flight': self._in_flight,
+                'pages': self._pages,
+                'batches': self._batches,
+                'shared_pages': self._shared_pages,
+            }
+
+
+_pool = OcrPool()
+
+
+def get_ocr_pool():
+    """The process-wide OCR pool"""
+    return _pool
@@ -1,51 +1,194 @@
 import re
 import os
+import io
+from functools import cached_property
 from PyPDF2 import PdfReader
-from docx import Document
+from parsers.skill_matcher import DEFAULT_MATCHER, GENERIC_SKILLS, SKILL_NAMES
+from parsers.sectionizer import ResumeSections
+from parsers.docx_text import extract_docx_text
+
+# Default page budget for PDFs (0 = no limit)
+DEFAULT_MAX_PAGES = int(os.environ.get('RESUME_MAX_PAGES', 0))
+# Pages that hold the header (name, email, phone) on virtually every CV
+HEADER_PAGES = 1
+# Bump whenever extraction output changes; cached parse results are keyed on it
+PARSER_VERSION = '3'
+# Most skills reported per resume (most mentioned first)
+MAX_SKILLS = int(os.environ.get('RESUME_MAX_SKILLS', 40))
+# Mentions a generic skill needs when it is not listed under a Skills heading
+GENERIC_MIN_MENTIONS = 2
+
+# Fields returned by extract_data(), in output order, with their confidence keys
+FIELDS = (
+    'name', 'email', 'phone', 'company', 'designation', 'location',
+    'experience', 'skills', 'degree', 'university',
+)
+CONFIDENCE_KEYS = {
+    'name': 'fullName',
+    'email': 'email',
+    'phone': 'phone',
+    'company': 'company',
+    'designation': 'position',
+    'location': 'location',
+    'experience': 'experience',
+    'skills': 'skills',
+    'degree': 'degree',
+    'university': 'university',
+}
 
 class ResumeParser:
-    def __init__(self, file_path):
+    def __init__(self, file_path, max_pages=None, content=None):
+        """
+        Args:
+            file_path: PDF or DOCX resume
+            max_pages: Parse at most this many PDF pages (default RESUME_MAX_PAGES, 0 = all)
+            content: File bytes, if already in memory; file_path then only
+                supplies the extension and is never opened
+        """
         self.file_path = file_path
-        self.text = self._extract_text()
+        self.content = content
+        self.file_extension = os.path.splitext(file_path)[1].lower()
+        self.max_pages = DEFAULT_MAX_PAGES if max_pages is None else max_pages
+        # Text is read lazily, page by page; pages already read are kept
+        self._pdf_reader = None
+        self._pdf_pages = []
+    
+    @cached_property
+    def text(self):
+        """Full resume text (within the page budget)"""
+        return self._extract_text()
+    
+    @cached_property
+    def sections(self):
+        """Lines and named sections, indexed once and shared by all extractors"""
+        return ResumeSections(self.text)
+    
+    @property
+    def lines(self):
+        return self.sections.lines
+    
+    # Extracted fields: each is computed on first access and then memoized,
+    # so a caller that only needs e.g. email reads just the header page
+    
+    @cached_property
+    def name(self):
+        return self.extract_name()
+    
+    @cached_property
+    def email(self):
+        return self.extract_email()
+    
+    @cached_property
+    def phone(self):
+        return self.extract_phone()
+    
+    @cached_property
+    def skill_counts(self):
+        return self.extract_skill_counts()
+    
+    @cached_property
+    def skills(self):
+        return self.extract_skills()
+    
+    @cached_property
+    def experience(self):
+        return self.extract_experience()
+    
+    @cached_property
+    def education(self):
+        """(degree, university)"""
+        return self.extract_education()
+    
+    @property
+    def degree(self):
+        return self.education[0]
+    
+    @property
+    def university(self):
+        return self.education[1]
+    
+    @cached_property
+    def company(self):
+        return self.extract_company()
+    
+    @cached_property
+    def designation(self):
+        return self.extract_designation()
+    
+    @cached_property
+    def location(self):
+        return self.extract_location()
+    
+    def header_text(self, pages=HEADER_PAGES):
+        """Text of the first page(s) only; stops reading the PDF there"""
+        if self.file_extension != '.pdf':
+            return self.text
+        texts = []
+        for page_text in self.iter_pdf_pages():
+            texts.append(page_text + "\n")
+            if len(texts) >= pages:
+                break
+        return "".join(texts)
+    
+    def _source(self):
+        """Path or in-memory stream to hand to the PDF/DOCX reader"""
+        return io.BytesIO(self.content) if self.content is not None else self.file_path
     
     def _extract_text(self):
         """Extract text from PDF or DOCX file"""
-        file_extension = os.path.splitext(self.file_path)[1].lower()
-        
-        if file_extension == '.pdf':
+        if self.file_extension == '.pdf':
             return self._extract_from_pdf()
-        elif file_extension in ['.doc', '.docx']:
+        elif self.file_extension in ['.doc', '.docx']:
             return self._extract_from_docx()
         else:
             return ""
     
+    def iter_pdf_pages(self):
+        """
+        Yield the text of each PDF page on demand, up to the page budget
+
+        Pages are parsed only when the consumer asks for them and cached,
+        so a caller that stops after page one never parses the rest.
+        """
+        index = 0
+        while True:
+            if index < len(self._pdf_pages):
+                yield self._pdf_pages[index]
+                index += 1
+                continue
+            if self.max_pages and index >= self.max_pages:
+                return
+            try:
+                if self._pdf_reader is None:
+                    self._pdf_reader = PdfReader(self._source())
+                if index >= len(self._pdf_reader.pages):
+                    return
+            except Exception as e:
+                print(f"Error extracting PDF: {e}")
+                return
+            try:
+                page_text = self._pdf_reader.pages[index].extract_text() or ""
+            except Exception as e:
+                print(f"Error extracting PDF page {index + 1}: {e}")
+                page_text = ""
+            self._pdf_pages.append(page_text)
+    
     def _extract_from_pdf(self):
         """Extract text from PDF"""
-        try:
-            reader = PdfReader(self.file_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text
-        except Exception as e:
-            print(f"Error extracting PDF: {e}")
-            return ""
+        return "".join(page_text + "\n" for page_text in self.iter_pdf_pages())
     
     def _extract_from_docx(self):
-        """Extract text from DOCX"""
+        """Extract text from DOCX (body paragraphs and table cells, in order)"""
         try:
-            doc = Document(self.file_path)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            return text
+            return extract_docx_text(self._source())
         except Exception as e:
             print(f"Error extracting DOCX: {e}")
             return ""
     
     def extract_name(self):
         """Extract candidate name from resume"""
-        lines = self.text.split('\n')
         # Usually name is in the first few lines
-        for line in lines[:5]:
+        for line in self.header_text().split('\n')[:5]:
             line = line.strip()
             # Name is typically a short line with capital letters
             if len(line.split()) <= 4 and len(line) > 3 and not '@' in line:
@@ -56,8 +199,9 @@ class ResumeParser:
     def extract_email(self):
         """Extract email address"""
         email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, self.text)
-        return emails[0] if emails else None
+        # Contact details sit in the header; only read further pages if needed
+        match = re.search(email_pattern, self.header_text()) or re.search(email_pattern, self.text)
+        return match.group(0) if match else None
     
     def extract_phone(self):
         """Extract phone number"""
@@ -67,33 +211,39 @@ class ResumeParser:
             r'\+?\d{10,}',
         ]
         
-        for pattern in phone_patterns:
-            phones = re.findall(pattern, self.text)
-            if phones:
-                return phones[0].strip()
-        return None
+        def find_phone(text):
+            for pattern in phone_patterns:
+                match = re.search(pattern, text)
+                if match:
+                    return match.group(0).strip()
+            return None
+        
+        # Contact details sit in the header; only read further pages if needed
+        return find_phone(self.header_text()) or find_phone(self.text)
+    
+    def extract_skill_counts(self):
+        """Count mentions of each taxonomy skill (single pass over the text)"""
+        return DEFAULT_MATCHER.count(self.text)
     
     def extract_skills(self):
-        """Extract skills from resume"""
-        common_skills = [
-            'Python', 'Java', 'JavaScript', 'C++', 'C#', 'Ruby', 'PHP', 'Swift',
-            'React', 'Angular', 'Vue', 'Node.js', 'Django', 'Flask', 'Spring',
-            'SQL', 'MySQL', 'PostgreSQL', 'MongoDB', 'Oracle', 'SQLite',
-            'AWS', 'Azure', 'GCP', 'Docker', 'Kubernetes', 'Jenkins',
-            'Git', 'GitHub', 'GitLab', 'Agile', 'Scrum', 'DevOps',
-            'Machine Learning', 'AI', 'Deep Learning', 'Data Science',
-            'HTML', 'CSS', 'REST API', 'GraphQL', 'Microservices',
-            'Linux', 'Windows', 'MacOS', 'CI/CD', 'Testing', 'TDD'
-        ]
-        
-        found_skills = []
-        text_lower = self.text.lower()
-        
-        for skill in common_skills:
-            if skill.lower() in text_lower:
-                found_skills.append(skill)
-        
-        return found_skills[:10]  # Return top 10 skills
+        """
+        Extract skills from resume, most frequently mentioned first (at most MAX_SKILLS)
+
+        Generic skills ("supply chain", "recruiting") often appear in prose
+        about the employer rather than the candidate, so they need to be
+        listed under a Skills heading or mentioned GENERIC_MIN_MENTIONS times.
+        """
+        counts = self.skill_counts
+        listed = None
+        skills = []
+        for skill in counts:
+            if skill in GENERIC_SKILLS and counts[skill] < GENERIC_MIN_MENTIONS:
+                if listed is None:
+                    listed = DEFAULT_MATCHER.count('\n'.join(self.sections.section_lines('skills')))
+                if skill not in listed:
+                    continue
+            skills.append(skill)
+        return sorted(skills, key=lambda skill: -counts[skill])[:MAX_SKILLS]
     
     def extract_experience(self):
         """Extract years of experience"""
@@ -119,7 +269,8 @@ class ResumeParser:
         degree = None
         university = None
         
-        lines = self.text.split('\n')
+        # Prefer the Education section; fall back to the whole resume
+        lines = self.sections.section_lines('education') or self.lines
         for i, line in enumerate(lines):
             for degree_keyword in degree_keywords:
                 if degree_keyword.lower() in line.lower():
@@ -137,24 +288,10 @@ class ResumeParser:
     
     def extract_company(self):
         """Extract current/recent company from Work Experience section"""
-        # Find Work Experience section
-        experience_patterns = [
-            r'(?:WORK EXPERIENCE|Work Experience|PROFESSIONAL EXPERIENCE|Professional Experience|EMPLOYMENT|Employment|EXPERIENCE|Experience)[:\s]*\n([\s\S]*?)(?=\n(?:EDUCATION|Education|SKILLS|Skills|PROJECTS|Projects|CERTIFICATIONS|Certifications)|$)',
-        ]
-
-        experience_section = None
-        for pattern in experience_patterns:
-            match = re.search(pattern, self.text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                experience_section = match.group(1)
-                break
-
-        if not experience_section:
+        lines = self.sections.section_lines('experience')
+        if not lines:
             return None  # No Work Experience section found
 
-        # Split the section into lines
-        lines = experience_section.split('\n')
-
         # Look for the first company name
         for i, line in enumerate(lines):
             line = line.strip()
@@ -178,20 +315,8 @@ class ResumeParser:
     
     def extract_designation(self):
         """Extract job title/designation from Work Experience section"""
-        # Find Work Experience or Professional Experience section
-        experience_patterns = [
-            r'(?:WORK EXPERIENCE|Work Experience|PROFESSIONAL EXPERIENCE|Professional Experience|EMPLOYMENT|Employment|EXPERIENCE|Experience)[:\s]*\n([\s\S]*?)(?=\n(?:EDUCATION|Education|SKILLS|Skills|PROJECTS|Projects|CERTIFICATIONS|Certifications)|$)',
-        ]
-        
-        experience_section = None
-        for pattern in experience_patterns:
-            match = re.search(pattern, self.text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                experience_section = match.group(1)
-                break
-        
-        if not experience_section:
-            experience_section = self.text  # Fallback to full text
+        # Fallback to full text if there is no Work Experience section
+        lines = self.sections.section_lines('experience') or self.lines
         
         title_keywords = [
             'Engineer', 'Developer', 'Manager', 'Analyst', 'Consultant',
@@ -200,7 +325,6 @@ class ResumeParser:
             'Software', 'Data', 'Product', 'Project', 'Technical', 'Business'
         ]
         
-        lines = experience_section.split('\n')
         for line in lines[:15]:  # Check first 15 lines of experience section
             line_lower = line.lower()
             for keyword in title_keywords:
@@ -267,21 +391,11 @@ class ResumeParser:
             
             return 0.5  # Phone found but doesn't match expected format
         
-        # Skills: Check compatibility with common_skills list
+        # Skills: Check compatibility with the skill taxonomy
         elif field_name == 'skills':
             if isinstance(value, list) and len(value) > 0:
-                common_skills = [
-                    'Python', 'Java', 'JavaScript', 'C++', 'C#', 'Ruby', 'PHP', 'Swift',
-                    'React', 'Angular', 'Vue', 'Node.js', 'Django', 'Flask', 'Spring',
-                    'SQL', 'MySQL', 'PostgreSQL', 'MongoDB', 'Oracle', 'SQLite',
-                    'AWS', 'Azure', 'GCP', 'Docker', 'Kubernetes', 'Jenkins',
-                    'Git', 'GitHub', 'GitLab', 'Agile', 'Scrum', 'DevOps',
-                    'Machine Learning', 'AI', 'Deep Learning', 'Data Science',
-                    'HTML', 'CSS', 'REST API', 'GraphQL', 'Microservices',
-                    'Linux', 'Windows', 'MacOS', 'CI/CD', 'Testing', 'TDD'
-                ]
-                # Check how many skills match common_skills
-                matched_skills = [s for s in value if s in common_skills]
+                # Check how many skills match the taxonomy
+                matched_skills = [s for s in value if s in SKILL_NAMES]
                 if len(matched_skills) > 0:
                     match_ratio = len(matched_skills) / len(value)
                     if match_ratio >= 0.8:  # 80% or more match
@@ -319,41 +433,29 @@ class ResumeParser:
         
         return 0.5
     
-    def extract_data(self):
-        """Extract all data from resume"""
-        name = self.extract_name()
-        email = self.extract_email()
-        phone = self.extract_phone()
-        skills = self.extract_skills()
-        experience = self.extract_experience()
-        degree, university = self.extract_education()
-        company = self.extract_company()
-        designation = self.extract_designation()
-        location = self.extract_location()
+    def extract_data(self, fields=None):
+        """
+        Extract data from resume
+
+        Args:
+            fields: Names from FIELDS to extract (default: all). Only the
+                extractors for these fields run.
+
+        Returns:
+            Dict of the requested fields plus their 'confidence' scores
+        """
+        if fields is None:
+            fields = FIELDS
+        else:
+            unknown = set(fields) - set(FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown resume field(s): {', '.join(sorted(unknown))}")
+            fields = [field for field in FIELDS if field in fields]
         
-        data = {
-            'name': name,
-            'email': email,
-            'phone': phone,
-            'company': company,
-            'designation': designation,
-            'location': location,
-            'experience': experience,
-            'skills': skills,
-            'degree': degree,
-            'university': university,
-            'confidence': {
-                'fullName': self.calculate_confidence('name', name),
-                'email': self.calculate_confidence('email', email),
-                'phone': self.calculate_confidence('phone', phone),
-                'company': self.calculate_confidence('company', company),
-                'position': self.calculate_confidence('designation', designation),
-                'location': self.calculate_confidence('location', location),
-                'experience': self.calculate_confidence('experience', experience),
-                'skills': self.calculate_confidence('skills', skills),
-                'degree': self.calculate_confidence('degree', degree),
-                'university': self.calculate_confidence('university', university)
-            }
+        data = {field: getattr(self, field) for field in fields}
+        data['confidence'] = {
+            CONFIDENCE_KEYS[field]: self.calculate_confidence(field, data[field])
+            for field in fields
         }
         
         return data
@@ -0,0 +1,90 @@
+"""
+One-pass resume sectionizer
+
+Splits resume text into lines once and indexes the named sections
+(experience, education, skills, projects, certifications) by line range,
+so extractors read slices instead of re-scanning the full text.
+"""
+import re
+
+# Heading text (lowercase, without trailing colon) -> section name
+SECTION_HEADINGS = {
+    'experience': [
+        'work experience', 'professional experience', 'employment', 'employment history',
+        'experience', 'work history', 'career history', 'relevant experience',
+    ],
+    'education': [
+        'education', 'academic background', 'academic qualifications', 'qualifications',
+        'educational qualifications',
+    ],
+    'skills': [
+        'skills', 'technical skills', 'key skills', 'core competencies', 'technologies',
+        'skills & tools', 'skills and tools',
+    ],
+    'projects': [
+        'projects', 'personal projects', 'academic projects', 'key projects',
+    ],
+    'certifications': [
+        'certifications', 'certificates', 'licenses & certifications', 'licenses and certifications',
+    ],
+}
+
+_HEADING_LOOKUP = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+# Heading with inline content, e.g. "Skills: Python, SQL". Not used for
+# experience, where "Experience: 5 years" is usually a summary line.
+_INLINE_HEADING = re.compile(r'^\s*([A-Za-z &]+?)\s*:\s*\S')
+_INLINE_SECTIONS = {'education', 'skills', 'projects', 'certifications'}
+# Inline headings job entries carry ("Skills: Python, Flask", "Technologies: AWS").
+# Under experience they cover their own line and the section carries on.
+_ENTRY_INLINE_SECTIONS = {'skills'}
+
+
+class ResumeSections:
+    def __init__(self, text):
+        self.text = text
+        self.lines = text.split('\n')
+        # section name -> list of (first body line, end line exclusive)
+        self.ranges = {}
+        self._index()
+
+    @staticmethod
+    def _heading_name(line):
+        """(section name, is inline) if the line is a heading, else (None, False)"""
+        key = ' '.join(line.strip().rstrip(':').split()).lower()
+        if key in _HEADING_LOOKUP:
+            return _HEADING_LOOKUP[key], False
+        match = _INLINE_HEADING.match(line)
+        if match:
+            name = _HEADING_LOOKUP.get(' '.join(match.group(1).split()).lower())
+            if name in _INLINE_SECTIONS:
+                return name, True
+        return None, False
+
+    def _index(self):
+        current = None
+        start = 0
+        for i, line in enumerate(self.lines):
+            name, inline = self._heading_name(line)
+            if name is None:
+                continue
+            if current:
+                self.ranges.setdefault(current, []).append((start, i))
+            if inline and current == 'experience' and name in _ENTRY_INLINE_SECTIONS:
+                self.ranges.setdefault(name, []).append((i, i + 1))
+                start = i + 1
+                continue
+            current = name
+            # Inline headings keep their own line as the first body line
+            start = i if inline else i + 1
+        if current:
+            self.ranges.setdefault(current, []).append((start, len(self.lines)))
+
+    def has(self, name):
+        return name in self.ranges
+
+    def section_lines(self, name):
+        """Lines of a section (all occurrences, in document order); [] if absent"""
+        lines = []
+        for start, end in self.ranges.get(name, []):
+            lines.extend(self.lines[start:end])
+        return lines
@@ -0,0 +1,138 @@
+"""
+Single-pass multi-pattern skill matching (Aho-Corasick)
+
+The automaton is built once at import from skill_taxonomy.txt. Scanning is
+linear in the length of the text regardless of how many skills and aliases
+the taxonomy contains.
+"""
+import os
+from collections import Counter
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_taxonomy.txt')
+
+
+def _read_taxonomy(path):
+    """Yield (canonical, aliases, generic) for each 'Canonical: alias, alias' line"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            generic = line.startswith('~')
+            canonical, _, aliases = line.lstrip('~').partition(':')
+            yield canonical.strip(), [alias.strip() for alias in aliases.split(',') if alias.strip()], generic
+
+
+def load_taxonomy(path=TAXONOMY_PATH):
+    """Read the taxonomy into {canonical: [aliases]}"""
+    return {canonical: aliases for canonical, aliases, _ in _read_taxonomy(path)}
+
+
+def load_generic_skills(path=TAXONOMY_PATH):
+    """Skills marked ~ (ordinary phrases that need more evidence than one mention)"""
+    return frozenset(canonical for canonical, _, generic in _read_taxonomy(path) if generic)
+
+
+def _normalize(text):
+    """Lowercase and collapse whitespace runs so multi-word terms match across line breaks"""
+    return ' '.join(text.lower().split())
+
+
+class SkillMatcher:
+    def __init__(self, taxonomy):
+        """
+        Args:
+            taxonomy: {canonical skill name: [aliases]}
+        """
+        self.skills = list(taxonomy)
+        # Trie transitions, failure links and (term length, skill) outputs per state
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for canonical, aliases in taxonomy.items():
+            for term in {_normalize(canonical), *(_normalize(a) for a in aliases)}:
+                if term:
+                    self._add(term, canonical)
+        self._build()
+
+    def _add(self, term, canonical):
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append((len(term), canonical))
+
+    def _build(self):
+        """Breadth-first construction of failure links"""
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                # Inherit matches that end at the fallback state
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    @staticmethod
+    def _on_boundary(text, start, end):
+        """Reject matches inside words ('AI' in 'maintain', 'Git' in 'digital')"""
+        if start > 0 and text[start].isalnum() and text[start - 1].isalnum():
+            return False
+        if end < len(text) and text[end - 1].isalnum() and text[end].isalnum():
+            return False
+        return True
+
+    def find(self, text):
+        """
+        Scan text once and return non-overlapping (start, end, skill) matches
+
+        Overlaps are resolved leftmost-longest, so 'Spring Boot' wins over
+        'Spring' and 'Node.js' over 'js'.
+        """
+        text = _normalize(text)
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+
+        candidates = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, skill in out[state]:
+                start = index + 1 - length
+                if self._on_boundary(text, start, index + 1):
+                    candidates.append((start, index + 1, skill))
+
+        candidates.sort(key=lambda match: (match[0], -match[1]))
+        matches = []
+        last_end = 0
+        for start, end, skill in candidates:
+            if start >= last_end:
+                matches.append((start, end, skill))
+                last_end = end
+        return matches
+
+    def count(self, text):
+        """Per-skill hit counts, in order of first appearance"""
+        return Counter(skill for _, _, skill in self.find(text))
+
+
+# Built once per process at import
+SKILL_TAXONOMY = load_taxonomy()
+SKILL_NAMES = frozenset(SKILL_TAXONOMY)
+GENERIC_SKILLS = load_generic_skills()
+DEFAULT_MATCHER = SkillMatcher(SKILL_TAXONOMY)
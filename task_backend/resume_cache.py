@@ -0,0 +1,117 @@
+"""
+Content-addressed resume storage and parse-result cache
+
+Uploads are hashed (xxh3-128) while they are written to disk, and stored
+once under their hash. Parse results are cached in PostgreSQL keyed by
+(content hash, parser version), so re-uploads of the same file skip
+ResumeParser entirely and a parser change invalidates old entries.
+"""
+import os
+import uuid
+from collections import namedtuple
+
+import xxhash
+from psycopg2.extras import Json
+
+from parsers.resume_parser import PARSER_VERSION
+from upload_spool import UploadSpool
+
+CHUNK_SIZE = 64 * 1024
+
+# created is False when identical content was already stored
+StoredFile = namedtuple('StoredFile', 'filename filepath content_hash size created')
+
+
+def content_filename(content_hash, original_name):
+    """Stored filename for a resume: its hash plus the original extension"""
+    return f"{content_hash}{os.path.splitext(original_name)[1].lower()}"
+
+
+def _commit_file(tmp_path, folder, content_hash, original_name):
+    """Move a fully written temp file to its content address (dropping duplicates)"""
+    filename = content_filename(content_hash, original_name)
+    filepath = os.path.join(folder, filename)
+    if os.path.exists(filepath):
+        os.remove(tmp_path)
+        return filename, filepath, False
+    os.replace(tmp_path, filepath)
+    return filename, filepath, True
+
+
+def save_stream(stream, folder, original_name):
+    """
+    Copy an upload stream to disk in chunks while hashing it
+
+    An UploadSpool has already been hashed while it was received, so it is
+    moved (or written once from memory) instead of being read again.
+
+    Returns:
+        StoredFile
+    """
+    if isinstance(stream, UploadSpool):
+        filename = content_filename(stream.content_hash, original_name)
+        filepath = os.path.join(folder, filename)
+        created = stream.persist(filepath)
+        return StoredFile(filename, filepath, stream.content_hash, stream.size, created)
+
+    hasher = xxhash.xxh3_128()
+    size = 0
+    tmp_path = os.path.join(folder, f".upload-{uuid.uuid4().hex}.part")
+    try:
+        with open(tmp_path, 'wb') as f:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    content_hash = hasher.hexdigest()
+    filename, filepath, created = _commit_file(tmp_path, folder, content_hash, original_name)
+    return StoredFile(filename, filepath, content_hash, size, created)
+
+
+def save_bytes(content, folder, original_name):
+    """save_stream() for content already in memory (e.g. zip members)"""
+    content_hash = xxhash.xxh3_128_hexdigest(content)
+    filename = content_filename(content_hash, original_name)
+    filepath = os.path.join(folder, filename)
+    if os.path.exists(filepath):
+        return StoredFile(filename, filepath, content_hash, len(content), False)
+    tmp_path = os.path.join(folder, f".upload-{uuid.uuid4().hex}.part")
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    filename, filepath, created = _commit_file(tmp_path, folder, content_hash, original_name)
+    return StoredFile(filename, filepath, content_hash, len(content), created)
+
+
+def get_cached(cursor, content_hashes):
+    """
+    Look up cached parse results for the current parser version
+
+    Returns:
+        Dict mapping content hash -> extracted data, for hits only
+    """
+    hashes = list(set(content_hashes))
+    if not hashes:
+        return {}
+    cursor.execute('''
+        UPDATE resume_parse_cache
+        SET hit_count = hit_count + 1, last_hit_at = CURRENT_TIMESTAMP
+        WHERE content_hash = ANY(%s) AND parser_version = %s
+        RETURNING content_hash, extracted_data
+    ''', (hashes, PARSER_VERSION))
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def put_cached(cursor, content_hash, extracted_data):
+    """Store a parse result (first writer wins)"""
+    cursor.execute('''
+        INSERT INTO resume_parse_cache (content_hash, parser_version, extracted_data)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (content_hash, parser_version) DO NOTHING
+    ''', (content_hash, PARSER_VERSION, Json(extracted_data)))
@@ -0,0 +1,314 @@
+"""
+Background resume parsing with crash recovery
+
+Uploads insert a placeholder candidate row and hand the file to a bounded
+worker pool. Job state lives on the candidate row (parse_status, parse_attempts,
+parse_updated_at) so any worker process can recover jobs that were left
+queued or running by a crashed or restarted process.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from parse_workers import get_parse_pool
+import resume_cache
+
+# Values of candidates.parse_status
+PARSE_QUEUED = 'queued'
+PARSE_RUNNING = 'running'
+PARSE_DONE = 'done'
+PARSE_FAILED = 'failed'
+
+
+class QueueFull(Exception):
+    """Raised when the ingestion backlog is at capacity"""
+    pass
+
+
+class ResumeIngestionQueue:
+    def __init__(self, get_connection, upload_folder, max_workers=2, max_pending=32,
+                 stale_after=600, max_attempts=3, recovery_interval=60):
+        """
+        Args:
+            get_connection: Callable returning a pooled connection context manager
+            upload_folder: Directory holding uploaded resumes
+            max_workers: Parser threads per process
+            max_pending: Jobs accepted (queued + running) before QueueFull
+            stale_after: Seconds without progress before a job is considered abandoned
+            max_attempts: Attempts before an abandoned job is marked failed
+            recovery_interval: Seconds between sweeps for abandoned jobs
+        """
+        self.get_connection = get_connection
+        self.upload_folder = upload_folder
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.recovery_interval = recovery_interval
+
+        self._executor = None
+        self._in_flight = 0
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # Set when a worker frees up while deferred jobs are waiting
+        self._wake = threading.Event()
+        self._deferred = False
+
+    def start(self):
+        """Start workers and the recovery sweep in this process (idempotent)"""
+        self._ensure_started()
+
+    def _ensure_started(self):
+        """Create the worker pool lazily so each forked worker gets its own"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='resume-parser')
+            self._in_flight = 0
+            if self.recovery_interval:
+                threading.Thread(target=self._recovery_loop, name='resume-recovery',
+                                 daemon=True).start()
+
+    def submit(self, candidate_id, attempt=1, content=None):
+        """
+        Queue a parse job; raises QueueFull when the backlog is at capacity
+
+        content: the resume's bytes if the upload is still in memory (small
+        files), so the worker need not read it back from disk
+        """
+        self._ensure_started()
+        with self._lock:
+            if self._in_flight >= self.max_pending:
+                raise QueueFull(f'Resume parsing backlog is full ({self.max_pending} jobs)')
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(self._run, candidate_id, attempt, content)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+
+    def submit_or_defer(self, candidate_id, attempt=1, content=None):
+        """
+        Queue a parse job, or defer it to the next recovery sweep when the backlog is full
+
+        Returns:
+            True if the job was queued in this process
+        """
+        try:
+            self.submit(candidate_id, attempt, content=content)
+            return True
+        except QueueFull as e:
+            print(f"Warning: {e}; deferring parse job for candidate {candidate_id}")
+            self._defer(candidate_id, attempt)
+            return False
+
+    def _defer(self, candidate_id, attempt):
+        """
+        Mark a queued job as held by no worker
+
+        A NULL parse_updated_at never counts as stale, so the job is not
+        failed or re-attempted; any process's next sweep claims it as soon
+        as it has a free worker.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE candidates SET parse_updated_at = NULL
+                WHERE id = %s AND parse_status = %s AND parse_attempts = %s
+            ''', (candidate_id, PARSE_QUEUED, attempt))
+            conn.commit()
+        with self._lock:
+            self._deferred = True
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+            wake = self._deferred
+        if wake:
+            self._wake.set()
+
+    def _run(self, candidate_id, attempt, content=None):
+        """Parse one resume and store the result, if this attempt still owns the job"""
+        # Claim the job: a recovered (re-queued) job bumps parse_attempts,
+        # which invalidates any older in-memory copy of it
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE candidates
+                SET parse_status = %s, parse_updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND parse_status = %s AND parse_attempts = %s
+                RETURNING resume_filename, resume_hash
+            ''', (PARSE_RUNNING, candidate_id, PARSE_QUEUED, attempt))
+            row = cursor.fetchone()
+            conn.commit()
+
+        if not row:
+            print(f"Skipping parse job for candidate {candidate_id} (attempt {attempt} superseded)")
+            return
+
+        filepath = os.path.join(self.upload_folder, row[0])
+        print(f"Parsing resume for candidate {candidate_id}: {filepath}")
+
+        # Runs in a worker process with a deadline and memory cap; on timeout
+        # the fields finished so far come back with an error
+        extracted_data, error = get_parse_pool().parse(filepath, content=content)
+        if extracted_data is None:
+            print(f"Error parsing resume for candidate {candidate_id}: {error}")
+            self._mark_failed(candidate_id, attempt, error)
+            return
+
+        try:
+            # Partial results are stored but not cached, so a re-upload is parsed again
+            self._store_result(candidate_id, attempt, extracted_data, error=error,
+                               content_hash=None if error else row[1])
+            print(f"Resume parsed for candidate {candidate_id}: {extracted_data.get('name', 'N/A')}")
+        except Exception as e:
+            print(f"Database error storing parse result for candidate {candidate_id}: {e}")
+            import traceback
+            traceback.print_exc()
+
+    def _store_result(self, candidate_id, attempt, extracted_data, error=None, content_hash=None):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE candidates
+                SET name = %s, email = %s, phone = %s, company = %s, designation = %s,
+                    location = %s, experience = %s, degree = %s, university = %s,
+                    parse_status = %s, parse_error = %s, parse_updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND parse_attempts = %s
+            ''', (
+                extracted_data['name'],
+                extracted_data['email'],
+                extracted_data['phone'],
+                extracted_data['company'],
+                extracted_data['designation'],
+                extracted_data['location'],
+                extracted_data['experience'],
+                extracted_data['degree'],
+                extracted_data['university'],
+                PARSE_DONE,
+                error,
+                candidate_id,
+                attempt
+            ))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return
+
+            # Replace any rows left by an earlier, interrupted attempt
+            cursor.execute('DELETE FROM candidate_skills WHERE candidate_id = %s', (candidate_id,))
+            cursor.execute('DELETE FROM confidence_scores WHERE candidate_id = %s', (candidate_id,))
+
+            for skill in extracted_data.get('skills', []):
+                cursor.execute('INSERT INTO candidate_skills (candidate_id, skill) VALUES (%s, %s)',
+                               (candidate_id, skill))
+
+            for field_name, confidence in extracted_data.get('confidence', {}).items():
+                cursor.execute('INSERT INTO confidence_scores (candidate_id, field_name, confidence) VALUES (%s, %s, %s)',
+                               (candidate_id, field_name, confidence))
+
+            if content_hash:
+                resume_cache.put_cached(cursor, content_hash, extracted_data)
+
+            conn.commit()
+
+    def _mark_failed(self, candidate_id, attempt, error):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE candidates
+                SET parse_status = %s, parse_error = %s, extraction_status = 'Failed',
+                    parse_updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND parse_attempts = %s
+            ''', (PARSE_FAILED, error, candidate_id, attempt))
+            conn.commit()
+
+    def recover_stale_jobs(self):
+        """
+        Re-queue deferred jobs, and jobs left queued/running without progress for stale_after seconds
+
+        Rows are claimed with FOR UPDATE SKIP LOCKED so concurrent workers
+        never pick up the same job. Jobs out of attempts are marked failed.
+        Deferred jobs keep their attempt; at most one per free worker slot is claimed.
+
+        Returns:
+            Number of jobs re-queued
+        """
+        with self._lock:
+            self._deferred = False
+            free = self.max_pending - (self._in_flight if self._pid == os.getpid() else 0)
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            deferred = []
+            if free > 0:
+                cursor.execute('''
+                    UPDATE candidates SET parse_updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN (
+                        SELECT id FROM candidates
+                        WHERE parse_status = %s AND parse_updated_at IS NULL
+                        ORDER BY id
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, parse_attempts
+                ''', (PARSE_QUEUED, free))
+                deferred = cursor.fetchall()
+
+            cursor.execute('''
+                UPDATE candidates
+                SET parse_status = %s, parse_error = 'Gave up after repeated interruptions',
+                    extraction_status = 'Failed', parse_updated_at = CURRENT_TIMESTAMP
+                WHERE id IN (
+                    SELECT id FROM candidates
+                    WHERE parse_status IN (%s, %s)
+                      AND parse_updated_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                      AND parse_attempts >= %s
+                    FOR UPDATE SKIP LOCKED
+                )
+            ''', (PARSE_FAILED, PARSE_QUEUED, PARSE_RUNNING, self.stale_after, self.max_attempts))
+
+            cursor.execute('''
+                UPDATE candidates
+                SET parse_status = %s, parse_attempts = parse_attempts + 1,
+                    parse_updated_at = CURRENT_TIMESTAMP
+                WHERE id IN (
+                    SELECT id FROM candidates
+                    WHERE parse_status IN (%s, %s)
+                      AND parse_updated_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, parse_attempts
+            ''', (PARSE_QUEUED, PARSE_QUEUED, PARSE_RUNNING, self.stale_after, self.max_pending))
+            jobs = deferred + cursor.fetchall()
+            conn.commit()
+
+        for candidate_id, attempt in jobs:
+            print(f"Recovering parse job for candidate {candidate_id} (attempt {attempt})")
+            # A full backlog defers the rest rather than leaving them to go stale again
+            self.submit_or_defer(candidate_id, attempt)
+        return len(jobs)
+
+    def _recovery_loop(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.recover_stale_jobs()
+            except Exception as e:
+                print(f"Resume job recovery failed: {e}")
+            # Runs early when a worker frees up while jobs are deferred
+            self._wake.wait(self.recovery_interval)
+
+    def stats(self):
+        """Current backlog of this process"""
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'in_flight': self._in_flight if self._pid == os.getpid() else 0
+        }
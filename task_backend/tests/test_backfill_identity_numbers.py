@@ -0,0 +1,31 @@
+from backfill_identity_numbers import iter_document_files
+
+
+def make_documents(tmp_path, names):
+    folder = tmp_path / '12_priya_sharma'
+    folder.mkdir()
+    for name in names:
+        (folder / name).write_bytes(b'')
+    (tmp_path / 'not_a_candidate').mkdir()
+    return {name: str(folder / name) for name in names}
+
+
+def test_types_from_filename_prefix(tmp_path):
+    paths = make_documents(tmp_path, ['pan_card_1.jpg', 'aadhaar_card_2.png', 'resume.pdf'])
+    assert list(iter_document_files(str(tmp_path))) == [
+        (12, 'Aadhaar Card', paths['aadhaar_card_2.png']),
+        (12, 'PAN Card', paths['pan_card_1.jpg']),
+    ]
+
+
+def test_stored_type_wins_over_prefix(tmp_path):
+    paths = make_documents(tmp_path, ['pan_card_1.jpg', 'aadhaar_card_2.png', 'other_3.jpg'])
+    stored_types = {
+        paths['pan_card_1.jpg']: 'Aadhaar Card',     # corrected by the classifier
+        paths['aadhaar_card_2.png']: 'Other',        # not an identity card after all
+        paths['other_3.jpg']: 'PAN Card',
+    }
+    assert list(iter_document_files(str(tmp_path), stored_types)) == [
+        (12, 'PAN Card', paths['other_3.jpg']),
+        (12, 'Aadhaar Card', paths['pan_card_1.jpg']),
+    ]
@@ -0,0 +1,57 @@
+import io
+import zipfile
+
+import pytest
+
+import batch_ingest
+from batch_ingest import iter_zip_resumes
+
+ALLOWED = {'pdf', 'docx'}
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+def test_yields_supported_files_by_basename():
+    archive = make_zip({
+        'batch/alice.pdf': b'%PDF alice',
+        'bob.DOCX': b'docx bob',
+        'notes.txt': b'skip me',
+        'batch/.hidden.pdf': b'skip me',
+        '__MACOSX/': b'',
+        'no_extension': b'skip me',
+    })
+    assert list(iter_zip_resumes(archive, ALLOWED)) == [('alice.pdf', b'%PDF alice'), ('bob.DOCX', b'docx bob')]
+
+
+def test_file_count_limit(monkeypatch):
+    monkeypatch.setattr(batch_ingest, 'BATCH_MAX_FILES', 2)
+    archive = make_zip({f'{i}.pdf': b'x' for i in range(3)})
+    with pytest.raises(ValueError, match='3 resumes'):
+        list(iter_zip_resumes(archive, ALLOWED))
+
+
+def test_unsupported_files_do_not_count_towards_the_limit(monkeypatch):
+    monkeypatch.setattr(batch_ingest, 'BATCH_MAX_FILES', 1)
+    archive = make_zip({'a.pdf': b'x', 'b.txt': b'x', 'c.png': b'x'})
+    assert [name for name, _ in iter_zip_resumes(archive, ALLOWED)] == ['a.pdf']
+
+
+def test_extracted_size_limit_is_checked_before_reading(monkeypatch):
+    monkeypatch.setattr(batch_ingest, 'BATCH_MAX_EXTRACTED_BYTES', 1000)
+    # Highly compressible: small archive, large extracted size
+    archive = make_zip({'a.pdf': b'\0' * 600, 'b.pdf': b'\0' * 600})
+    resumes = iter_zip_resumes(archive, ALLOWED)
+    with pytest.raises(ValueError, match='too large'):
+        next(resumes)
+
+
+def test_not_a_zip():
+    with pytest.raises(zipfile.BadZipFile):
+        list(iter_zip_resumes(io.BytesIO(b'not a zip'), ALLOWED))
@@ -0,0 +1,71 @@
+import pytest
+
+from parsers.document_classifier import MIN_MARGIN, MIN_SCORE, Classification, decide, score_features, score_text
+from verification_jobs import DocumentVerificationQueue
+
+NO_COLOUR = {'blue_background': 0.0, 'saffron_header': 0.0, 'red_footer': 0.0}
+
+
+def test_score_features():
+    pan = score_features({**NO_COLOUR, 'blue_background': 0.8})
+    assert pan == {'PAN Card': 2.0, 'Aadhaar Card': 0.0}
+    aadhaar = score_features({'blue_background': 0.0, 'saffron_header': 0.15, 'red_footer': 0.9})
+    assert aadhaar['PAN Card'] == 0.0
+    assert aadhaar['Aadhaar Card'] == 2.0
+    assert score_features(NO_COLOUR) == {'PAN Card': 0.0, 'Aadhaar Card': 0.0}
+
+
+def test_score_text_keywords_and_numbers():
+    pan = score_text('INCOME TAX DEPARTMENT\nPermanent Account Number\nABCPS1234K')
+    assert pan['PAN Card'] >= 3.0 + 3.0 + 1.5 + 1.5 + 3.0
+    assert pan['Aadhaar Card'] == 0.0
+    aadhaar = score_text('Government of India\nDOB: 01/01/1990\nMALE\n2345 6789 0123\nAadhaar')
+    assert aadhaar['Aadhaar Card'] == 1.0 + 1.0 + 1.0 + 3.0 + 3.0
+    assert aadhaar['PAN Card'] == 0.0
+
+
+def test_score_text_number_patterns_are_case_sensitive():
+    assert score_text('abcps1234k')['PAN Card'] == 0.0
+
+
+def test_decide():
+    assert decide({'PAN Card': MIN_SCORE, 'Aadhaar Card': MIN_SCORE - MIN_MARGIN}) == 'PAN Card'
+    assert decide({'PAN Card': 1.0, 'Aadhaar Card': 9.0}) == 'Aadhaar Card'
+    # Too weak, or too close to call
+    assert decide({'PAN Card': MIN_SCORE - 0.1, 'Aadhaar Card': 0.0}) is None
+    assert decide({'PAN Card': 8.0, 'Aadhaar Card': 8.0 - MIN_MARGIN + 0.1}) is None
+
+
+def test_colour_alone_never_decides():
+    strongest = score_features({'blue_background': 1.0, 'saffron_header': 1.0, 'red_footer': 1.0})
+    assert decide({**strongest, 'Aadhaar Card': 0.0}) is None
+
+
+class FixedClassifier:
+    def __init__(self, document_types):
+        self.document_types = document_types
+        self.sources = []
+
+    def classify(self, sources):
+        self.sources.append(list(sources))
+        return [Classification(self.document_types.get(source), {}) for source in sources]
+
+
+def test_job_corrects_image_types_only():
+    classifier = FixedClassifier({'a.png': 'Aadhaar Card', 'b.jpg': None})
+    queue = DocumentVerificationQueue(None, None, classifier=classifier, recovery_interval=0)
+    documents = [(1, 'a.png', 'PAN Card'), (2, 'b.jpg', 'Aadhaar Card'), (3, 'c.pdf', 'PAN Card')]
+    assert queue._classify(7, documents) == [(1, 'a.png', 'Aadhaar Card'), (2, 'b.jpg', 'Aadhaar Card'),
+                                             (3, 'c.pdf', 'PAN Card')]
+    assert classifier.sources == [['a.png', 'b.jpg']]
+
+
+def test_job_keeps_types_when_classification_fails():
+    class Failing:
+        def classify(self, sources):
+            raise RuntimeError('tesseract missing')
+
+    queue = DocumentVerificationQueue(None, None, classifier=Failing(), recovery_interval=0)
+    documents = [(1, 'a.png', 'PAN Card')]
+    assert queue._classify(7, documents) == documents
+    assert DocumentVerificationQueue(None, None)._classify(7, documents) == documents
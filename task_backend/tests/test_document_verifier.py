@@ -0,0 +1,103 @@
+import pytest
+
+from parsers.ocr_preprocess import OCR_PROFILES
+
+from parsers.document_verifier import DocumentVerifier
+from parsers.ocr_cache import OcrCache
+
+
+class RecordingPool:
+    """Stands in for OcrPool: returns canned text and records what was OCR'd"""
+
+    def __init__(self, text='INCOME TAX DEPARTMENT', region_texts=None):
+        self.text = text
+        # Region config -> text read from that region
+        self.region_texts = region_texts or {}
+        self.batches = []
+
+    def ocr_batch(self, paths, preprocess=False, regions=None, config=''):
+        self.batches.append(list(paths))
+        if not regions:
+            return [self.text for _ in paths]
+        return [[self.region_texts.get(region.config, self.text) for region in regions] for _ in paths]
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for index in range(2):
+        path = tmp_path / f'card{index}.png'
+        path.write_bytes(b'image %d' % index)
+        paths.append(str(path))
+    return paths
+
+
+def test_cached_empty_text_is_a_hit(tmp_path, images):
+    pool = RecordingPool()
+    verifier = DocumentVerifier(ocr_pool=pool, ocr_cache=OcrCache(str(tmp_path / 'cache')))
+    pool.text = ''
+    assert verifier.extract_texts_from_images(images) == ['', '']
+    pool.text = 'late text'
+    assert verifier.extract_texts_from_images(images) == ['', '']
+    assert len(pool.batches) == 1
+
+
+def test_only_misses_are_ocrd(tmp_path, images):
+    pool = RecordingPool()
+    verifier = DocumentVerifier(ocr_pool=pool, ocr_cache=OcrCache(str(tmp_path / 'cache')))
+    verifier.extract_texts_from_images(images[:1])
+    assert verifier.extract_texts_from_images(images) == ['INCOME TAX DEPARTMENT'] * 2
+    assert pool.batches == [images[:1], images[1:]]
+
+
+@pytest.fixture
+def verifier(tmp_path):
+    return DocumentVerifier(ocr_pool=RecordingPool(), ocr_cache=OcrCache(str(tmp_path / 'cache')))
+
+
+@pytest.mark.parametrize('text, number', [
+    ('1234 5678 9012', '123456789012'),
+    ('Aadhaar no. 234567890123', '234567890123'),
+    # Digits on the line above must not join the number
+    ('Rahul Sharma\nDOB: 01/01/1990\n1234 5678 9012\nMALE', '123456789012'),
+    ('DOB: 01/01/1990\n1234 5678 9012', '123456789012'),
+    # A VID is not the Aadhaar number
+    ('1234 5678 9012\nVID : 9123 4567 8901 2345', '123456789012'),
+    ('VID : 9123 4567 8901 2345', None),
+    ('9123456789012345', None),
+    ('Year of Birth 1990', None),
+])
+def test_aadhaar_number(verifier, text, number):
+    assert verifier.extract_identity_number(text, 'Aadhaar Card') == number
+
+
+def test_pan_number(verifier):
+    assert verifier.extract_identity_number('INCOME TAX DEPARTMENT\nABCPS1234K', 'PAN Card') == 'ABCPS1234K'
+    assert verifier.extract_identity_number('abcps1234k', 'PAN Card') is None
+    assert verifier.extract_identity_number('', 'PAN Card') is None
+    assert verifier.extract_identity_number('ABCPS1234K', 'Resume') is None
+
+
+def test_verify_documents_reads_numbers_in_the_same_batch(tmp_path, images):
+    regions = OCR_PROFILES['Aadhaar Card']
+    pool = RecordingPool(region_texts={
+        regions['name'].config: 'Government of India\nRahul Sharma\nDOB: 01/01/1990\nMALE',
+        regions['number'].config: '2345 6789 0123',
+    })
+    verifier = DocumentVerifier(ocr_pool=pool, ocr_cache=OcrCache(str(tmp_path / 'cache')))
+    results = verifier.verify_documents([(path, 'Aadhaar Card', 'Rahul Sharma') for path in images],
+                                        read_numbers=True)
+    assert [result['status'] for result in results] == ['Pass', 'Pass']
+    assert [result['identity_number'] for result in results] == ['234567890123'] * 2
+    assert pool.batches == [images]
+    # Both fields were cached: a later number-only read needs no OCR
+    assert verifier.extract_identity_numbers([(path, 'Aadhaar Card') for path in images]) == ['234567890123'] * 2
+    assert len(pool.batches) == 1
+
+
+def test_verify_documents_without_read_numbers_uses_the_name_text(tmp_path, images):
+    pool = RecordingPool(text='Rahul Sharma\nDOB: 01/01/1990\n3456 7890 1234')
+    verifier = DocumentVerifier(ocr_pool=pool, ocr_cache=OcrCache(str(tmp_path / 'cache')))
+    results = verifier.verify_documents([(images[0], 'Aadhaar Card', 'Rahul Sharma')])
+    assert results[0]['identity_number'] == '345678901234'
+    assert len(pool.batches) == 1
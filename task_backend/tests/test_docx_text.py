@@ -0,0 +1,96 @@
+import io
+import zipfile
+
+import docx
+import pytest
+from docx.enum.text import WD_BREAK
+from docx.table import Table
+
+from parsers.docx_text import extract_docx_text, iter_docx_paragraphs
+
+
+def save(document):
+    buffer = io.BytesIO()
+    document.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def python_docx_paragraphs(container):
+    """Paragraph texts as python-docx reads them, descending into table cells"""
+    texts = []
+    for block in container.iter_inner_content():
+        if isinstance(block, Table):
+            for row in block.rows:
+                for cell in row.cells:
+                    texts.extend(python_docx_paragraphs(cell))
+        else:
+            texts.append(block.text)
+    return texts
+
+
+def assert_matches_python_docx(document):
+    expected = python_docx_paragraphs(document)
+    assert list(iter_docx_paragraphs(save(document))) == expected
+    assert extract_docx_text(save(document)) == '\n'.join(expected)
+
+
+def test_paragraphs():
+    document = docx.Document()
+    document.add_heading('Priya Sharma', level=1)
+    document.add_paragraph('priya@example.com')
+    document.add_paragraph()
+    paragraph = document.add_paragraph('Senior ')
+    paragraph.add_run('Engineer').bold = True
+    assert_matches_python_docx(document)
+    assert list(iter_docx_paragraphs(save(document))) == ['Priya Sharma', 'priya@example.com', '', 'Senior Engineer']
+
+
+def test_tabs_and_breaks():
+    document = docx.Document()
+    run = document.add_paragraph().add_run('Acme Corp')
+    run.add_tab()
+    run.add_text('2019 - 2023')
+    run.add_break()
+    run.add_text('Built payment APIs')
+    run.add_break(WD_BREAK.PAGE)
+    run.add_text(' Next page')
+    assert_matches_python_docx(document)
+    # Page breaks carry no text in python-docx; line breaks are newlines
+    assert extract_docx_text(save(document)) == 'Acme Corp\t2019 - 2023\nBuilt payment APIs Next page'
+
+
+def test_tables_in_document_order():
+    document = docx.Document()
+    document.add_paragraph('Skills')
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = 'Python'
+    table.cell(0, 1).text = 'Django'
+    table.cell(1, 0).text = 'PostgreSQL'
+    table.cell(1, 1).add_paragraph('Kubernetes')
+    document.add_paragraph('Education')
+    assert_matches_python_docx(document)
+
+
+def test_nested_table():
+    document = docx.Document()
+    outer = document.add_table(rows=1, cols=2)
+    outer.cell(0, 0).text = 'Experience'
+    inner = outer.cell(0, 1).add_table(rows=1, cols=2)
+    inner.cell(0, 0).text = 'Acme Corp'
+    inner.cell(0, 1).text = '2019'
+    document.add_paragraph('After the table')
+    assert_matches_python_docx(document)
+
+
+def test_reads_from_path(tmp_path):
+    document = docx.Document()
+    document.add_paragraph('From disk')
+    path = tmp_path / 'resume.docx'
+    document.save(str(path))
+    assert extract_docx_text(str(path)) == 'From disk'
+
+
+def test_not_a_docx():
+    with pytest.raises(zipfile.BadZipFile):
+        extract_docx_text(io.BytesIO(b'plain text'))
@@ -0,0 +1,45 @@
+import pytest
+
+import identity_numbers
+from identity_numbers import IdentityHashingDisabled, normalize_number, number_hash, valid_number
+
+
+@pytest.fixture
+def keyed(monkeypatch):
+    monkeypatch.setattr(identity_numbers, 'IDENTITY_HASH_KEY', 'test-key')
+
+
+def test_normalize_number():
+    assert normalize_number('AADHAAR', '1234 5678-9012') == '123456789012'
+    assert normalize_number('PAN', ' abcps 1234k ') == 'ABCPS1234K'
+
+
+@pytest.mark.parametrize('number_type, number, valid', [
+    ('AADHAAR', '1234 5678 9012', True),
+    ('AADHAAR', '1234 5678 9012 3456', False),
+    ('AADHAAR', '12345678901', False),
+    ('PAN', 'abcps1234k', True),
+    ('PAN', 'ABCPS12345', False),
+])
+def test_valid_number(number_type, number, valid):
+    assert valid_number(number_type, number) is valid
+
+
+def test_hash_requires_a_key(monkeypatch):
+    monkeypatch.setattr(identity_numbers, 'IDENTITY_HASH_KEY', '')
+    assert not identity_numbers.enabled()
+    with pytest.raises(IdentityHashingDisabled):
+        number_hash('PAN', 'ABCPS1234K')
+
+
+def test_hash_is_of_the_normalized_number(keyed):
+    assert number_hash('AADHAAR', '1234 5678 9012') == number_hash('AADHAAR', '123456789012')
+    assert number_hash('PAN', 'abcps1234k') == number_hash('PAN', 'ABCPS1234K')
+    assert len(number_hash('PAN', 'ABCPS1234K')) == 64
+
+
+def test_hash_depends_on_type_and_key(keyed, monkeypatch):
+    pan = number_hash('PAN', 'ABCPS1234K')
+    assert number_hash('AADHAAR', 'ABCPS1234K') != pan
+    monkeypatch.setattr(identity_numbers, 'IDENTITY_HASH_KEY', 'other-key')
+    assert number_hash('PAN', 'ABCPS1234K') != pan
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from parsers.name_matcher import NameIndex, name_similarity, normalize_name, token_score
+
+
+def test_normalize_name():
+    assert normalize_name('  Dr. RAHUL   K.  Sharma-Jr ') == 'dr rahul k sharmajr'
+    assert normalize_name(None) == ''
+
+
+def test_word_order_does_not_matter():
+    assert name_similarity('SHARMA RAHUL', 'Rahul Sharma') == 1.0
+
+
+def test_initials_match_full_tokens():
+    assert token_score(('r', 'k', 'sharma'), ('rahul', 'kumar', 'sharma')) == pytest.approx((1 + 0.75 + 0.75) / 3)
+    assert name_similarity('R K Sharma', 'Rahul Kumar Sharma') > 0.8
+
+
+def test_unrelated_names_score_low():
+    assert name_similarity('Priya Nair', 'Rahul Sharma') < 0.5
+    assert name_similarity('', 'Rahul Sharma') == 0.0
+
+
+@pytest.fixture
+def index():
+    return NameIndex([(1, 'Rahul Sharma'), (2, 'Rahul Verma'), (3, 'SHARMA RAHUL'), (4, 'Priya Nair'),
+                      (5, 'Rahul Kumar Sharma')])
+
+
+def test_search_ranks_and_excludes(index):
+    matches = index.search('Rahul Sharma', min_score=0.8, exclude=1)
+    assert [key for key, _, _ in matches][:1] == [3]
+    assert 1 not in [key for key, _, _ in matches]
+    assert 4 not in [key for key, _, _ in matches]
+    assert all(a[2] >= b[2] for a, b in zip(matches, matches[1:]))
+
+
+def test_search_limit(index):
+    assert len(index.search('Rahul Sharma', limit=1, min_score=0.5)) == 1
+    assert index.search('Rahul Sharma', limit=0) == []
+    assert index.search('Rahul Sharma', limit=-3) == []
+
+
+def test_search_empty_query_and_index(index):
+    assert index.search('!!!') == []
+    assert NameIndex([]).search('Rahul Sharma') == []
+    assert len(NameIndex([])) == 0
+
+
+def test_search_agrees_with_pairwise_scoring():
+    rng = random.Random(3)
+    first = ['Rahul', 'Priya', 'Amit', 'Anita', 'Vikram', 'Sneha', 'Arjun', 'Kavya']
+    last = ['Sharma', 'Nair', 'Patel', 'Iyer', 'Reddy', 'Gupta']
+    names = [f'{rng.choice(first)} {rng.choice(last)}' for _ in range(300)]
+    index = NameIndex(enumerate(names))
+    for query in ['Rahul Sharma', 'A Patel', 'Iyer Sneha']:
+        expected = sorted(((key, score) for key, name in enumerate(names)
+                           if (score := name_similarity(query, name)) >= 0.85), key=lambda item: -item[1])
+        found = index.search(query, limit=len(names), min_score=0.85)
+        assert sorted(key for key, _, _ in found) == sorted(key for key, _ in expected)
@@ -0,0 +1,48 @@
+import os
+import signal
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+from PIL import Image
+
+from parsers.ocr_pool import OcrPool, _page_bytes, _read_shared_page, _write_shared_page
+
+
+@pytest.mark.parametrize('mode', ['L', 'RGB'])
+def test_shared_page_round_trip(mode):
+    page = Image.effect_noise((321, 203), 64).convert(mode)
+    offset = 64
+    shm = SharedMemory(create=True, size=offset + _page_bytes(page))
+    try:
+        _write_shared_page(shm.buf, offset, page)
+        assert bytes(shm.buf[offset:offset + _page_bytes(page)]) == page.tobytes()
+        pnm = _read_shared_page(shm.buf, offset, mode, page.size, preprocess=False)
+        assert pnm.endswith(page.tobytes())
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_pool_is_replaced_after_a_worker_dies(tmp_path):
+    missing = str(tmp_path / 'missing.png')
+    pool = OcrPool(max_workers=1)
+    try:
+        # Starts the worker; the task itself fails in the worker
+        with pytest.raises(FileNotFoundError):
+            pool.ocr([missing])
+        executor = pool._executor
+        for process in list(executor._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+            process.join()
+
+        with pytest.raises(BrokenProcessPool):
+            pool.ocr_batch([missing, missing])
+        assert pool._executor is None
+
+        with pytest.raises(FileNotFoundError):
+            pool.ocr([missing])
+        assert pool._executor is not executor
+        assert pool.stats()['in_flight'] == 0
+    finally:
+        pool.shutdown(wait=True)
@@ -0,0 +1,24 @@
+from PIL import Image
+
+from parsers import ocr_preprocess
+from parsers.ocr_preprocess import MAX_SIDE, deskew, preprocess
+
+
+def test_deskew_keeps_the_output_within_max_side(monkeypatch):
+    monkeypatch.setattr(ocr_preprocess, 'estimate_skew', lambda gray: 4.0)
+    rotated = deskew(Image.new('L', (MAX_SIDE, MAX_SIDE // 2), 255))
+    assert max(rotated.size) == MAX_SIDE
+    assert rotated.width > rotated.height
+
+
+def test_deskew_skips_small_angles(monkeypatch):
+    monkeypatch.setattr(ocr_preprocess, 'estimate_skew', lambda gray: 0.1)
+    image = Image.new('L', (300, 200), 255)
+    assert deskew(image) is image
+
+
+def test_preprocess_output_within_max_side(monkeypatch):
+    monkeypatch.setattr(ocr_preprocess, 'estimate_skew', lambda gray: -3.0)
+    output = preprocess(Image.new('RGB', (4000, 2500), 'white'))
+    assert max(output.size) <= MAX_SIDE
+    assert output.mode == 'L'
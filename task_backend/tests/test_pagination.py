@@ -0,0 +1,26 @@
+from datetime import datetime
+
+import pytest
+
+from pagination import encode_cursor, decode_cursor
+
+
+def test_round_trip():
+    upload_date = datetime(2025, 3, 14, 9, 26, 53, 589793)
+    assert decode_cursor(encode_cursor(upload_date, 42)) == (upload_date, 42)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(datetime(2025, 1, 1), 10 ** 12)
+    assert all(c.isalnum() or c in '-_=' for c in cursor)
+
+
+def test_null_upload_date_is_rejected():
+    with pytest.raises(ValueError):
+        encode_cursor(None, 1)
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-base64!', 'WzFd', 'WyJub3QgYSBkYXRlIiwgMV0='])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,86 @@
+from resume_jobs import ResumeIngestionQueue, QueueFull, PARSE_QUEUED
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params=()):
+        self.connection.executed.append((' '.join(sql.split()), params))
+
+    def fetchall(self):
+        return self.connection.results.pop(0)
+
+
+class FakeConnection:
+    def __init__(self, results=()):
+        self.executed = []
+        self.results = list(results)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+
+def make_queue(connection, max_pending=2):
+    return ResumeIngestionQueue(lambda: connection, upload_folder='.', max_workers=1,
+                                max_pending=max_pending, recovery_interval=0)
+
+
+def test_full_backlog_defers_the_job():
+    connection = FakeConnection()
+    queue = make_queue(connection, max_pending=0)
+
+    assert queue.submit_or_defer(7) is False
+    sql, params = connection.executed[-1]
+    assert 'SET parse_updated_at = NULL' in sql
+    assert params == (7, PARSE_QUEUED, 1)
+    assert queue._deferred
+
+
+def test_freed_worker_wakes_the_sweep_only_when_jobs_are_deferred():
+    queue = make_queue(FakeConnection())
+    queue._in_flight = 1
+    queue._release()
+    assert not queue._wake.is_set()
+
+    queue._in_flight = 1
+    queue._deferred = True
+    queue._release()
+    assert queue._wake.is_set()
+
+
+def test_sweep_claims_deferred_jobs_without_a_new_attempt():
+    # deferred claim, then the stale re-queue
+    connection = FakeConnection(results=[[(7, 1)], [(9, 3)]])
+    queue = make_queue(connection)
+    submitted = []
+    queue.submit = lambda candidate_id, attempt=1, content=None: submitted.append((candidate_id, attempt))
+
+    assert queue.recover_stale_jobs() == 2
+    assert submitted == [(7, 1), (9, 3)]
+    claim_sql, claim_params = connection.executed[0]
+    assert 'parse_updated_at IS NULL' in claim_sql
+    assert claim_params == (PARSE_QUEUED, 2)
+
+
+def test_sweep_defers_recovered_jobs_it_cannot_submit():
+    connection = FakeConnection(results=[[], [(9, 2)]])
+    queue = make_queue(connection)
+
+    def full(candidate_id, attempt=1, content=None):
+        raise QueueFull('full')
+    queue.submit = full
+
+    queue.recover_stale_jobs()
+    sql, params = connection.executed[-1]
+    assert 'SET parse_updated_at = NULL' in sql
+    assert params == (9, PARSE_QUEUED, 2)
@@ -0,0 +1,71 @@
+from parsers.sectionizer import ResumeSections
+
+RESUME = """Priya Sharma
+priya@example.com
+Experience: 6 years
+
+Technical Skills:
+Python, Django
+PostgreSQL
+
+Work Experience
+Senior Engineer, Acme Corp
+Built payment APIs.
+
+Education: B.Tech, IIT Delhi
+
+Projects
+Resume parser
+Skills
+Kubernetes
+"""
+
+
+def test_named_sections_are_indexed():
+    sections = ResumeSections(RESUME)
+    assert set(sections.ranges) == {'skills', 'experience', 'education', 'projects'}
+    assert sections.section_lines('experience') == ['Senior Engineer, Acme Corp', 'Built payment APIs.', '']
+    assert sections.section_lines('projects') == ['Resume parser']
+
+
+def test_heading_variants_are_case_and_whitespace_insensitive():
+    sections = ResumeSections('  TECHNICAL   skills :\nPython\nKEY PROJECTS\nChat bot')
+    assert sections.section_lines('skills') == ['Python']
+    assert sections.section_lines('projects') == ['Chat bot']
+
+
+def test_inline_heading_keeps_its_line():
+    sections = ResumeSections(RESUME)
+    assert sections.section_lines('education') == ['Education: B.Tech, IIT Delhi', '']
+
+
+def test_inline_experience_is_not_a_heading():
+    sections = ResumeSections('Experience: 5 years in backend work')
+    assert not sections.has('experience')
+
+
+def test_inline_heading_inside_experience_does_not_end_it():
+    sections = ResumeSections(
+        'Experience\nEngineer, Acme Corp\nSkills: Python, Flask\nSenior Engineer, Beta Labs\nLed the API team'
+    )
+    assert sections.section_lines('experience') == [
+        'Engineer, Acme Corp', 'Senior Engineer, Beta Labs', 'Led the API team'
+    ]
+    assert sections.section_lines('skills') == ['Skills: Python, Flask']
+
+
+def test_repeated_sections_are_joined_in_document_order():
+    sections = ResumeSections(RESUME)
+    assert sections.section_lines('skills') == ['Python, Django', 'PostgreSQL', '', 'Kubernetes', '']
+
+
+def test_absent_section():
+    sections = ResumeSections('Priya Sharma\nJust some text')
+    assert not sections.has('certifications')
+    assert sections.section_lines('certifications') == []
+    assert sections.ranges == {}
+
+
+def test_unknown_inline_label_is_content():
+    sections = ResumeSections('Projects\nLanguages: Python\nPhone: 12345')
+    assert sections.section_lines('projects') == ['Languages: Python', 'Phone: 12345']
@@ -0,0 +1,110 @@
+import pytest
+
+from parsers import resume_parser
+from parsers.resume_parser import ResumeParser
+from parsers.skill_matcher import (DEFAULT_MATCHER, GENERIC_SKILLS, SKILL_TAXONOMY, SkillMatcher, _normalize,
+                                   load_generic_skills, load_taxonomy)
+
+TAXONOMY = {
+    'Spring': ['spring framework'],
+    'Spring Boot': ['springboot'],
+    'JavaScript': ['js'],
+    'Node.js': ['nodejs'],
+    'Git': [],
+    'AI': ['artificial intelligence'],
+    'C++': ['cpp'],
+    'Machine Learning': [],
+}
+
+
+@pytest.fixture
+def matcher():
+    return SkillMatcher(TAXONOMY)
+
+
+def skills(matcher, text):
+    return [skill for _, _, skill in matcher.find(text)]
+
+
+def test_aliases_map_to_canonical(matcher):
+    assert skills(matcher, 'Built APIs with SpringBoot and NodeJS') == ['Spring Boot', 'Node.js']
+
+
+def test_leftmost_longest_wins(matcher):
+    assert skills(matcher, 'spring boot, node.js') == ['Spring Boot', 'Node.js']
+    assert skills(matcher, 'spring and js') == ['Spring', 'JavaScript']
+
+
+def test_word_boundaries(matcher):
+    assert skills(matcher, 'maintain digital pipelines') == []
+    assert skills(matcher, 'Git, AI.') == ['Git', 'AI']
+
+
+def test_non_alphanumeric_term_edges(matcher):
+    assert skills(matcher, 'Expert in C++ and cpp') == ['C++', 'C++']
+
+
+def test_terms_match_across_line_breaks(matcher):
+    assert skills(matcher, 'Machine\n   Learning') == ['Machine Learning']
+
+
+def test_count_orders_by_first_appearance(matcher):
+    counts = matcher.count('Git, JS, git, Spring Boot, js, GIT')
+    assert list(counts) == ['Git', 'JavaScript', 'Spring Boot']
+    assert counts['Git'] == 3
+    assert counts['JavaScript'] == 2
+
+
+def test_match_offsets_are_in_normalized_text(matcher):
+    text = 'Used  Git'
+    assert matcher.find(text) == [(5, 8, 'Git')]
+    assert _normalize(text)[5:8] == 'git'
+
+
+def test_load_taxonomy(tmp_path):
+    path = tmp_path / 'skills.txt'
+    path.write_text('# comment\n\nPython: python3, py3\nRust\n', encoding='utf-8')
+    assert load_taxonomy(str(path)) == {'Python': ['python3', 'py3'], 'Rust': []}
+
+
+def test_generic_marker(tmp_path):
+    path = tmp_path / 'skills.txt'
+    path.write_text('Python\n~Recruitment: recruiting\n', encoding='utf-8')
+    assert load_taxonomy(str(path)) == {'Python': [], 'Recruitment': ['recruiting']}
+    assert load_generic_skills(str(path)) == {'Recruitment'}
+    assert 'Supply Chain Management' in GENERIC_SKILLS
+
+
+def test_shipped_taxonomy_has_no_ambiguous_terms():
+    owners = {}
+    for canonical, aliases in SKILL_TAXONOMY.items():
+        for term in {_normalize(canonical), *(_normalize(alias) for alias in aliases)}:
+            assert owners.setdefault(term, canonical) == canonical, f"{term!r} maps to two skills"
+
+
+def test_default_matcher():
+    counts = DEFAULT_MATCHER.count('Python developer: Django, PostgreSQL (postgres), k8s and React.js')
+    assert counts == {'Python': 1, 'Django': 1, 'PostgreSQL': 2, 'Kubernetes': 1, 'React': 1}
+
+
+def parsed_skills(text):
+    parser = ResumeParser('resume.pdf')
+    parser.text = text
+    return parser.skills
+
+
+def test_generic_skill_mentioned_once_in_prose_is_dropped():
+    text = 'Experience\nAcme Logistics\nBuilt Python services for the supply chain team\n'
+    assert parsed_skills(text) == ['Python']
+
+
+def test_generic_skill_needs_a_listing_or_repeated_mentions():
+    listed = 'Skills\nPython, Supply Chain Management\n'
+    assert parsed_skills(listed) == ['Python', 'Supply Chain Management']
+    repeated = 'Optimised the supply chain in Python\nLed supply chain analytics\n'
+    assert parsed_skills(repeated) == ['Supply Chain Management', 'Python']
+
+
+def test_skills_are_capped(monkeypatch):
+    monkeypatch.setattr(resume_parser, 'MAX_SKILLS', 2)
+    assert parsed_skills('Python, Python, Django, Flask') == ['Python', 'Django']
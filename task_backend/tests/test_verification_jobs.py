@@ -0,0 +1,69 @@
+from resume_jobs import QueueFull
+from verification_jobs import DocumentVerificationQueue, VERIFY_QUEUED
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params=()):
+        self.connection.executed.append((' '.join(sql.split()), params))
+
+    def fetchall(self):
+        return self.connection.results.pop(0)
+
+
+class FakeConnection:
+    def __init__(self, results=()):
+        self.executed = []
+        self.results = list(results)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+
+def make_queue(connection, max_pending=2):
+    return DocumentVerificationQueue(lambda: connection, verifier=None, max_workers=1,
+                                     max_pending=max_pending, recovery_interval=0)
+
+
+def test_full_backlog_defers_a_retry():
+    connection = FakeConnection()
+    queue = make_queue(connection, max_pending=0)
+
+    queue._resubmit(7, 2)
+    sql, params = connection.executed[-1]
+    assert 'SET verify_updated_at = NULL' in sql
+    assert params == (7, VERIFY_QUEUED, 2)
+    assert queue._deferred
+
+
+def test_sweep_claims_deferred_jobs_and_defers_what_does_not_fit():
+    # deferred claim, abandoned jobs, then the stale re-queue
+    connection = FakeConnection(results=[[(7, 1)], [], [(9, 3)]])
+    queue = make_queue(connection)
+    submitted = []
+
+    def submit(candidate_id, attempt=1):
+        if submitted:
+            raise QueueFull('full')
+        submitted.append((candidate_id, attempt))
+    queue.submit = submit
+
+    assert queue.recover_stale_jobs() == 2
+    assert submitted == [(7, 1)]
+    claim_sql, claim_params = connection.executed[0]
+    assert 'verify_updated_at IS NULL' in claim_sql
+    assert claim_params == (VERIFY_QUEUED, 2)
+    sql, params = connection.executed[-1]
+    assert 'SET verify_updated_at = NULL' in sql
+    assert params == (9, VERIFY_QUEUED, 3)
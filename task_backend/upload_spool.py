@@ -0,0 +1,192 @@
+"""
+Streaming upload spool
+
+Werkzeug writes each multipart file part into the stream returned by
+Request._get_file_stream. SpoolingRequest hands it an UploadSpool, which
+  - enforces a per-file size limit as bytes arrive (413 mid-stream),
+  - hashes the content incrementally (xxh3-128),
+  - keeps small files in memory so they can be parsed without touching disk,
+  - rolls larger files to a temp file inside the upload folder, so storing
+    them is a rename rather than a second copy,
+and records bytes, receive time and throughput per upload.
+"""
+import io
+import os
+import tempfile
+import threading
+import time
+
+import xxhash
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+
+# Files up to this size stay in memory (and are parsed from memory)
+SPOOL_MEMORY_BYTES = int(os.environ.get('UPLOAD_SPOOL_MEMORY_KB', 1024)) * 1024
+# Per-file limit for resumes/documents; .zip archives are bounded by the request limit
+UPLOAD_MAX_FILE_BYTES = int(os.environ.get('UPLOAD_MAX_FILE_MB', 16)) * 1024 * 1024
+
+
+class UploadSpool:
+    def __init__(self, spool_dir, max_size=None, memory_size=SPOOL_MEMORY_BYTES):
+        """
+        Args:
+            spool_dir: Directory for rolled-over files (same filesystem as the
+                upload folder, so persist() can rename)
+            max_size: Reject the file once it exceeds this many bytes
+            memory_size: Roll over to disk past this many bytes
+        """
+        self.spool_dir = spool_dir
+        self.max_size = max_size
+        self.memory_size = memory_size
+        self.size = 0
+        self.path = None
+
+        self._buffer = io.BytesIO()
+        self._file = None
+        self._hasher = xxhash.xxh3_128()
+        self._started = time.perf_counter()
+        self._finished = None
+
+    @property
+    def _active(self):
+        return self._buffer if self._file is None else self._file
+
+    @property
+    def in_memory(self):
+        return self._file is None
+
+    @property
+    def content_hash(self):
+        return self._hasher.hexdigest()
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            # Werkzeug drops the part without closing it; remove the spill file now
+            self.close()
+            raise RequestEntityTooLarge(f'File exceeds the {self.max_size // (1024 * 1024)}MB limit')
+        self._hasher.update(data)
+        if self._file is None and self.size > self.memory_size:
+            fd, self.path = tempfile.mkstemp(prefix='.upload-', suffix='.part', dir=self.spool_dir)
+            self._file = os.fdopen(fd, 'w+b')
+            self._file.write(self._buffer.getbuffer())
+            self._buffer = None
+        return self._active.write(data)
+
+    def seek(self, offset, whence=0):
+        # Werkzeug rewinds the stream once the part is complete
+        if self._finished is None:
+            self._finished = time.perf_counter()
+        return self._active.seek(offset, whence)
+
+    def read(self, size=-1):
+        return self._active.read(size)
+
+    def readline(self, size=-1):
+        return self._active.readline(size)
+
+    def tell(self):
+        return self._active.tell()
+
+    def flush(self):
+        return self._active.flush()
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def getvalue(self):
+        """Content of an in-memory spool"""
+        if self._file is not None:
+            raise ValueError('Spool has rolled over to disk')
+        return self._buffer.getvalue()
+
+    def persist(self, filepath):
+        """
+        Store the spooled content at filepath, unless a file is already there
+
+        Returns:
+            True if a new file was written
+        """
+        if os.path.exists(filepath):
+            return False
+        if self._file is None:
+            fd, tmp_path = tempfile.mkstemp(prefix='.upload-', suffix='.part', dir=self.spool_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self._buffer.getbuffer())
+        else:
+            self._file.flush()
+            tmp_path = self.path
+            self.path = None
+        os.replace(tmp_path, filepath)
+        return True
+
+    def metrics(self):
+        """Bytes received, receive duration and throughput for this upload"""
+        duration = (self._finished or time.perf_counter()) - self._started
+        return {
+            'bytes': self.size,
+            'durationMs': round(duration * 1000, 2),
+            'throughputMBps': round(self.size / 1e6 / duration, 2) if duration > 0 else None,
+            'inMemory': self.in_memory,
+        }
+
+    def close(self):
+        """Release the buffer; a rolled-over file that was never persisted is deleted"""
+        if self._file is not None:
+            self._file.close()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.path = None
+
+    @property
+    def closed(self):
+        return self._active.closed
+
+
+class UploadStats:
+    """Aggregate upload metrics for the health endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._uploads = 0
+        self._in_memory = 0
+        self._bytes = 0
+        self._seconds = 0.0
+        self._max_ms = 0.0
+
+    def record(self, metrics):
+        with self._lock:
+            self._uploads += 1
+            self._in_memory += metrics['inMemory']
+            self._bytes += metrics['bytes']
+            self._seconds += metrics['durationMs'] / 1000
+            self._max_ms = max(self._max_ms, metrics['durationMs'])
+
+    def stats(self):
+        with self._lock:
+            return {
+                'uploads': self._uploads,
+                'in_memory': self._in_memory,
+                'bytes': self._bytes,
+                'avg_ms': round(self._seconds * 1000 / self._uploads, 2) if self._uploads else 0.0,
+                'max_ms': round(self._max_ms, 2),
+                'throughput_mbps': round(self._bytes / 1e6 / self._seconds, 2) if self._seconds else None,
+            }
+
+
+upload_stats = UploadStats()
+
+
+class SpoolingRequest(Request):
+    """Flask request class that receives file parts into UploadSpools"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        is_archive = bool(filename) and filename.lower().endswith('.zip')
+        return UploadSpool(current_app.config['UPLOAD_FOLDER'],
+                           max_size=None if is_archive else UPLOAD_MAX_FILE_BYTES)
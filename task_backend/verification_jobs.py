@@ -0,0 +1,419 @@
+"""
+Background document verification with retries and crash recovery
+
+submit_documents stores each PAN/Aadhaar file as a submitted_documents row
+with verification_status 'Pending' and queues one job per submission. Job
+state lives on the candidate row (verify_status, verify_attempts,
+verify_updated_at), like resume parsing, so any worker process can recover
+jobs left queued or running by a crashed or restarted process. A job
+corrects the stored types of card images from the images themselves
+(parsers/document_classifier.py), verifies all of the submission's pending
+documents together (card images are OCR'd in batches), records their PAN/Aadhaar numbers as keyed hashes
+for reuse checks (identity_numbers.py) and sets the candidate's
+extraction_status once every document has a result.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import identity_numbers
+from resume_jobs import QueueFull
+
+# Values of candidates.verify_status
+VERIFY_QUEUED = 'queued'
+VERIFY_RUNNING = 'running'
+VERIFY_DONE = 'done'
+VERIFY_FAILED = 'failed'
+
+# submitted_documents.verification_status of a document awaiting its job
+VERIFICATION_PENDING = 'Pending'
+# Documents checked against the candidate's name; others are only stored
+VERIFIED_DOCUMENT_TYPES = ('PAN Card', 'Aadhaar Card')
+# Card images, which the classifier can read
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+# Document statuses that count as passed for the candidate's extraction_status
+PASSED_STATUSES = ('Pass', 'Uploaded')
+
+
+class DocumentVerificationQueue:
+    def __init__(self, get_connection, verifier, max_workers=2, max_pending=32, threshold=0.6,
+                 stale_after=600, max_attempts=3, retry_delay=30, recovery_interval=60, classifier=None):
+        """
+        Args:
+            get_connection: Callable returning a pooled connection context manager
+            verifier: DocumentVerifier
+            max_workers: Verification threads per process (OCR itself is
+                bounded by the shared OCR pool)
+            max_pending: Jobs accepted (queued + running) before QueueFull
+            threshold: Minimum name similarity (0-1) for a document to pass
+            stale_after: Seconds without progress before a job is considered abandoned
+            max_attempts: Attempts (errors or interruptions) before a job is marked failed
+            retry_delay: Seconds before retrying a job that raised, times the attempt number
+            recovery_interval: Seconds between sweeps for abandoned jobs
+            classifier: DocumentClassifier that corrects card images' stored
+                document types before verification (None: types stand as uploaded)
+        """
+        self.get_connection = get_connection
+        self.verifier = verifier
+        self.classifier = classifier
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.threshold = threshold
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.recovery_interval = recovery_interval
+
+        self._executor = None
+        self._in_flight = 0
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # Set when a worker frees up while deferred jobs are waiting
+        self._wake = threading.Event()
+        self._deferred = False
+
+    def start(self):
+        """Start workers and the recovery sweep in this process (idempotent)"""
+        self._ensure_started()
+
+    def _ensure_started(self):
+        """Create the worker pool lazily so each forked worker gets its own"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='doc-verifier')
+            self._in_flight = 0
+            if self.recovery_interval:
+                threading.Thread(target=self._recovery_loop, name='verification-recovery',
+                                 daemon=True).start()
+
+    def submit(self, candidate_id, attempt=1):
+        """Queue a verification job; raises QueueFull when the backlog is at capacity"""
+        self._ensure_started()
+        with self._lock:
+            if self._in_flight >= self.max_pending:
+                raise QueueFull(f'Document verification backlog is full ({self.max_pending} jobs)')
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(self._run, candidate_id, attempt)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+
+    def submit_or_defer(self, candidate_id, attempt=1):
+        """
+        Queue a verification job, or defer it to the next recovery sweep when the backlog is full
+
+        Returns:
+            True if the job was queued in this process
+        """
+        try:
+            self.submit(candidate_id, attempt)
+            return True
+        except QueueFull as e:
+            print(f"Warning: {e}; deferring verification job for candidate {candidate_id}")
+            self._defer(candidate_id, attempt)
+            return False
+
+    def _defer(self, candidate_id, attempt):
+        """
+        Mark a queued job as held by no worker
+
+        A NULL verify_updated_at never counts as stale, so the job is not
+        failed or re-attempted; any process's next sweep claims it as soon
+        as it has a free worker.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE candidates SET verify_updated_at = NULL
+                WHERE id = %s AND verify_status = %s AND verify_attempts = %s
+            ''', (candidate_id, VERIFY_QUEUED, attempt))
+            conn.commit()
+        with self._lock:
+            self._deferred = True
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+            wake = self._deferred
+        if wake:
+            self._wake.set()
+
+    def _run(self, candidate_id, attempt):
+        """Verify a submission's pending documents, if this attempt still owns the job"""
+        # Claim the job: a retried or recovered job bumps verify_attempts,
+        # which invalidates any older in-memory copy of it
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE candidates
+                SET verify_status = %s, verify_updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND verify_status = %s AND verify_attempts = %s
+                RETURNING name
+            ''', (VERIFY_RUNNING, candidate_id, VERIFY_QUEUED, attempt))
+            row = cursor.fetchone()
+            if row:
+                cursor.execute('''
+                    SELECT id, file_path, document_type FROM submitted_documents
+                    WHERE candidate_id = %s AND verification_status = %s
+                    ORDER BY id
+                ''', (candidate_id, VERIFICATION_PENDING))
+                documents = cursor.fetchall()
+            conn.commit()
+
+        if not row:
+            print(f"Skipping verification job for candidate {candidate_id} (attempt {attempt} superseded)")
+            return
+
+        candidate_name = row[0]
+        print(f"Verifying {len(documents)} document(s) for candidate {candidate_id}")
+        try:
+            documents = self._classify(candidate_id, documents)
+            to_verify = [(file_path, document_type, candidate_name)
+                         for _, file_path, document_type in documents
+                         if document_type in VERIFIED_DOCUMENT_TYPES]
+            verified = iter(self.verifier.verify_documents(to_verify, threshold=self.threshold,
+                                                           read_numbers=identity_numbers.enabled()))
+            results = {}
+            for doc_id, _, document_type in documents:
+                if document_type in VERIFIED_DOCUMENT_TYPES:
+                    results[doc_id] = next(verified)
+                else:
+                    results[doc_id] = {
+                        'status': 'Uploaded',
+                        'extracted_name': None,
+                        'similarity_score': None,
+                        'reason': 'No verification required'
+                    }
+            self._store_results(candidate_id, attempt, results,
+                                self._identity_numbers(candidate_id, documents, results),
+                                {doc_id: document_type for doc_id, _, document_type in documents})
+        except Exception as e:
+            print(f"Error verifying documents for candidate {candidate_id} (attempt {attempt}): {e}")
+            if attempt < self.max_attempts:
+                self._retry(candidate_id, attempt, str(e))
+            else:
+                self._mark_failed(candidate_id, attempt, str(e))
+
+    def _classify(self, candidate_id, documents):
+        """
+        Documents with their types as detected from the card images
+
+        The stored type is only a filename or upload-order hint; a type the
+        classifier is sure of replaces it. Classification is best-effort.
+        """
+        if self.classifier is None:
+            return documents
+        images = [index for index, (_, file_path, _) in enumerate(documents)
+                  if os.path.splitext(file_path)[1].lower() in IMAGE_EXTENSIONS]
+        if not images:
+            return documents
+        try:
+            classifications = self.classifier.classify([documents[index][1] for index in images])
+        except Exception as e:
+            print(f"Error classifying documents for candidate {candidate_id}: {e}")
+            return documents
+        documents = list(documents)
+        for index, classification in zip(images, classifications):
+            doc_id, file_path, document_type = documents[index]
+            if classification.document_type and classification.document_type != document_type:
+                print(f"Document {doc_id} looks like a {classification.document_type} "
+                      f"(scores {classification.scores}), not a {document_type}")
+                documents[index] = (doc_id, file_path, classification.document_type)
+        return documents
+
+    @staticmethod
+    def _identity_numbers(candidate_id, documents, results):
+        """identity_numbers.record_numbers() rows for the PAN/Aadhaar numbers read during verification"""
+        if not identity_numbers.enabled():
+            return []
+        return [(candidate_id, doc_id, document_type, results[doc_id].get('identity_number'))
+                for doc_id, _, document_type in documents
+                if document_type in identity_numbers.NUMBER_TYPES and results[doc_id].get('identity_number')]
+
+    def _store_results(self, candidate_id, attempt, results, numbers=(), document_types=None):
+        """Write document results (and types), identity numbers and the candidate's overall status in one transaction"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE candidates
+                SET verify_status = %s, verify_error = NULL, verify_updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND verify_attempts = %s
+            ''', (VERIFY_DONE, candidate_id, attempt))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return
+
+            for doc_id, result in results.items():
+                cursor.execute('''
+                    UPDATE submitted_documents
+                    SET verification_status = %s, extracted_name = %s, similarity_score = %s,
+                        verification_reason = %s, extraction_method = %s,
+                        document_type = COALESCE(%s, document_type)
+                    WHERE id = %s
+                ''', (
+                    result['status'],
+                    result['extracted_name'],
+                    result['similarity_score'],
+                    result['reason'],
+                    result.get('extraction_method'),
+                    (document_types or {}).get(doc_id),
+                    doc_id
+                ))
+
+            identity_numbers.record_numbers(cursor, numbers)
+            self._update_extraction_status(cursor, candidate_id)
+            conn.commit()
+        print(f"Documents verified for candidate {candidate_id}")
+
+    @staticmethod
+    def _update_extraction_status(cursor, candidate_id):
+        """'Completed' if every submitted document passed, otherwise 'Verification Failed'"""
+        cursor.execute('''
+            UPDATE candidates
+            SET extraction_status = CASE WHEN NOT EXISTS (
+                SELECT 1 FROM submitted_documents
+                WHERE candidate_id = %s AND verification_status <> ALL(%s)
+            ) THEN 'Completed' ELSE 'Verification Failed' END
+            WHERE id = %s
+        ''', (candidate_id, list(PASSED_STATUSES), candidate_id))
+
+    def _retry(self, candidate_id, attempt, error):
+        """Re-queue the job as the next attempt after a back-off delay"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE candidates
+                SET verify_status = %s, verify_attempts = %s, verify_error = %s,
+                    verify_updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND verify_attempts = %s
+            ''', (VERIFY_QUEUED, attempt + 1, error, candidate_id, attempt))
+            retrying = cursor.rowcount > 0
+            conn.commit()
+        if retrying:
+            timer = threading.Timer(self.retry_delay * attempt, self._resubmit, (candidate_id, attempt + 1))
+            timer.daemon = True
+            timer.start()
+
+    def _resubmit(self, candidate_id, attempt):
+        self.submit_or_defer(candidate_id, attempt)
+
+    def _mark_failed(self, candidate_id, attempt, error):
+        """Give up on the job: its pending documents fail and so does the candidate"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE candidates
+                SET verify_status = %s, verify_error = %s, verify_updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND verify_attempts = %s
+            ''', (VERIFY_FAILED, error, candidate_id, attempt))
+            if cursor.rowcount:
+                self._fail_pending_documents(cursor, [candidate_id], error)
+            conn.commit()
+
+    @staticmethod
+    def _fail_pending_documents(cursor, candidate_ids, error):
+        cursor.execute('''
+            UPDATE submitted_documents
+            SET verification_status = 'Verification Failed', verification_reason = %s,
+                similarity_score = 0.0
+            WHERE candidate_id = ANY(%s) AND verification_status = %s
+        ''', (f'Verification error: {error}', candidate_ids, VERIFICATION_PENDING))
+        cursor.execute('''
+            UPDATE candidates SET extraction_status = 'Verification Failed' WHERE id = ANY(%s)
+        ''', (candidate_ids,))
+
+    def recover_stale_jobs(self):
+        """
+        Re-queue deferred jobs, and jobs left queued/running without progress for stale_after seconds
+
+        Rows are claimed with FOR UPDATE SKIP LOCKED so concurrent workers
+        never pick up the same job. Jobs out of attempts are marked failed.
+        Deferred jobs keep their attempt; at most one per free worker slot is claimed.
+
+        Returns:
+            Number of jobs re-queued
+        """
+        with self._lock:
+            self._deferred = False
+            free = self.max_pending - (self._in_flight if self._pid == os.getpid() else 0)
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            deferred = []
+            if free > 0:
+                cursor.execute('''
+                    UPDATE candidates SET verify_updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN (
+                        SELECT id FROM candidates
+                        WHERE verify_status = %s AND verify_updated_at IS NULL
+                        ORDER BY id
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, verify_attempts
+                ''', (VERIFY_QUEUED, free))
+                deferred = cursor.fetchall()
+
+            cursor.execute('''
+                UPDATE candidates
+                SET verify_status = %s, verify_error = 'Gave up after repeated interruptions',
+                    verify_updated_at = CURRENT_TIMESTAMP
+                WHERE id IN (
+                    SELECT id FROM candidates
+                    WHERE verify_status IN (%s, %s)
+                      AND verify_updated_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                      AND verify_attempts >= %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id
+            ''', (VERIFY_FAILED, VERIFY_QUEUED, VERIFY_RUNNING, self.stale_after, self.max_attempts))
+            abandoned = [row[0] for row in cursor.fetchall()]
+            if abandoned:
+                self._fail_pending_documents(cursor, abandoned, 'Gave up after repeated interruptions')
+
+            cursor.execute('''
+                UPDATE candidates
+                SET verify_status = %s, verify_attempts = verify_attempts + 1,
+                    verify_updated_at = CURRENT_TIMESTAMP
+                WHERE id IN (
+                    SELECT id FROM candidates
+                    WHERE verify_status IN (%s, %s)
+                      AND verify_updated_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, verify_attempts
+            ''', (VERIFY_QUEUED, VERIFY_QUEUED, VERIFY_RUNNING, self.stale_after, self.max_pending))
+            jobs = deferred + cursor.fetchall()
+            conn.commit()
+
+        for candidate_id, attempt in jobs:
+            print(f"Recovering verification job for candidate {candidate_id} (attempt {attempt})")
+            # A full backlog defers the rest rather than leaving them to go stale again
+            self.submit_or_defer(candidate_id, attempt)
+        return len(jobs)
+
+    def _recovery_loop(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.recover_stale_jobs()
+            except Exception as e:
+                print(f"Verification job recovery failed: {e}")
+            # Runs early when a worker frees up while jobs are deferred
+            self._wake.wait(self.recovery_interval)
+
+    def stats(self):
+        """Current backlog of this process"""
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'in_flight': self._in_flight if self._pid == os.getpid() else 0
+        }
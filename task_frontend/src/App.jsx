@@ -8,19 +8,30 @@ function App() {
   const [view, setView] = useState('dashboard'); // 'dashboard' or 'profile'
   const [selectedCandidate, setSelectedCandidate] = useState(null);
   const [candidates, setCandidates] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  // Whole-table totals for the stat cards (sent with the first page)
+  const [counts, setCounts] = useState(null);
+  const [filters, setFilters] = useState({ q: '', status: 'all' });
   const [loading, setLoading] = useState(true);
 
-  // Fetch candidates from backend
+  // Fetch candidates from backend whenever the filters change
   useEffect(() => {
     fetchCandidates();
-  }, []);
+  }, [filters]);
 
-  const fetchCandidates = async () => {
+  // Loads the first page, or appends the page after `cursor`
+  const fetchCandidates = async (cursor = null) => {
     try {
-      const response = await fetch('https://ai-agent-bcg-1-flask.onrender.com/api/candidates');
+      const params = new URLSearchParams();
+      if (filters.q) params.set('q', filters.q);
+      if (filters.status !== 'all') params.set('status', filters.status);
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`https://ai-agent-bcg-1-flask.onrender.com/api/candidates?${params}`);
       if (response.ok) {
         const data = await response.json();
-        setCandidates(data);
+        setCandidates((prev) => (cursor ? [...prev, ...data.candidates] : data.candidates));
+        setNextCursor(data.nextCursor);
+        if (data.counts) setCounts(data.counts);
       }
     } catch (error) {
       console.error('Error fetching candidates:', error);
@@ -138,7 +149,26 @@ function App() {
   const handleUploadSuccess = async (result) => {
     // Refresh candidates list after successful upload
     await fetchCandidates();
-    alert('Resume uploaded and processed successfully!');
+    alert('Resume uploaded! Extraction is running in the background.');
+    pollExtractionStatus(result.candidate_id);
+  };
+
+  // Poll the background extraction job and refresh the list when it finishes
+  const pollExtractionStatus = async (candidateId, attempts = 0) => {
+    if (!candidateId || attempts >= 60) return;
+    try {
+      const response = await fetch(`https://ai-agent-bcg-1-flask.onrender.com/api/candidates/${candidateId}/status`);
+      if (response.ok) {
+        const status = await response.json();
+        if (status.done) {
+          fetchCandidates();
+          return;
+        }
+      }
+    } catch (error) {
+      console.error('Error polling extraction status:', error);
+    }
+    setTimeout(() => pollExtractionStatus(candidateId, attempts + 1), 2000);
   };
 
   const handleCandidateSelect = async (candidate) => {
@@ -183,7 +213,11 @@ function App() {
             <ResumeUpload onUploadSuccess={handleUploadSuccess} />
             <CandidateDashboard 
               candidates={candidates} 
+              counts={counts}
               onCandidateSelect={handleCandidateSelect} 
+              onFiltersChange={setFilters}
+              hasMore={Boolean(nextCursor)}
+              onLoadMore={() => fetchCandidates(nextCursor)}
             />
           </>
         ) : (
@@ -1,11 +1,19 @@
-import { useState } from 'react';
+import { useState, useEffect } from 'react';
 import { FaSearch, FaUsers, FaCheckCircle, FaClock, FaExclamationTriangle, FaEye, FaInbox } from 'react-icons/fa';
 import './CandidateDashboard.css';
 
-const CandidateDashboard = ({ candidates, onCandidateSelect }) => {
+const CandidateDashboard = ({ candidates, counts, onCandidateSelect, onFiltersChange, hasMore, onLoadMore }) => {
   const [searchTerm, setSearchTerm] = useState('');
   const [filterStatus, setFilterStatus] = useState('all');
 
+  // Filtering happens on the server; debounce typing so each keystroke isn't a request
+  useEffect(() => {
+    const timer = setTimeout(() => {
+      onFiltersChange({ q: searchTerm.trim(), status: filterStatus });
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm, filterStatus]);
+
   const getStatusBadgeClass = (status) => {
     switch (status.toLowerCase()) {
       case 'completed':
@@ -22,19 +30,6 @@ const CandidateDashboard = ({ candidates, onCandidateSelect }) => {
     }
   };
 
-  const filteredCandidates = candidates.filter((candidate) => {
-    const matchesSearch = 
-      candidate.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      candidate.email.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      candidate.company.toLowerCase().includes(searchTerm.toLowerCase());
-    
-    const matchesFilter = 
-      filterStatus === 'all' || 
-      candidate.extractionStatus.toLowerCase() === filterStatus.toLowerCase();
-    
-    return matchesSearch && matchesFilter;
-  });
-
   return (
     <div className="dashboard-container">
       <div className="dashboard-header">
@@ -76,27 +71,27 @@ const CandidateDashboard = ({ candidates, onCandidateSelect }) => {
       <div className="stats-container">
         <div className="stat-card">
           <FaUsers className="stat-icon" size={24} />
-          <div className="stat-value">{candidates.length}</div>
+          <div className="stat-value">{counts ? counts.total : '–'}</div>
           <div className="stat-label">Total Candidates</div>
         </div>
         <div className="stat-card">
           <FaCheckCircle className="stat-icon" size={24} />
           <div className="stat-value">
-            {candidates.filter(c => c.extractionStatus === 'Completed').length}
+            {counts ? counts.completed : '–'}
           </div>
           <div className="stat-label">Completed</div>
         </div>
         <div className="stat-card">
           <FaClock className="stat-icon" size={24} />
           <div className="stat-value">
-            {candidates.filter(c => c.extractionStatus === 'Processing').length}
+            {counts ? counts.processing : '–'}
           </div>
           <div className="stat-label">Processing</div>
         </div>
         <div className="stat-card">
           <FaExclamationTriangle className="stat-icon" size={24} />
           <div className="stat-value">
-            {candidates.filter(c => c.extractionStatus === 'Pending').length}
+            {counts ? counts.pending : '–'}
           </div>
           <div className="stat-label">Pending</div>
         </div>
@@ -115,7 +110,7 @@ const CandidateDashboard = ({ candidates, onCandidateSelect }) => {
             </tr>
           </thead>
           <tbody>
-            {filteredCandidates.length === 0 ? (
+            {candidates.length === 0 ? (
               <tr>
                 <td colSpan="6" className="empty-state">
                   <FaInbox className="empty-icon" size={48} />
@@ -123,7 +118,7 @@ const CandidateDashboard = ({ candidates, onCandidateSelect }) => {
                 </td>
               </tr>
             ) : (
-              filteredCandidates.map((candidate) => (
+              candidates.map((candidate) => (
                 <tr key={candidate.id} className="table-row">
                   <td className="candidate-name">
                     <div className="avatar">{candidate.name.charAt(0).toUpperCase()}</div>
@@ -150,6 +145,13 @@ const CandidateDashboard = ({ candidates, onCandidateSelect }) => {
             )}
           </tbody>
         </table>
+        {hasMore && (
+          <div className="load-more">
+            <button className="view-btn" onClick={onLoadMore}>
+              Load more
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );